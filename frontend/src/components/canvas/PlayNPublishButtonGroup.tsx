@@ -12,11 +12,23 @@ import { useAuth, useUser } from "@clerk/nextjs";
 import { toast } from "sonner";
 // import { connectToWebSocket, executeWorkflow } from "@/service/node";
 import { filterUnusedEdges } from "@/lib/filterEdges";
-import FloatingStreamCard, { StreamDataItem } from "./FloatingStreamCard";
+import FloatingStreamCard, {
+  type BadgeType,
+  StreamDataItem,
+} from "./FloatingStreamCard";
 import { useState } from "react";
 import { useParams } from "next/navigation";
 import PublishWorkflow from "../PublishWorkflow";
 
+// One node event of a `{"type": "progress", "events": [...]}` socket message
+type ProgressEvent = {
+  node: string;
+  status: "start" | "finish" | "error";
+  ms?: number;
+  output?: unknown;
+  error?: string;
+};
+
 export default function PlayNPublishButtonGroup() {
   const { getToken } = useAuth();
   const { user } = useUser();
@@ -91,46 +103,50 @@ export default function PlayNPublishButtonGroup() {
     socket.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
+        // Server heartbeat: answering keeps the socket open while a run is quiet
+        if (data?.type === "ping") {
+          socket.send(JSON.stringify({ type: "pong" }));
+          return;
+        }
         const edges = getEdges();
         const nodes = getNodes();
-        if (data?.chunk) {
-          const currentNode = Object.keys(data.chunk)[0];
-          const currentData = data.chunk[currentNode].state.nodes[currentNode];
-          const edge = edges.find((e) => e.source === currentNode);
+        if (data?.type === "progress") {
+          // Node events since the last message, only the latest one per node
+          (data.events as ProgressEvent[]).forEach((progress) => {
+            const currentNode = nodes.find((n) => n.id === progress.node);
+            if (!currentNode || progress.status !== "finish") return;
 
-          if (edge) {
-            edges.forEach((e) => {
-              if (e.id === edge.id) {
-                updateEdgeData(e.id, {
-                  activate: true,
-                });
-              } else {
-                updateEdgeData(e.id, {
-                  activate: false,
-                });
-              }
-            });
-          }
+            const edge = edges.find((e) => e.source === currentNode.id);
 
-          const newStreamData: StreamDataItem = {
-            id: currentData.id + Date.now(),
-            title: currentData.type,
-            description:
-              currentData.data?.description ||
-              data.message ||
-              "Being processed",
-            timestamp: new Date().toISOString(),
-            type:
-              currentData.type === "text-other-tool"
+            if (edge) {
+              edges.forEach((e) => {
+                if (e.id === edge.id) {
+                  updateEdgeData(e.id, {
+                    activate: true,
+                  });
+                } else {
+                  updateEdgeData(e.id, {
+                    activate: false,
+                  });
+                }
+              });
+            }
+
+            const nodeType = currentNode.type ?? "";
+            const newStreamData: StreamDataItem = {
+              id: currentNode.id + Date.now(),
+              title: nodeType,
+              description:
+                (currentNode.data?.description as string | undefined) ||
+                "Being processed",
+              timestamp: new Date().toISOString(),
+              type: (nodeType === "text-other-tool"
                 ? "output"
-                : currentData.type.split("-").at(-1),
-            details: JSON.stringify(
-              data.chunk?.[currentNode]?.input?.[currentData.type] || {},
-              null,
-              1
-            ),
-          };
-          setStreamData((prev) => [...prev, newStreamData]);
+                : nodeType.split("-").at(-1)) as BadgeType,
+              details: JSON.stringify(progress.output || {}, null, 1),
+            };
+            setStreamData((prev) => [...prev, newStreamData]);
+          });
         } else {
           if (data.error) {
             const nodeId = data?.failed_node_name;
@@ -1,8 +1,4 @@
-from typing import Annotated, Any, cast
-
-
-from jose import jwt, JWTError, jwk
-from jose.utils import base64url_decode
+from typing import Annotated, Any
 
 from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer
@@ -19,12 +15,11 @@ from ..core.exceptions.http_exceptions import (
 from ..core.logger import logging
 from ..core.security import TokenType, oauth2_scheme, verify_token
 from ..core.utils.rate_limit import rate_limiter
-from ..crud.crud_rate_limit import crud_rate_limits
-from ..crud.crud_tier import crud_tiers
 from ..crud.crud_users import crud_users
-from ..schemas.rate_limit import RateLimitRead, sanitize_path
-from ..schemas.tier import TierRead
-from ..core.security import get_jwks, sync_user_to_db
+from ..schemas.rate_limit import sanitize_path
+from ..core.security import verify_clerk_token, sync_user_to_db
+from ..schemas.user import UserSession
+from ..services.rate_limit_rules import rate_limit_rules
 
 logger = logging.getLogger(__name__)
 
@@ -40,30 +35,8 @@ async def get_current_user(
     request: Request, token=Depends(security), db: AsyncSession = Depends(async_get_db)
 ):
     token_str = token.credentials
-    jwks = await get_jwks()
-
-    unverified_header = jwt.get_unverified_header(token_str)
-    kid = unverified_header["kid"]
-
-    key_data = next((k for k in jwks if k["kid"] == kid), None)
-    if key_data is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    public_key = jwk.construct(key_data)
-    message, encoded_signature = token_str.rsplit(".", 1)
-    decoded_signature = base64url_decode(encoded_signature.encode())
-
-    if not public_key.verify(message.encode(), decoded_signature):
-        raise HTTPException(status_code=401, detail="Token signature invalid")
-
-    try:
-        payload = jwt.decode(
-            token_str,
-            public_key.to_pem().decode(),
-            algorithms=["RS256"],
-            options={"verify_aud": False},
-        )
-    except JWTError:
+    payload = await verify_clerk_token(token_str)
+    if payload is None:
         raise HTTPException(status_code=401, detail="Token invalid")
 
     # Extract user info
@@ -82,30 +55,8 @@ async def get_current_user_from_token(
     if not token_str:
         raise HTTPException(status_code=401, detail="Token missing")
 
-    jwks = await get_jwks()
-
-    unverified_header = jwt.get_unverified_header(token_str)
-    kid = unverified_header["kid"]
-
-    key_data = next((k for k in jwks if k["kid"] == kid), None)
-    if key_data is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    public_key = jwk.construct(key_data)
-    message, encoded_signature = token_str.rsplit(".", 1)
-    decoded_signature = base64url_decode(encoded_signature.encode())
-
-    if not public_key.verify(message.encode(), decoded_signature):
-        raise HTTPException(status_code=401, detail="Token signature invalid")
-
-    try:
-        payload = jwt.decode(
-            token_str,
-            public_key.to_pem().decode(),
-            algorithms=["RS256"],
-            options={"verify_aud": False},
-        )
-    except JWTError:
+    payload = await verify_clerk_token(token_str)
+    if payload is None:
         raise HTTPException(status_code=401, detail="Token invalid")
 
     # Extract user info
@@ -166,26 +117,23 @@ async def get_current_superuser(
 async def rate_limiter_dependency(
     request: Request,
     db: Annotated[AsyncSession, Depends(async_get_db)],
-    user: dict | None = Depends(get_optional_user),
+    user: UserSession | None = Depends(get_optional_user),
 ) -> None:
     if hasattr(request.app.state, "initialization_complete"):
         await request.app.state.initialization_complete.wait()
 
     path = sanitize_path(request.url.path)
     if user:
-        user_id = user["id"]
-        tier = await crud_tiers.get(db, id=user["tier_id"], schema_to_select=TierRead)
-        if tier:
-            tier = cast(TierRead, tier)
-            rate_limit = await crud_rate_limits.get(
-                db=db, tier_id=tier.id, path=path, schema_to_select=RateLimitRead
-            )
+        user_id = user.id
+        await rate_limit_rules.ensure_loaded(db)
+        tier_name = rate_limit_rules.tier_name(user.tier_id)
+        if tier_name is not None:
+            rate_limit = rate_limit_rules.get(user.tier_id, path)
             if rate_limit:
-                rate_limit = cast(RateLimitRead, rate_limit)
-                limit, period = rate_limit.limit, rate_limit.period
+                limit, period = rate_limit
             else:
                 logger.warning(
-                    f"User {user_id} with tier '{tier.name}' has no specific rate limit for path '{path}'. \
+                    f"User {user_id} with tier '{tier_name}' has no specific rate limit for path '{path}'. \
                         Applying default rate limit."
                 )
                 limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
@@ -199,7 +147,7 @@ async def rate_limiter_dependency(
         limit, period = DEFAULT_LIMIT, DEFAULT_PERIOD
 
     is_limited = await rate_limiter.is_rate_limited(
-        db=db, user_id=user_id, path=path, limit=limit, period=period
+        user_id=user_id, path=path, limit=limit, period=period
     )
     if is_limited:
         raise RateLimitException("Rate limit exceeded.")
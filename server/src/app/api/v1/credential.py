@@ -18,6 +18,8 @@ from ...schemas.credential import (
 from ...schemas.user import UserRead
 from ...crud.crud_credentials import crud_credentials
 from ...crud.crud_users import crud_users
+from ...services.credential_cache import invalidate_credential
+from ...services.webhook_dispatch_cache import invalidate_credential_webhooks
 
 from ...api.dependencies import get_current_user
 from ...core.db.database import async_get_db
@@ -178,6 +180,8 @@ async def update_credential(
         object=update_data,
         id=credential_id,
     )
+    await invalidate_credential(credential_id)
+    await invalidate_credential_webhooks(db, credential_id)
 
     db_credential = await crud_credentials.get(
         db=db, id=credential_id, schema_to_select=CredentialRead
@@ -217,7 +221,9 @@ async def delete_credentials(
         print("credential not found", credential_id)
         raise NotFoundException("Credential not found")
 
+    await invalidate_credential_webhooks(db, credential_id)
     await crud_credentials.db_delete(db=db, id=credential_id)
+    await invalidate_credential(credential_id)
 
     # HTTP 204 = No Content (typical for DELETE success)
     return Response(status_code=204)
@@ -1,14 +1,19 @@
+import asyncio
+
 from fastapi import (
     APIRouter,
     Depends,
+    Query,
     Request,
     HTTPException,
     WebSocket,
     WebSocketDisconnect,
 )
 from fastapi.responses import JSONResponse
+from starlette.status import WS_1008_POLICY_VIOLATION
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select
+from datetime import UTC, datetime, timedelta
 from uuid import UUID
 from typing import Any, Annotated
 from ...services.openai_agent import structure_invocation
@@ -19,14 +24,30 @@ from app.api.dependencies import get_current_user, get_current_user_from_token
 from app.models.workflow import Workflow
 from app.models.credential import Credential
 from app.models.user import User
-from app.services.workflow_builder import WorkflowGraphBuilder
-from app.crud.crud_workflows import crud_workflows
+from app.models.workflow_run import WorkflowNodeRun, WorkflowRun
+from app.core.schemas import CursorPaginatedListResponse
+from app.core.utils.pagination import fetch_keyset_page
+from app.schemas.workflow_run import (
+    NodeLatencyStats,
+    WorkflowNodeRunRead,
+    WorkflowRunRead,
+)
+from app.core.utils.cache import cache_stats
+from app.services.workflow_access import ensure_workflow_owner
+from app.services.workflow_definition_cache import get_workflow_definition
+from app.services.workflow_graph_cache import get_compiled_graph, graph_cache
 from app.models.workflow import Workflow
-from app.schemas.workflow import WorkflowRead
 from urllib.parse import parse_qs
 from app.services.send_custom_http_request import send_custom_http_request
 
-from app.core.websoket_store import active_ws_connections
+from app.core.websoket_store import connection_manager
+from app.core.utils import queue
+from app.services.workflow_runner import (
+    build_trigger_input,
+    enqueue_workflow_run,
+    execute_workflow,
+)
+from arq.jobs import Job as ArqJob, JobStatus
 
 
 router = APIRouter(tags=["workflow-run"])
@@ -41,9 +62,7 @@ async def run_workflow(
 ) -> JSONResponse:
 
     # 2. Get the workflow from DB and verify ownership
-    workflow_read = await crud_workflows.get(
-        db=db, id=workflow_id, schema_to_select=WorkflowRead
-    )
+    workflow_read = await get_workflow_definition(db, workflow_id)
 
     if not workflow_read:
         raise HTTPException(status_code=404, detail="Workflow not found")
@@ -51,27 +70,12 @@ async def run_workflow(
     # if workflow["user_id"] != current_user["user_id"]:
     #     raise HTTPException(status_code=403, detail="You do not own this workflow")
 
-    # print(workflow_read)
-    compiled_graph = WorkflowGraphBuilder(workflow_read).build_graph()
-    # Find trigger node
-    trigger_node = [
-        node for node in workflow_read["nodes"] if "trigger" in node["type"]
-    ][0]
-    trigger_type = trigger_node["type"]
-    if isinstance(trigger_type, list):
-        trigger_type = trigger_type[0]  # or handle differently
-
-    input_payload = {trigger_type: trigger_node["data"]["output"]}
-    result = await compiled_graph.ainvoke(
-        {
-            "input": input_payload,
-            "state": {
-                "nodes": {node["id"]: node for node in workflow_read["nodes"]},
-                "edges": {edge["id"]: edge for edge in workflow_read["edges"]},
-            },
-        }
-    )
-    print("restul", result)
+    # Runs on the arq workers so a slow node never holds this request open
+    input_payload = build_trigger_input(workflow_read)
+    try:
+        run_id = await enqueue_workflow_run(workflow_id, input_payload)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
     # 3. Get associated credentials (if needed)
     # Example: credential_id stored on workflow
@@ -97,10 +101,142 @@ async def run_workflow(
 
     # # 5. Return JSON response
     return JSONResponse(
+        status_code=202,
         content={
-            "message": "Workflow executed successfully",
-        }
+            "message": "Workflow queued",
+            "run_id": run_id,
+        },
+    )
+
+
+@router.get("/excecutor/runs/{run_id}")
+async def read_workflow_run(
+    run_id: str,
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> dict[str, Any]:
+    """Status and result of a queued workflow run"""
+    if queue.pool is None:
+        raise HTTPException(status_code=503, detail="Queue is not available")
+
+    job = ArqJob(run_id, queue.pool)
+    # The job arguments are (workflow_id, input_payload), see enqueue_workflow_run
+    job_def = await job.info()
+    if job_def is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    await ensure_workflow_owner(db, job_def.args[0], current_user.user_id)
+
+    status = await job.status()
+    if status == JobStatus.not_found:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    response: dict[str, Any] = {"run_id": run_id, "status": status.value}
+    job_result = await job.result_info()
+    if job_result is not None:
+        response["success"] = job_result.success
+        response["result"] = (
+            job_result.result if job_result.success else str(job_result.result)
+        )
+    return response
+
+
+@router.get(
+    "/excecutor/{workflow_id}/runs",
+    response_model=CursorPaginatedListResponse[WorkflowRunRead],
+)
+async def read_workflow_run_history(
+    workflow_id: UUID,
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> dict:
+    """Recorded runs of a workflow, newest first"""
+    await ensure_workflow_owner(db, workflow_id, current_user.user_id)
+
+    runs, next_cursor = await fetch_keyset_page(
+        db,
+        select(WorkflowRun).where(WorkflowRun.workflow_id == workflow_id),
+        WorkflowRun.started_at,
+        WorkflowRun.id,
+        cursor,
+        limit,
+    )
+
+    return {"data": runs, "next_cursor": next_cursor}
+
+
+@router.get(
+    "/excecutor/{workflow_id}/runs/stats",
+    response_model=list[NodeLatencyStats],
+)
+async def read_workflow_node_stats(
+    workflow_id: UUID,
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    days: Annotated[int, Query(ge=1, le=90)] = 7,
+) -> list[dict]:
+    """Latency percentiles of each node over the last `days` days of runs"""
+    await ensure_workflow_owner(db, workflow_id, current_user.user_id)
+
+    # Bounded on started_at so only the partitions of that window are scanned
+    since = datetime.now(UTC) - timedelta(days=days)
+    duration = WorkflowNodeRun.duration_ms
+    result = await db.execute(
+        select(
+            WorkflowNodeRun.node_id,
+            func.count().label("runs"),
+            func.count().filter(WorkflowNodeRun.status == "error").label("errors"),
+            func.avg(duration).label("avg_ms"),
+            func.percentile_cont(0.5).within_group(duration).label("p50_ms"),
+            func.percentile_cont(0.95).within_group(duration).label("p95_ms"),
+            func.max(duration).label("max_ms"),
+        )
+        .where(
+            WorkflowNodeRun.workflow_id == workflow_id,
+            WorkflowNodeRun.started_at >= since,
+        )
+        .group_by(WorkflowNodeRun.node_id)
+        .order_by(WorkflowNodeRun.node_id)
+    )
+
+    return [dict(row._mapping) for row in result]
+
+
+@router.get(
+    "/excecutor/{workflow_id}/runs/{run_id}/nodes",
+    response_model=list[WorkflowNodeRunRead],
+)
+async def read_workflow_run_nodes(
+    workflow_id: UUID,
+    run_id: UUID,
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+) -> list[WorkflowNodeRun]:
+    """Per-node timings and truncated outputs of one recorded run"""
+    await ensure_workflow_owner(db, workflow_id, current_user.user_id)
+
+    result = await db.execute(
+        select(WorkflowNodeRun)
+        .where(
+            WorkflowNodeRun.workflow_id == workflow_id,
+            WorkflowNodeRun.run_id == run_id,
+        )
+        .order_by(WorkflowNodeRun.started_at)
     )
+    node_runs = list(result.scalars().all())
+    if not node_runs:
+        raise HTTPException(status_code=404, detail="Run not found")
+
+    return node_runs
+
+
+@router.get("/excecutor/cache/stats")
+async def read_cache_stats(
+    current_user: Annotated[UserRead, Depends(get_current_user)],
+) -> dict[str, Any]:
+    """Hit/miss counters of this process's compiled graph cache and per-tier counters of its two-tier caches"""
+    return {"graph": graph_cache.stats(), **cache_stats()}
 
 
 @router.post("/excecutor/{workflow_id}/test", response_class=JSONResponse)
@@ -173,112 +309,92 @@ async def workflow_websocket(
         return
 
     user_id = user.user_id
-    # if user_id in active_ws_connections:
-    #     print(f"Closed previous WebSocket connection for user {user_id}")
-    #     await active_ws_connections[user_id].close()
+    # Every run of the workflow is published to its channel, so only the owner may join it
+    try:
+        await ensure_workflow_owner(db, workflow_id, user_id)
+    except HTTPException as e:
+        await websocket.send_json({"error": e.detail})
+        await websocket.close(code=WS_1008_POLICY_VIOLATION)
+        return
 
-    active_ws_connections[user_id] = websocket
+    channel = str(workflow_id)
+    connection = connection_manager.connect(websocket, user_id, channel)
+    run_task = None
     try:
         # 1. Fetch and verify workflow
-        workflow_read = await crud_workflows.get(
-            db=db, id=workflow_id, schema_to_select=WorkflowRead
-        )
+        workflow_read = await get_workflow_definition(db, workflow_id)
 
         if not workflow_read:
             await websocket.send_json({"error": "Workflow not found"})
             return
 
-        # 2. Optional: verify the user owns the workflow
-        # if workflow_read["user_id"] != current_user.id:
-        #     await websocket.send_json({"error": "Unauthorized"})
-        #     return
-
-        # 3. Run the workflow
+        # 2. Run the workflow
         print("before compiled graph")
         try:
-            compiled_graph = WorkflowGraphBuilder(workflow_read).build_graph()
+            get_compiled_graph(workflow_read)
         except Exception as e:
             print(f"Error compiling workflow: {str(e)}")
             await websocket.send_json(
                 {"error": f"Workflow compilation failed: {str(e)}"}
             )
-            if user_id in active_ws_connections:
-                await active_ws_connections[user_id].close()
-                del active_ws_connections[user_id]
-                return
-
-        trigger_node = [
-            node for node in workflow_read["nodes"] if "trigger" in node["type"]
-        ][0]
-        trigger_type = trigger_node["type"]
-        if isinstance(trigger_type, list):
-            trigger_type = trigger_type[0]
-
-        input_payload = {trigger_type: trigger_node["data"]["output"]}
-        # result = await compiled_graph.ainvoke(
-        try:
-            async for chunk in compiled_graph.astream(
-                {
-                    "input": input_payload,
-                    "state": {
-                        "nodes": {node["id"]: node for node in workflow_read["nodes"]},
-                        "edges": {edge["id"]: edge for edge in workflow_read["edges"]},
-                    },
-                    "user_id": user_id,
-                }
-            ):
-                # Process each streamed chunk here
-                print("Streamed chunk:", chunk)
-                await active_ws_connections[user_id].send_json(
-                    {
-                        "message": "Workflow execution in progress",
-                        "chunk": chunk,
-                    }
-                )
-
-            print("after streaming")
-            # 4. Send result to that user's WebSocket only
-            await websocket.send_json(
-                {
-                    "message": "Workflow executed successfully",
-                    # "result": result,
-                }
-            )
+            return
 
-        except Exception as e:
-            print("Error during workflow execution:", e)
-            # Log the error (optional)
-            import traceback
-            import re
-
-            traceback.print_exc()
-
-            tb_str = traceback.format_exc()
-            print("Traceback:", tb_str)
-
-            match = re.search(r"During task with name '(.+?)' and id '(.+?)'", tb_str)
-            if match:
-                failed_node_name = match.group(1)
-                failed_node_id = match.group(2)
-            else:
-                failed_node_name = failed_node_id = None
-
-            # Send error to user
-            error_msg = str(e)
-            print("error message", error_msg)
-            await websocket.send_json(
-                {
-                    "message": "Workflow execution failed",
-                    "error": error_msg,
-                    "failed_node_name": failed_node_name,
-                    "failed_node_id": failed_node_id,
-                }
-            )
+        run_task = asyncio.create_task(_stream_workflow_run(channel, workflow_read))
+
+        # Reading keeps the connection active and notices the client going away
+        while True:
+            await websocket.receive_text()
+            connection_manager.touch(connection)
 
     except WebSocketDisconnect:
         print(f"User {user_id} disconnected.")
-        if user_id in active_ws_connections:
-            del active_ws_connections[user_id]
+    finally:
+        connection_manager.disconnect(connection)
+        # The run shares this request's database session, which closes with it
+        if run_task is not None and not run_task.done():
+            run_task.cancel()
+
+
+async def _stream_workflow_run(channel: str, workflow_read: dict) -> None:
+    """Run a workflow in this process, streaming node events to every socket watching it.
+
+    Sockets receive `{"type": "progress", "events": [...]}` messages, one event per node
+    start/finish/error with that node's output only, then the final status message.
+    """
+    try:
+        await execute_workflow(workflow_read)
+
+        await connection_manager.send_to_workflow(
+            channel, {"message": "Workflow executed successfully"}
+        )
+
+    except Exception as e:
+        print("Error during workflow execution:", e)
+        # Log the error (optional)
+        import traceback
+        import re
+
+        traceback.print_exc()
+
+        tb_str = traceback.format_exc()
+
+        match = re.search(r"During task with name '(.+?)' and id '(.+?)'", tb_str)
+        if match:
+            failed_node_name = match.group(1)
+            failed_node_id = match.group(2)
+        else:
+            failed_node_name = failed_node_id = None
+
+        # Send error to every socket watching the workflow
+        await connection_manager.send_to_workflow(
+            channel,
+            {
+                "message": "Workflow execution failed",
+                "error": str(e),
+                "failed_node_name": failed_node_name,
+                "failed_node_id": failed_node_id,
+            },
+        )
 
 
 @router.post("/excecutor/{workflow_id}/node/send_email", response_class=JSONResponse)
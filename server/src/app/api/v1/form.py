@@ -1,14 +1,16 @@
 from typing import Annotated, Any, cast
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Request, Response
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession  # type: ignore
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from ...api.dependencies import get_optional_user, get_current_user
+from ...core.config import settings
 from ...core.db.database import async_get_db
+from ...core.schemas import CursorPaginatedListResponse
 from ...core.exceptions.http_exceptions import (
     ForbiddenException,
     NotFoundException,
@@ -18,9 +20,6 @@ from ...core.utils.cache import cache
 from ...crud.form.form import crud_forms
 from ...crud.crud_users import crud_users
 from ...crud.form.form_field import crud_form_fields
-from ...crud.crud_workflows import crud_workflows
-from ...crud.form.form_response import crud_form_responses
-from ...crud.form.form_response_value import crud_form_response_values
 from ...schemas.form.form import (
     FormCreate,
     FormCreateInternal,
@@ -35,19 +34,32 @@ from ...schemas.form.form_field import (
     FormFieldBase,
     FormFieldUpdate,
 )
-from ...schemas.form.form_response import FormResponseCreateInternal, FormResponseRead
+from ...schemas.form.form_response import (
+    FormResponseAnswers,
+    FormResponseRead,
+)
 from ...schemas.form.form_response_value import (
-    FormResponseValueCreateInternal,
     FormResponseValueRead,
 )
-from ...schemas.workflow import WorkflowRead
 from ...schemas.user import UserRead
 from ...models.form.form import Form
-from ...models.form.form_response import FormResponse
 from ...models.form.form_response_value import FormResponseValue
-from app.services.workflow_builder import WorkflowGraphBuilder
+from app.services.form_definition_cache import (
+    get_form_definition,
+    get_rendered_form,
+    invalidate_form_definition,
+)
+from app.services.export import (
+    ExportFormat,
+    export_response,
+    form_export_columns,
+    iter_form_responses,
+)
+from app.services.form_submission import get_form_responses, ingest_form_submission
+from app.services.workflow_access import ensure_workflow_owner
+from app.services.workflow_definition_cache import get_workflow_definition
+from app.services.workflow_runner import enqueue_workflow_run, execute_workflow
 
-from app.services.generate_form_html import generate_form_html
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 # security = HTTPBearer()
@@ -120,6 +132,7 @@ async def update_form_title_or_description(
         raise BadRequestException(status_code=400, detail="No valid fields to update.")
 
     await crud_forms.update(db=db, object=update_data, id=form_uuid)
+    await invalidate_form_definition(form_uuid)
 
     return {"message": "Post updated"}
 
@@ -143,6 +156,7 @@ async def delete_form(
     # Optionally validate that this field's form belongs to `workflow_id` and current_user
 
     await crud_forms.db_delete(db=db, id=workflow_id)
+    await invalidate_form_definition(workflow_id)
 
     # HTTP 204 = No Content (typical for DELETE success)
     return Response(status_code=204)
@@ -170,6 +184,7 @@ async def create_form_field(
     created_form_field = await crud_form_fields.create(
         db=db, object=form_field_internal
     )
+    await invalidate_form_definition(workflow_id)
 
     form_field_read = await crud_form_fields.get(
         db=db, id=created_form_field.id, schema_to_select=FormFieldRead
@@ -208,6 +223,7 @@ async def update_form_field(
     updated_form_field = await crud_form_fields.update(
         db=db, object=form_field_internal, id=form_field_id
     )
+    await invalidate_form_definition(form_field_read["form_id"])
 
     form_field_read = await crud_form_fields.get(
         db=db, id=form_field_id, schema_to_select=FormFieldRead
@@ -240,13 +256,26 @@ async def delete_form_field(
     # Optionally validate that this field's form belongs to `workflow_id` and current_user
 
     await crud_form_fields.db_delete(db=db, id=form_field_id)
+    await invalidate_form_definition(form_field["form_id"])
 
     # HTTP 204 = No Content (typical for DELETE success)
     return Response(status_code=204)
 
 
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an `If-None-Match` header against an ETag (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
 @router.get("/form/{form_id}", response_class=HTMLResponse)
 async def get_form(
+    request: Request,
     form_id: str,
     db: Annotated[AsyncSession, Depends(async_get_db)],
 ):
@@ -259,22 +288,22 @@ async def get_form(
             status_code=400,
             content={"error": "❌❌❌❌❌"},
         )
-    stmt = select(Form).where(Form.id == form_id).options(selectinload(Form.fields))
+    rendered = await get_rendered_form(db, form_uuid)
 
-    result = await db.execute(stmt)
-    form_with_fields = result.scalar_one_or_none()
-
-    if form_with_fields is None:
+    if rendered is None:
         return JSONResponse(
             status_code=404,
             content={"error": "💀💀💀💀💀"},
         )
 
-    form_read = FormRead.model_validate(form_with_fields, from_attributes=True)
-
-    form_read = cast(FormRead, form_read)
+    headers = {
+        "ETag": rendered.etag,
+        "Cache-Control": settings.FORM_HTML_CACHE_CONTROL,
+    }
+    if etag_matches(request.headers.get("If-None-Match"), rendered.etag):
+        return Response(status_code=304, headers=headers)
 
-    return generate_form_html(form_read)
+    return HTMLResponse(rendered.html, headers=headers)
     # In a real application, you would fetch this from your database
 
 
@@ -287,69 +316,28 @@ async def submit_form(
 ):
     """Handle form submission"""
 
-    form = await crud_forms.get(db=db, id=form_id, schema_to_select=FormRead)
+    form = await get_form_definition(db, form_id)
 
     if form is None:
         raise NotFoundException("Form not found")
 
     # Get the JSON data from the request
     form_data = await request.json()
-    # Create a response
-    form_response_internal = FormResponseCreateInternal(form_id=form_id)
-    form_response = await crud_form_responses.create(
-        db=db, object=form_response_internal
-    )
-
-    # Create from_response_value
-    for key, value in form_data.items():
-        form_response_value = FormResponseValueCreateInternal(
-            response_id=str(form_response.id), field_id=key, value=value
-        )
-        await crud_form_response_values.create(db=db, object=form_response_value)
-    # form_response_values =
-
-    stmt = (
-        select(FormResponse)
-        .where(FormResponse.id == form_response.id)
-        .options(
-            selectinload(FormResponse.values),
-            selectinload(FormResponse.form).selectinload(Form.fields),
-        )
-    )
-    result = await db.execute(stmt)
-    response = result.scalar_one_or_none()
-
-    if response is None:
-        raise NotFoundException("Response not found")
+    # Store the response and all its values in one transaction
+    _, final_response = await ingest_form_submission(db, form, form_data)
 
-    fields = {v.id: v.label for v in response.form.fields}
-    final_response = {fields[v.field_id]: v.value for v in response.values}
-    # print(final_response)
     if current_user:
         return final_response
-    # find workflow
-    workflow_read = await crud_workflows.get(
-        db=db, id=form_id, schema_to_select=WorkflowRead
-    )
-
-    compiled_graph = WorkflowGraphBuilder(workflow_read).build_graph()
-    # print("----------------------fnal response passed")
-    result = await compiled_graph.ainvoke(
-        {
-            "input": {"form-trigger": final_response},
-            "state": {
-                "nodes": {node["id"]: node for node in workflow_read["nodes"]},
-                "edges": {edge["id"]: edge for edge in workflow_read["edges"]},
-            },
-        }
-    )
-    # print("restul", result)
-
-    # Check if user from app then send response else trigger graph
 
-    # Invoke graph with state
+    # Run on the arq workers, the submitter only waits for the enqueue
+    try:
+        run_id = await enqueue_workflow_run(form_id, {"form-trigger": final_response})
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-    return {"message": "Form submitted"}
+    return JSONResponse(
+        status_code=202, content={"message": "Form submitted", "run_id": run_id}
+    )
 
 
 @router.post("/test/submit/form/{form_id}")
@@ -361,62 +349,21 @@ async def test_submit_form(
 ):
     """Handle form submission"""
 
-    form = await crud_forms.get(db=db, id=form_id, schema_to_select=FormRead)
+    form = await get_form_definition(db, form_id)
 
     if form is None:
         raise NotFoundException("Form not found")
 
     # Get the JSON data from the request
     form_data = await request.json()
-    # Create a response
-    form_response_internal = FormResponseCreateInternal(form_id=form_id)
-    form_response = await crud_form_responses.create(
-        db=db, object=form_response_internal
-    )
-
-    # Create from_response_value
-    for key, value in form_data.items():
-        form_response_value = FormResponseValueCreateInternal(
-            response_id=str(form_response.id), field_id=key, value=value
-        )
-        await crud_form_response_values.create(db=db, object=form_response_value)
-    # form_response_values =
-
-    stmt = (
-        select(FormResponse)
-        .where(FormResponse.id == form_response.id)
-        .options(
-            selectinload(FormResponse.values),
-            selectinload(FormResponse.form).selectinload(Form.fields),
-        )
-    )
-    result = await db.execute(stmt)
-    response = result.scalar_one_or_none()
-
-    if response is None:
-        raise NotFoundException("Response not found")
-
-    fields = {v.id: v.label for v in response.form.fields}
-    final_response = {fields[v.field_id]: v.value for v in response.values}
-    # print(final_response)
+    # Store the response and all its values in one transaction
+    _, final_response = await ingest_form_submission(db, form, form_data)
 
     # find workflow
-    workflow_read = await crud_workflows.get(
-        db=db, id=form_id, schema_to_select=WorkflowRead
-    )
+    workflow_read = await get_workflow_definition(db, form_id)
 
-    compiled_graph = WorkflowGraphBuilder(workflow_read).build_graph()
-    # print("----------------------fnal response passed")
-    result = await compiled_graph.ainvoke(
-        {
-            "input": {"form-trigger": final_response},
-            "state": {
-                "nodes": {node["id"]: node for node in workflow_read["nodes"]},
-                "edges": {edge["id"]: edge for edge in workflow_read["edges"]},
-            },
-        }
-    )
-    # print("restul", result)
+    # Recorded in the run history like any other run
+    await execute_workflow(workflow_read, {"form-trigger": final_response})
 
     # Check if user from app then send response else trigger graph
     if current_user:
@@ -427,6 +374,46 @@ async def test_submit_form(
     return {"message": "Form submitted"}
 
 
+# ---------------------------------------------Form Response------------------------------------------
+@router.get(
+    "/form/{form_id}/responses",
+    response_model=CursorPaginatedListResponse[FormResponseAnswers],
+)
+async def read_form_responses(
+    form_id: UUID,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> dict:
+    form = await get_form_definition(db, form_id)
+    if form is None:
+        raise NotFoundException("Form not found")
+    await ensure_workflow_owner(db, form.workflow_id, current_user.user_id)
+
+    return await get_form_responses(db=db, form_id=form_id, cursor=cursor, limit=limit)
+
+
+@router.get("/form/{form_id}/responses/export")
+async def export_form_responses(
+    form_id: UUID,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    format: ExportFormat = ExportFormat.CSV,
+) -> StreamingResponse:
+    form = await get_form_definition(db, form_id)
+    if form is None:
+        raise NotFoundException("Form not found")
+    await ensure_workflow_owner(db, form.workflow_id, current_user.user_id)
+
+    return export_response(
+        iter_form_responses(form_id),
+        form_export_columns(form),
+        format,
+        filename=f"form-{form_id}-responses",
+    )
+
+
 # Code will get all form responses
 #  stmt = (
 #         select(FormResponse)
@@ -7,8 +7,6 @@ from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta, datetime, timezone  # Import datetime and timezone
 from pydantic import BaseModel
-from jose import jwt, jwk, JWTError
-from jose.utils import base64url_decode
 
 
 from ...core.config import settings
@@ -22,7 +20,7 @@ from ...core.security import (
     create_access_token,
     create_refresh_token,
     verify_token,
-    get_jwks,
+    verify_clerk_token,
     sync_user_to_db,
 )
 
@@ -76,29 +74,8 @@ async def login_with_provider_data(
 ):
     print(body)
     token_str = token.credentials
-    jwks = await get_jwks()
-    unverified_header = jwt.get_unverified_header(token_str)
-    kid = unverified_header["kid"]
-
-    key_data = next((k for k in jwks if k["kid"] == kid), None)
-    if key_data is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-
-    public_key = jwk.construct(key_data)
-    message, encoded_signature = token_str.rsplit(".", 1)
-    decoded_signature = base64url_decode(encoded_signature.encode())
-
-    if not public_key.verify(message.encode(), decoded_signature):
-        raise HTTPException(status_code=401, detail="Invalid signature")
-
-    try:
-        payload = jwt.decode(
-            token_str,
-            public_key.to_pem().decode(),
-            algorithms=["RS256"],
-            options={"verify_aud": False},
-        )
-    except JWTError:
+    payload = await verify_clerk_token(token_str)
+    if payload is None:
         raise HTTPException(status_code=401, detail="Token decoding failed")
 
     # Match sub (user_id in token) with body
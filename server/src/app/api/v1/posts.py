@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...api.dependencies import get_current_superuser, get_current_user
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import ForbiddenException, NotFoundException
-from ...core.utils.cache import cache
+from ...core.utils.cache import cache, invalidate_tags
 from ...crud.crud_posts import crud_posts
 from ...crud.crud_users import crud_users
 from ...schemas.post import PostCreate, PostCreateInternal, PostRead, PostUpdate
@@ -38,6 +38,8 @@ async def write_post(
     post_internal = PostCreateInternal(**post_internal_dict)
     created_post = await crud_posts.create(db=db, object=post_internal)
 
+    await invalidate_tags(f"{username}_posts")
+
     post_read = await crud_posts.get(db=db, id=created_post.id, schema_to_select=PostRead)
     if post_read is None:
         raise NotFoundException("Created post not found")
@@ -50,6 +52,7 @@ async def write_post(
     key_prefix="{username}_posts:page_{page}:items_per_page:{items_per_page}",
     resource_id_name="username",
     expiration=60,
+    tags=["{username}_posts"],
 )
 async def read_posts(
     request: Request,
@@ -95,7 +98,7 @@ async def read_post(
 
 
 @router.patch("/{username}/post/{id}")
-@cache("{username}_post_cache", resource_id_name="id", pattern_to_invalidate_extra=["{username}_posts:*"])
+@cache("{username}_post_cache", resource_id_name="id", tags_to_invalidate=["{username}_posts"])
 async def patch_post(
     request: Request,
     username: str,
@@ -121,7 +124,7 @@ async def patch_post(
 
 
 @router.delete("/{username}/post/{id}")
-@cache("{username}_post_cache", resource_id_name="id", to_invalidate_extra={"{username}_posts": "{username}"})
+@cache("{username}_post_cache", resource_id_name="id", tags_to_invalidate=["{username}_posts"])
 async def erase_post(
     request: Request,
     username: str,
@@ -147,7 +150,7 @@ async def erase_post(
 
 
 @router.delete("/{username}/db_post/{id}", dependencies=[Depends(get_current_superuser)])
-@cache("{username}_post_cache", resource_id_name="id", to_invalidate_extra={"{username}_posts": "{username}"})
+@cache("{username}_post_cache", resource_id_name="id", tags_to_invalidate=["{username}_posts"])
 async def erase_db_post(
     request: Request, username: str, id: int, db: Annotated[AsyncSession, Depends(async_get_db)]
 ) -> dict[str, str]:
@@ -11,6 +11,7 @@ from ...crud.crud_rate_limit import crud_rate_limits
 from ...crud.crud_tier import crud_tiers
 from ...schemas.rate_limit import RateLimitCreate, RateLimitCreateInternal, RateLimitRead, RateLimitUpdate
 from ...schemas.tier import TierRead
+from ...services.rate_limit_rules import invalidate_rate_limit_rules
 
 router = APIRouter(tags=["rate_limits"])
 
@@ -33,6 +34,7 @@ async def write_rate_limit(
 
     rate_limit_internal = RateLimitCreateInternal(**rate_limit_internal_dict)
     created_rate_limit = await crud_rate_limits.create(db=db, object=rate_limit_internal)
+    await invalidate_rate_limit_rules(db)
 
     rate_limit_read = await crud_rate_limits.get(db=db, id=created_rate_limit.id, schema_to_select=RateLimitRead)
     if rate_limit_read is None:
@@ -99,6 +101,7 @@ async def patch_rate_limit(
         raise NotFoundException("Rate Limit not found")
 
     await crud_rate_limits.update(db=db, object=values, id=id)
+    await invalidate_rate_limit_rules(db)
     return {"message": "Rate Limit updated"}
 
 
@@ -116,4 +119,5 @@ async def erase_rate_limit(
         raise NotFoundException("Rate Limit not found")
 
     await crud_rate_limits.delete(db=db, id=id)
+    await invalidate_rate_limit_rules(db)
     return {"message": "Rate Limit deleted"}
@@ -9,6 +9,7 @@ from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
 from ...crud.crud_tier import crud_tiers
 from ...schemas.tier import TierCreate, TierCreateInternal, TierRead, TierUpdate
+from ...services.rate_limit_rules import invalidate_rate_limit_rules
 
 router = APIRouter(tags=["tiers"])
 
@@ -24,6 +25,7 @@ async def write_tier(
 
     tier_internal = TierCreateInternal(**tier_internal_dict)
     created_tier = await crud_tiers.create(db=db, object=tier_internal)
+    await invalidate_rate_limit_rules(db)
 
     tier_read = await crud_tiers.get(db=db, id=created_tier.id, schema_to_select=TierRead)
     if tier_read is None:
@@ -60,6 +62,7 @@ async def patch_tier(
         raise NotFoundException("Tier not found")
 
     await crud_tiers.update(db=db, object=values, name=name)
+    await invalidate_rate_limit_rules(db)
     return {"message": "Tier updated"}
 
 
@@ -70,4 +73,5 @@ async def erase_tier(request: Request, name: str, db: Annotated[AsyncSession, De
         raise NotFoundException("Tier not found")
 
     await crud_tiers.delete(db=db, name=name)
+    await invalidate_rate_limit_rules(db)
     return {"message": "Tier deleted"}
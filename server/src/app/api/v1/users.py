@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from ...api.dependencies import get_current_superuser, get_current_user
 from ...core.db.database import async_get_db
 from ...core.exceptions.http_exceptions import DuplicateValueException, ForbiddenException, NotFoundException
-from ...core.security import blacklist_token, get_password_hash, oauth2_scheme
+from ...core.security import blacklist_token, get_password_hash, invalidate_cached_user, oauth2_scheme
 from ...crud.crud_rate_limit import crud_rate_limits
 from ...crud.crud_tier import crud_tiers
 from ...crud.crud_users import crud_users
@@ -99,6 +99,7 @@ async def patch_user(
             raise DuplicateValueException("Email is already registered")
 
     await crud_users.update(db=db, object=values, username=username)
+    await invalidate_cached_user(db_user.user_id)
     return {"message": "User updated"}
 
 
@@ -118,6 +119,7 @@ async def erase_user(
         raise ForbiddenException()
 
     await crud_users.delete(db=db, username=username)
+    await invalidate_cached_user(cast(UserRead, db_user).user_id)
     await blacklist_token(token=token, db=db)
     return {"message": "User deleted"}
 
@@ -129,11 +131,12 @@ async def erase_db_user(
     db: Annotated[AsyncSession, Depends(async_get_db)],
     token: str = Depends(oauth2_scheme),
 ) -> dict[str, str]:
-    db_user = await crud_users.exists(db=db, username=username)
+    db_user = await crud_users.get(db=db, username=username, schema_to_select=UserRead)
     if not db_user:
         raise NotFoundException("User not found")
 
     await crud_users.db_delete(db=db, username=username)
+    await invalidate_cached_user(cast(UserRead, db_user).user_id)
     await blacklist_token(token=token, db=db)
     return {"message": "User deleted from the database"}
 
@@ -205,4 +208,6 @@ async def patch_user_tier(
         raise NotFoundException("Tier not found")
 
     await crud_users.update(db=db, object=values.model_dump(), username=username)
+    # The cached session carries the tier read by the rate limiter
+    await invalidate_cached_user(db_user.user_id)
     return {"message": f"User {db_user.name} Tier updated"}
@@ -4,14 +4,15 @@ from datetime import datetime, UTC
 import base64
 import json
 
-from fastapi import APIRouter, Depends, Request, Response, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, Depends, Query, Request, Response, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession  # type: ignore
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from ...api.dependencies import get_optional_user, get_current_user
 from ...core.db.database import async_get_db
+from ...core.schemas import CursorPaginatedListResponse
 from ...core.exceptions.http_exceptions import (
     ForbiddenException,
     NotFoundException,
@@ -19,6 +20,7 @@ from ...core.exceptions.http_exceptions import (
     UnauthorizedException,
 )
 from ...core.utils.cache import cache
+from ...core.utils.pagination import fetch_keyset_page
 from ...crud.crud_users import crud_users
 from ...crud.form.form_field import crud_form_fields
 from ...crud.webhook.crud_webhooks import crud_webhooks
@@ -30,8 +32,23 @@ from ...schemas.webhook.webhook import (
     WebhookRead,
     WebhookUpdate,
 )
+from ...schemas.webhook.webhook_response import WebhookResponseRead
 from ...models.webhook.webhook import Webhook, AuthType
 from app.models.webhook.webhook_response import WebhookResponse
+from app.services.export import (
+    WEBHOOK_EXPORT_COLUMNS,
+    ExportFormat,
+    export_response,
+    iter_webhook_events,
+)
+from app.services.webhook_events import record_webhook_event
+from app.services.workflow_access import ensure_workflow_owner
+from app.services.workflow_runner import enqueue_workflow_run
+from app.services.webhook_dispatch_cache import (
+    auth_matches,
+    get_dispatch_record,
+    invalidate_dispatch_record,
+)
 
 from app.services.generate_form_html import generate_form_html
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -98,6 +115,7 @@ async def create_webhook(
             )
 
         await crud_webhooks.update(db=db, object=update_data, id=workflow_id)
+        await invalidate_dispatch_record(workflow_id)
         webhook_read = await crud_webhooks.get(
             db=db, id=workflow_id, schema_to_select=WebhookRead
         )
@@ -111,6 +129,8 @@ async def create_webhook(
     print(webhook_internal_dict)
     webhook_internal = WebhookCreateInternal(**webhook_internal_dict)
     created_webhook = await crud_webhooks.create(db=db, object=webhook_internal)
+    # Drop a cached "not found" for this id
+    await invalidate_dispatch_record(created_webhook.id)
 
     webhook_read = await crud_webhooks.get(
         db=db, id=created_webhook.id, schema_to_select=WebhookRead
@@ -141,16 +161,17 @@ async def update_webhook(
     if not update_data:
         raise BadRequestException(status_code=400, detail="No valid fields to update.")
 
-    updated_form = await crud_webhooks.update(db=db, object=update_data, id=update.id)
+    updated_form = await crud_webhooks.update(db=db, object=update_data, id=webhook_id)
+    await invalidate_dispatch_record(webhook_id)
 
     return {"message": "Post updated"}
 
 
 @router.delete(
-    "/form/{workflow_id}",
+    "/webhook/{workflow_id}",
     status_code=204,
 )
-async def delete_form(
+async def delete_webhook(
     request: Request,
     workflow_id: str,
     current_user: Annotated[dict, Depends(get_current_user)],
@@ -162,9 +183,10 @@ async def delete_form(
     )
 
     if webhook_read is None:
-        raise NotFoundException("Form not found")
+        raise NotFoundException("Webhook not found")
 
-    await webhook_read.db_delete(db=db, id=workflow_id)
+    await crud_webhooks.db_delete(db=db, id=workflow_id)
+    await invalidate_dispatch_record(workflow_id)
 
     # HTTP 204 = No Content (typical for DELETE success)
     return Response(status_code=204)
@@ -173,6 +195,54 @@ async def delete_form(
 # ---------------------------------------------------EVENTS------------------------------------------------------------
 
 
+@router.get(
+    "/webhook/{webhook_id}/events",
+    response_model=CursorPaginatedListResponse[WebhookResponseRead],
+)
+async def read_webhook_events(
+    webhook_id: UUID,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=500)] = 50,
+) -> dict:
+    webhook = await get_dispatch_record(db, webhook_id)
+    if webhook is None:
+        raise NotFoundException("Webhook not found")
+    await ensure_workflow_owner(db, webhook.workflow_id, current_user.user_id)
+
+    events, next_cursor = await fetch_keyset_page(
+        db,
+        select(WebhookResponse).where(WebhookResponse.webhook_id == webhook_id),
+        WebhookResponse.timestamp,
+        WebhookResponse.id,
+        cursor,
+        limit,
+    )
+
+    return {"data": events, "next_cursor": next_cursor}
+
+
+@router.get("/webhook/{webhook_id}/events/export")
+async def export_webhook_events(
+    webhook_id: UUID,
+    current_user: Annotated[dict, Depends(get_current_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db)],
+    format: ExportFormat = ExportFormat.CSV,
+) -> StreamingResponse:
+    webhook = await get_dispatch_record(db, webhook_id)
+    if webhook is None:
+        raise NotFoundException("Webhook not found")
+    await ensure_workflow_owner(db, webhook.workflow_id, current_user.user_id)
+
+    return export_response(
+        iter_webhook_events(webhook_id),
+        WEBHOOK_EXPORT_COLUMNS,
+        format,
+        filename=f"webhook-{webhook_id}-events",
+    )
+
+
 @router.api_route("/webhooks/{webhook_id}/events", methods=["POST", "GET"])
 async def handle_external_webhook(
     webhook_id: UUID,
@@ -181,13 +251,7 @@ async def handle_external_webhook(
 ) -> Response:
 
     # 1. Fetch webhook
-    stmt = (
-        select(Webhook)
-        .where(Webhook.id == webhook_id)
-        .options(selectinload(Webhook.credentials))
-    )
-    result = await db.execute(stmt)
-    webhook = result.scalar_one_or_none()
+    webhook = await get_dispatch_record(db, webhook_id)
 
     if not webhook:
         raise HTTPException(status_code=404, detail="Webhook not found")
@@ -206,18 +270,16 @@ async def handle_external_webhook(
         auth_header = request.headers.get("Authorization")
 
         if webhook.auth_type == AuthType.BEARER:
-            expected = f"Bearer {webhook.credentials.bearer_token}"
-            if not auth_header or auth_header != expected:
+            if not auth_matches(webhook, auth_header):
                 return unauthorized("Invalid Bearer token")
 
         elif webhook.auth_type == AuthType.CUSTOM:
-            expected = f"{webhook.credentials.custom_token}"
-            if not auth_header or auth_header != expected:
+            if not auth_matches(webhook, auth_header):
                 return unauthorized("Invalid Custom token")
 
         elif webhook.auth_type == AuthType.API_KEY:
-            api_key = request.headers.get("x-api-key")
-            if not api_key or api_key != webhook.credentials.api_key:
+            api_key = request.headers.get(webhook.api_key_header)
+            if not auth_matches(webhook, api_key):
                 return unauthorized("Invalid API key")
 
         elif webhook.auth_type == AuthType.BASIC:
@@ -227,14 +289,12 @@ async def handle_external_webhook(
             try:
                 encoded = auth_header.split(" ")[1]
                 decoded = base64.b64decode(encoded).decode("utf-8")
-                username, password = decoded.split(":", 1)
-                if (
-                    username != webhook.credentials.basic_username
-                    or password != webhook.credentials.basic_password
-                ):
-                    return unauthorized("Basic Auth credentials mismatch")
             except Exception:
                 return unauthorized("Invalid Basic Auth header")
+            if ":" not in decoded:
+                return unauthorized("Invalid Basic Auth header")
+            if not auth_matches(webhook, decoded):
+                return unauthorized("Basic Auth credentials mismatch")
 
     # 3. Validate Content-Type header
     content_type = request.headers.get("Content-Type", "").lower()
@@ -250,16 +310,18 @@ async def handle_external_webhook(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
-    print("json_body_str", json_body_str)
-    # Trigger graph
+    # Trigger graph on the arq workers, the sender only waits for the enqueue.
+    # The event is stored with the status the sender actually gets.
+    try:
+        run_id = await enqueue_workflow_run(
+            webhook.workflow_id, {"webhook-trigger": body}
+        )
+    except RuntimeError as e:
+        await record_webhook_event(webhook.id, 503, json_body_str)
+        raise HTTPException(status_code=503, detail=str(e))
 
-    response_record = WebhookResponse(
-        webhook_id=webhook.id,
-        status_code=200,
-        response_body=json_body_str,
-        # timestamp=datetime.now(UTC),
-    )
-    db.add(response_record)
-    await db.commit()
+    await record_webhook_event(webhook.id, 202, json_body_str)
 
-    return JSONResponse(content={"message": "Webhook received"}, status_code=200)
+    return JSONResponse(
+        content={"message": "Webhook received", "run_id": run_id}, status_code=202
+    )
@@ -25,6 +25,15 @@ from app.schemas.workflow import (
 )
 from app.schemas.user import UserRead
 from app.schemas.project import ProjectRead
+from app.services.form_definition_cache import (
+    get_workflow_form_ids,
+    invalidate_form_definition,
+)
+from app.services.webhook_dispatch_cache import (
+    get_workflow_webhook_ids,
+    invalidate_dispatch_record,
+)
+from app.services.workflow_definition_cache import invalidate_workflow_definition
 
 router = APIRouter(tags=["workflows"])
 
@@ -207,6 +216,7 @@ async def patch_workflow(
         raise UnauthorizedException()
 
     await crud_workflows.update(db=db, object=values, id=workflow_id)
+    await invalidate_workflow_definition(workflow_id)
     return {"message": "Workflow updated!"}
 
 
@@ -256,5 +266,14 @@ async def erase_db_post(
         )
         raise UnauthorizedException()
 
+    # The delete cascades to the workflow's forms and webhooks, their cached copies must go too
+    form_ids = await get_workflow_form_ids(db, workflow_id)
+    webhook_ids = await get_workflow_webhook_ids(db, workflow_id)
+
     await crud_workflows.db_delete(db=db, id=workflow_id)
+    await invalidate_workflow_definition(workflow_id)
+    for form_id in form_ids:
+        await invalidate_form_definition(form_id)
+    for webhook_id in webhook_ids:
+        await invalidate_dispatch_record(webhook_id)
     return {"message": "Workflow deleted sucessfully."}
@@ -24,6 +24,14 @@ class ClerkSettings(BaseSettings):
         "CLERK_JWKS_URL",
         default="https://balanced-goldfish-53.clerk.accounts.dev/.well-known/jwks.json",
     )
+    CLERK_JWKS_CACHE_TTL: int = config("CLERK_JWKS_CACHE_TTL", default=3600)
+    CLERK_JWKS_MIN_REFETCH_INTERVAL: int = config(
+        "CLERK_JWKS_MIN_REFETCH_INTERVAL", default=30
+    )
+    CLERK_TOKEN_CACHE_SIZE: int = config("CLERK_TOKEN_CACHE_SIZE", default=4096)
+    CLERK_USER_CACHE_SIZE: int = config("CLERK_USER_CACHE_SIZE", default=4096)
+    CLERK_USER_CACHE_TTL: int = config("CLERK_USER_CACHE_TTL", default=60)
+    CLERK_USER_REDIS_CACHE_TTL: int = config("CLERK_USER_REDIS_CACHE_TTL", default=300)
 
 
 class CryptSettings(BaseSettings):
@@ -90,6 +98,10 @@ class RedisCacheSettings(BaseSettings):
     REDIS_CACHE_HOST: str = config("REDIS_CACHE_HOST", default="localhost")
     REDIS_CACHE_PORT: int = config("REDIS_CACHE_PORT", default=6379)
     REDIS_CACHE_URL: str = f"redis://{REDIS_CACHE_HOST}:{REDIS_CACHE_PORT}"
+    # Pub/sub channel telling every process to evict its in-process (L1) cache entries
+    CACHE_INVALIDATION_CHANNEL: str = config(
+        "CACHE_INVALIDATION_CHANNEL", default="cache:invalidate"
+    )
 
 
 class ClientSideCacheSettings(BaseSettings):
@@ -112,6 +124,90 @@ class RedisRateLimiterSettings(BaseSettings):
 class DefaultRateLimitSettings(BaseSettings):
     DEFAULT_RATE_LIMIT_LIMIT: int = config("DEFAULT_RATE_LIMIT_LIMIT", default=10)
     DEFAULT_RATE_LIMIT_PERIOD: int = config("DEFAULT_RATE_LIMIT_PERIOD", default=3600)
+    # The (tier, path) rule table is reloaded on admin changes, and at least this often
+    RATE_LIMIT_RULES_TTL: int = config("RATE_LIMIT_RULES_TTL", default=300)
+
+
+class HTTPClientSettings(BaseSettings):
+    HTTP_CLIENT_TIMEOUT: float = config("HTTP_CLIENT_TIMEOUT", default=30.0)
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = config(
+        "HTTP_CLIENT_CONNECT_TIMEOUT", default=5.0
+    )
+    HTTP_CLIENT_MAX_CONNECTIONS: int = config("HTTP_CLIENT_MAX_CONNECTIONS", default=100)
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = config(
+        "HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS", default=20
+    )
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = config(
+        "HTTP_CLIENT_KEEPALIVE_EXPIRY", default=30.0
+    )
+    HTTP_CLIENT_HTTP2: bool = config("HTTP_CLIENT_HTTP2", default=True)
+
+
+class WorkflowEngineSettings(BaseSettings):
+    WORKFLOW_GRAPH_CACHE_SIZE: int = config("WORKFLOW_GRAPH_CACHE_SIZE", default=256)
+    WORKFLOW_CACHE_SIZE: int = config("WORKFLOW_CACHE_SIZE", default=1024)
+    WORKFLOW_CACHE_TTL: int = config("WORKFLOW_CACHE_TTL", default=60)
+    WORKFLOW_REDIS_CACHE_TTL: int = config("WORKFLOW_REDIS_CACHE_TTL", default=3600)
+    WORKFLOW_RUN_TIMEOUT: int = config("WORKFLOW_RUN_TIMEOUT", default=600)
+    # Runs of one workflow executing at the same time across all workers, 0 disables the limit
+    WORKFLOW_MAX_CONCURRENT_RUNS: int = config("WORKFLOW_MAX_CONCURRENT_RUNS", default=5)
+    WORKFLOW_RUN_RETRY_DELAY: int = config("WORKFLOW_RUN_RETRY_DELAY", default=2)
+    WORKFLOW_RUN_MAX_TRIES: int = config("WORKFLOW_RUN_MAX_TRIES", default=50)
+    # Node events of a run are batched over this window before being streamed
+    WORKFLOW_PROGRESS_WINDOW_MS: int = config("WORKFLOW_PROGRESS_WINDOW_MS", default=50)
+    WORKFLOW_RUN_HISTORY_ENABLED: bool = config("WORKFLOW_RUN_HISTORY_ENABLED", default=True)
+    # Node outputs are stored as JSON cut to this many characters
+    WORKFLOW_RUN_OUTPUT_MAX_CHARS: int = config("WORKFLOW_RUN_OUTPUT_MAX_CHARS", default=4096)
+    WORKFLOW_RUN_HISTORY_BATCH_SIZE: int = config("WORKFLOW_RUN_HISTORY_BATCH_SIZE", default=500)
+    WORKFLOW_RUN_HISTORY_FLUSH_INTERVAL_MS: int = config(
+        "WORKFLOW_RUN_HISTORY_FLUSH_INTERVAL_MS", default=1000
+    )
+    WORKFLOW_RUN_HISTORY_BUFFER_SIZE: int = config(
+        "WORKFLOW_RUN_HISTORY_BUFFER_SIZE", default=50_000
+    )
+    CREDENTIAL_CACHE_SIZE: int = config("CREDENTIAL_CACHE_SIZE", default=1024)
+    CREDENTIAL_CACHE_TTL: int = config("CREDENTIAL_CACHE_TTL", default=300)
+
+
+class FormResponseStorage(Enum):
+    EAV = "eav"
+    JSONB = "jsonb"
+
+
+class FormSettings(BaseSettings):
+    FORM_CACHE_SIZE: int = config("FORM_CACHE_SIZE", default=1024)
+    FORM_CACHE_TTL: int = config("FORM_CACHE_TTL", default=300)
+    FORM_REDIS_CACHE_TTL: int = config("FORM_REDIS_CACHE_TTL", default=3600)
+    # "eav" writes one form_response_value row per field, "jsonb" a single answers document
+    FORM_RESPONSE_STORAGE: FormResponseStorage = config(
+        "FORM_RESPONSE_STORAGE", default=FormResponseStorage.EAV
+    )
+    # Cache-Control of the public form page, lets a CDN or reverse proxy serve it
+    FORM_HTML_CACHE_CONTROL: str = config(
+        "FORM_HTML_CACHE_CONTROL", default="public, max-age=60, s-maxage=300"
+    )
+
+
+class WebhookSettings(BaseSettings):
+    WEBHOOK_CACHE_SIZE: int = config("WEBHOOK_CACHE_SIZE", default=4096)
+    WEBHOOK_CACHE_TTL: int = config("WEBHOOK_CACHE_TTL", default=30)
+    WEBHOOK_REDIS_CACHE_TTL: int = config("WEBHOOK_REDIS_CACHE_TTL", default=300)
+    WEBHOOK_NEGATIVE_CACHE_TTL: int = config("WEBHOOK_NEGATIVE_CACHE_TTL", default=30)
+    WEBHOOK_EVENT_BATCH_SIZE: int = config("WEBHOOK_EVENT_BATCH_SIZE", default=500)
+    WEBHOOK_EVENT_FLUSH_INTERVAL_MS: int = config(
+        "WEBHOOK_EVENT_FLUSH_INTERVAL_MS", default=200
+    )
+    WEBHOOK_EVENT_BUFFER_SIZE: int = config("WEBHOOK_EVENT_BUFFER_SIZE", default=50_000)
+    # Wait for the event's batch to be committed before answering the webhook
+    WEBHOOK_EVENT_DURABLE: bool = config("WEBHOOK_EVENT_DURABLE", default=False)
+
+
+class WebSocketSettings(BaseSettings):
+    # Pub/sub channel carrying websocket messages between processes
+    WS_EVENTS_CHANNEL: str = config("WS_EVENTS_CHANNEL", default="ws:events")
+    WS_HEARTBEAT_INTERVAL: float = config("WS_HEARTBEAT_INTERVAL", default=20.0)
+    WS_IDLE_TIMEOUT: float = config("WS_IDLE_TIMEOUT", default=120.0)
+    WS_SEND_TIMEOUT: float = config("WS_SEND_TIMEOUT", default=5.0)
 
 
 class CRUDAdminSettings(BaseSettings):
@@ -160,6 +256,11 @@ class Settings(
     RedisQueueSettings,
     RedisRateLimiterSettings,
     DefaultRateLimitSettings,
+    HTTPClientSettings,
+    WorkflowEngineSettings,
+    FormSettings,
+    WebhookSettings,
+    WebSocketSettings,
     CRUDAdminSettings,
     EnvironmentSettings,
     ClerkSettings,
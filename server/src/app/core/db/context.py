@@ -1,5 +1,22 @@
 # app/core/db/context.py
+import asyncio
 from contextvars import ContextVar
+from weakref import WeakKeyDictionary
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
 db_context: ContextVar[AsyncSession] = ContextVar("db_context")
+
+_session_locks: "WeakKeyDictionary[AsyncSession, asyncio.Lock]" = WeakKeyDictionary()
+
+
+def session_lock(db: AsyncSession) -> asyncio.Lock:
+    """Lock guarding a shared session.
+
+    An AsyncSession can't run two statements at once, and parallel workflow branches
+    share the one published through `db_context`.
+    """
+    lock = _session_locks.get(db)
+    if lock is None:
+        lock = _session_locks[db] = asyncio.Lock()
+    return lock
@@ -1,7 +1,7 @@
 import uuid as uuid_pkg
 import uuid_utils
 from datetime import UTC, datetime
-from typing import Any
+from typing import Any, Generic, TypeVar
 
 from pydantic import BaseModel, Field, field_serializer
 
@@ -52,6 +52,16 @@ class PersistentDeletion(BaseModel):
         return None
 
 
+# -------------- pagination --------------
+SchemaType = TypeVar("SchemaType")
+
+
+class CursorPaginatedListResponse(BaseModel, Generic[SchemaType]):
+    data: list[SchemaType]
+    # Pass back as `cursor` to get the next page, `None` on the last page
+    next_cursor: str | None = None
+
+
 # -------------- token --------------
 class Token(BaseModel):
     access_token: str
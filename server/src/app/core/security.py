@@ -1,23 +1,35 @@
-from datetime import UTC, datetime, timedelta, timezone
+import asyncio
+import hashlib
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
 from enum import Enum
 from typing import Any, Literal, cast, Optional
-import httpx
 
 import bcrypt
+import uuid_utils
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from pydantic import SecretStr
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 
 from ..crud.crud_users import crud_users
 from .config import settings
 from .db.crud_token_blacklist import crud_token_blacklist
 from .schemas import TokenBlacklistCreate, TokenData
+from .utils import http_client
+from .utils.cache import TwoTierCache
+from .utils.lru_cache import LRUCache
 from .db.database import async_get_db
 
 from ..models.user import User
+from ..schemas.user import UserSession
+from .logger import logging
+
+logger = logging.getLogger(__name__)
 
 SECRET_KEY: SecretStr = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -175,32 +187,154 @@ async def blacklist_token(token: str, db: AsyncSession) -> None:
         )
 
 
+# Clerk `sub` -> UserSession
+user_cache = TwoTierCache(
+    "user",
+    maxsize=settings.CLERK_USER_CACHE_SIZE,
+    ttl=settings.CLERK_USER_CACHE_TTL,
+    expiration=settings.CLERK_USER_REDIS_CACHE_TTL,
+    schema=UserSession,
+)
+
+
+async def invalidate_cached_user(user_id: str) -> None:
+    await user_cache.delete(user_id)
+
+
 async def sync_user_to_db(
     user_id: str,
     email: str,
     db: AsyncSession,
-    last_sign_in_at: datetime = datetime.now(timezone.utc),
+    last_sign_in_at: datetime | None = None,
     image_url: Optional[str] = None,
     full_name: Optional[str] = None,
     created_at: Optional[datetime] = None,
-):
-    result = await db.execute(select(User).where(User.user_id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        user = User(
-            user_id=user_id,
-            email=email,
-            image_url=image_url,
-            full_name=full_name,
-            last_sign_in_at=last_sign_in_at,
-            created_at=created_at,
+) -> UserSession:
+    """Return the user with Clerk id `user_id`, creating it on first sign in.
+
+    Users are looked up in the process cache, then Redis, and only then in the
+    database, where a missing row is inserted with `ON CONFLICT DO NOTHING` so
+    concurrent first requests of the same user don't race.
+    """
+    user = await user_cache.get(user_id)
+    if user is None:
+        now = datetime.now(UTC)
+        await db.execute(
+            insert(User)
+            .values(
+                id=uuid.UUID(str(uuid_utils.uuid7())),
+                user_id=user_id,
+                email=email,
+                full_name=full_name or "",
+                image_url=image_url or "https://profileimageurl.com",
+                last_sign_in_at=last_sign_in_at or now,
+                created_at=created_at or now,
+                is_deleted=False,
+                is_superuser=False,
+            )
+            .on_conflict_do_nothing()
         )
-        db.add(user)
         await db.commit()
+
+        result = await db.execute(select(User).where(User.user_id == user_id))
+        user = await user_cache.set(
+            user_id, UserSession.model_validate(result.scalar_one())
+        )
+
     return user
 
 
 async def get_jwks():
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(CLERK_JWKS_URL)
-        return resp.json()["keys"]
+    resp = await http_client.get_client().get(CLERK_JWKS_URL)
+    return resp.json()["keys"]
+
+
+class JWKSCache:
+    """Clerk signing keys indexed by `kid`, kept as constructed public key objects.
+
+    Keys are fetched on first use and refreshed in the background once older than `ttl`,
+    so token verification never waits on the JWKS endpoint after warm-up. An unknown `kid`
+    (key rotation) triggers one synchronous refetch, at most every `min_refetch_interval`
+    seconds so forged tokens can't hammer the endpoint.
+    """
+
+    def __init__(self, ttl: int, min_refetch_interval: int) -> None:
+        self.ttl = ttl
+        self.min_refetch_interval = min_refetch_interval
+        self._keys: dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_task: asyncio.Task | None = None
+
+    async def refresh(self, min_age: float = 0) -> None:
+        async with self._lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._keys and time.monotonic() - self._fetched_at < min_age:
+                return
+
+            jwks = await get_jwks()
+            self._keys = {key["kid"]: jwk.construct(key) for key in jwks if "kid" in key}
+            self._fetched_at = time.monotonic()
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh(min_age=self.ttl)
+        except Exception as e:
+            logger.warning(f"Background JWKS refresh failed, keeping cached keys: {e}")
+
+    async def get_key(self, kid: str) -> Any | None:
+        if not self._keys:
+            await self.refresh(min_age=self.min_refetch_interval)
+        elif time.monotonic() - self._fetched_at > self.ttl:
+            if self._refresh_task is None or self._refresh_task.done():
+                self._refresh_task = asyncio.create_task(self._refresh_quietly())
+
+        key = self._keys.get(kid)
+        if key is None and time.monotonic() - self._fetched_at > self.min_refetch_interval:
+            await self.refresh(min_age=self.min_refetch_interval)
+            key = self._keys.get(kid)
+        return key
+
+
+jwks_cache = JWKSCache(
+    ttl=settings.CLERK_JWKS_CACHE_TTL,
+    min_refetch_interval=settings.CLERK_JWKS_MIN_REFETCH_INTERVAL,
+)
+
+# sha256(token) -> decoded claims, kept until the token's `exp`
+verified_token_cache = LRUCache(maxsize=settings.CLERK_TOKEN_CACHE_SIZE)
+
+
+async def verify_clerk_token(token_str: str) -> dict[str, Any] | None:
+    """Verify a Clerk session token and return its claims, or `None` if it is invalid.
+
+    Verified claims are cached under a hash of the token until the token expires, so
+    repeated requests with the same token skip the signature check.
+    """
+    token_hash = hashlib.sha256(token_str.encode()).hexdigest()
+    claims = verified_token_cache.get(token_hash)
+    if claims is not None:
+        return claims
+
+    try:
+        kid = jwt.get_unverified_header(token_str).get("kid")
+        public_key = await jwks_cache.get_key(kid) if kid else None
+        if public_key is None:
+            return None
+
+        claims = jwt.decode(
+            token_str,
+            public_key,
+            algorithms=["RS256"],
+            options={"verify_aud": False},
+        )
+    except JWTError:
+        return None
+
+    exp = claims.get("exp")
+    if exp is not None:
+        ttl = exp - datetime.now(UTC).timestamp()
+        if ttl > 0:
+            verified_token_cache.set(token_hash, claims, ttl=ttl)
+
+    return claims
@@ -1,5 +1,6 @@
+import asyncio
 from collections.abc import AsyncGenerator, Callable
-from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
+from contextlib import _AsyncGeneratorContextManager, asynccontextmanager, suppress
 from typing import Any
 
 import anyio
@@ -21,14 +22,22 @@ from .config import (
     DatabaseSettings,
     EnvironmentOption,
     EnvironmentSettings,
+    HTTPClientSettings,
     RedisCacheSettings,
     RedisQueueSettings,
     RedisRateLimiterSettings,
+    WebhookSettings,
+    WebSocketSettings,
+    WorkflowEngineSettings,
     settings,
 )
 from .db.database import Base
 from .db.database import async_engine as engine
-from .utils import cache, queue
+from .db.database import local_session
+from .utils import cache, http_client, queue
+from .websoket_store import connection_manager
+from ..services import run_history, webhook_events
+from ..services.rate_limit_rules import rate_limit_rules
 from app.scheduler import scheduler, start_scheduler
 
 # -------------- jobs --------------
@@ -44,6 +53,19 @@ async def create_tables() -> None:
 async def create_redis_cache_pool() -> None:
     cache.pool = redis.ConnectionPool.from_url(settings.REDIS_CACHE_URL)
     cache.client = redis.Redis.from_pool(cache.pool)  # type: ignore
+    cache.invalidation_channel = settings.CACHE_INVALIDATION_CHANNEL
+
+
+async def start_cache_invalidation_listener() -> None:
+    cache.invalidation_listener = asyncio.create_task(cache.listen_for_invalidations())
+
+
+async def stop_cache_invalidation_listener() -> None:
+    if cache.invalidation_listener is not None:
+        cache.invalidation_listener.cancel()
+        with suppress(asyncio.CancelledError):
+            await cache.invalidation_listener
+        cache.invalidation_listener = None
 
 
 async def close_redis_cache_pool() -> None:
@@ -68,11 +90,66 @@ async def create_redis_rate_limit_pool() -> None:
     rate_limiter.initialize(settings.REDIS_RATE_LIMIT_URL)  # type: ignore
 
 
+async def load_rate_limit_rules() -> None:
+    async with local_session() as db:
+        await rate_limit_rules.load(db)
+
+
 async def close_redis_rate_limit_pool() -> None:
     if rate_limiter.client is not None:
         await rate_limiter.client.aclose()  # type: ignore
 
 
+# -------------- http client --------------
+async def create_http_client() -> None:
+    http_client.client = http_client.build_client(settings)
+
+
+async def close_http_client() -> None:
+    if http_client.client is not None:
+        await http_client.client.aclose()
+        http_client.client = None
+
+
+# -------------- webhook events --------------
+async def start_webhook_event_writer() -> None:
+    webhook_events.webhook_response_writer.start()
+
+
+async def close_webhook_event_writer() -> None:
+    await webhook_events.webhook_response_writer.close()
+
+
+# -------------- run history --------------
+async def start_run_history_writers() -> None:
+    run_history.workflow_run_writer.start()
+    run_history.workflow_node_run_writer.start()
+
+
+async def close_run_history_writers() -> None:
+    await run_history.workflow_run_writer.close()
+    await run_history.workflow_node_run_writer.close()
+
+
+# -------------- websockets --------------
+_websocket_tasks: list[asyncio.Task] = []
+
+
+async def start_websocket_manager() -> None:
+    _websocket_tasks.append(asyncio.create_task(connection_manager.heartbeat()))
+    if cache.client is not None:
+        _websocket_tasks.append(asyncio.create_task(connection_manager.listen()))
+
+
+async def stop_websocket_manager() -> None:
+    for task in _websocket_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    _websocket_tasks.clear()
+    await connection_manager.close_all()
+
+
 # -------------- application --------------
 async def set_threadpool_tokens(number_of_tokens: int = 100) -> None:
     limiter = anyio.to_thread.current_default_thread_limiter()
@@ -87,6 +164,10 @@ def lifespan_factory(
         | ClientSideCacheSettings
         | RedisQueueSettings
         | RedisRateLimiterSettings
+        | HTTPClientSettings
+        | WebhookSettings
+        | WebSocketSettings
+        | WorkflowEngineSettings
         | EnvironmentSettings
     ),
     create_tables_on_start: bool = True,
@@ -105,6 +186,7 @@ def lifespan_factory(
         try:
             if isinstance(settings, RedisCacheSettings):
                 await create_redis_cache_pool()
+                await start_cache_invalidation_listener()
 
             if isinstance(settings, RedisQueueSettings):
                 await create_redis_queue_pool()
@@ -112,9 +194,24 @@ def lifespan_factory(
             if isinstance(settings, RedisRateLimiterSettings):
                 await create_redis_rate_limit_pool()
 
+            if isinstance(settings, HTTPClientSettings):
+                await create_http_client()
+
+            if isinstance(settings, WebhookSettings):
+                await start_webhook_event_writer()
+
+            if isinstance(settings, WebSocketSettings):
+                await start_websocket_manager()
+
+            if isinstance(settings, WorkflowEngineSettings):
+                await start_run_history_writers()
+
             if create_tables_on_start:
                 await create_tables()
 
+            if isinstance(settings, RedisRateLimiterSettings):
+                await load_rate_limit_rules()
+
             start_scheduler()
 
             initialization_complete.set()
@@ -122,7 +219,11 @@ def lifespan_factory(
             yield
 
         finally:
+            if isinstance(settings, WebSocketSettings):
+                await stop_websocket_manager()
+
             if isinstance(settings, RedisCacheSettings):
+                await stop_cache_invalidation_listener()
                 await close_redis_cache_pool()
 
             if isinstance(settings, RedisQueueSettings):
@@ -130,6 +231,15 @@ def lifespan_factory(
 
             if isinstance(settings, RedisRateLimiterSettings):
                 await close_redis_rate_limit_pool()
+
+            if isinstance(settings, WebhookSettings):
+                await close_webhook_event_writer()
+
+            if isinstance(settings, WorkflowEngineSettings):
+                await close_run_history_writers()
+
+            if isinstance(settings, HTTPClientSettings):
+                await close_http_client()
             scheduler.shutdown()
 
     return lifespan
@@ -145,6 +255,10 @@ def create_application(
         | ClientSideCacheSettings
         | RedisQueueSettings
         | RedisRateLimiterSettings
+        | HTTPClientSettings
+        | WebhookSettings
+        | WebSocketSettings
+        | WorkflowEngineSettings
         | EnvironmentSettings
     ),
     create_tables_on_start: bool = True,
@@ -171,6 +285,8 @@ def create_application(
         - ClientSideCacheSettings: Integrates middleware for client-side caching.
         - RedisQueueSettings: Sets up event handlers for creating and closing a Redis queue pool.
         - RedisRateLimiterSettings: Sets up event handlers for creating and closing a Redis rate limiter pool.
+        - HTTPClientSettings: Sets up event handlers for creating and closing the shared outbound HTTP client.
+        - WebhookSettings: Starts the webhook event batch writer and flushes it on shutdown.
         - EnvironmentSettings: Conditionally sets documentation URLs and integrates custom routes for API documentation
           based on the environment type.
 
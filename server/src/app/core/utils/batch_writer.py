@@ -0,0 +1,166 @@
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..logger import logging
+
+logger = logging.getLogger(__name__)
+
+# (row, future resolved once the row is committed for durable rows, failed write attempts)
+_Entry = tuple[dict[str, Any], asyncio.Future | None, int]
+
+
+class BatchWriter:
+    """In-process write buffer that stores rows of one table with multi-row INSERTs.
+
+    Rows are flushed by a background task once `max_batch_size` rows are buffered or
+    every `flush_interval` seconds, whichever comes first.
+
+    Parameters
+    ----------
+    model: type
+        The SQLAlchemy model of the table rows are written to.
+    session_factory: Callable[[], AsyncSession]
+        Factory of the sessions used for flushing, e.g. `local_session`.
+    max_batch_size: int, optional
+        Number of rows that triggers a flush, and the size of one INSERT statement.
+    flush_interval: float, optional
+        Maximum time in seconds a row waits in the buffer.
+    max_buffer_size: int, optional
+        Rows kept in memory before `add` flushes inline, which applies backpressure to callers.
+    max_attempts: int, optional
+        Flushes a row may fail, e.g. while the database is unreachable, before it is dropped.
+
+    Note
+    ----
+        - Rows must contain every column value, model defaults built in Python are not applied.
+        - Buffered rows are lost if the process dies before a flush. Callers that need the
+          row stored before responding pass `durable=True` to `add`, which waits for the
+          flush of its batch (group commit).
+        - A batch the database rejects (constraint or data error) is split in halves until the
+          offending rows are isolated: they are logged and dropped, the others are written.
+    """
+
+    def __init__(
+        self,
+        model: type,
+        session_factory: Callable[[], AsyncSession],
+        max_batch_size: int = 500,
+        flush_interval: float = 0.2,
+        max_buffer_size: int = 50_000,
+        max_attempts: int = 5,
+    ) -> None:
+        self.model = model
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer_size = max_buffer_size
+        self.max_attempts = max_attempts
+        self._buffer: list[_Entry] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def add(self, row: dict[str, Any], durable: bool = False) -> None:
+        waiter = asyncio.get_running_loop().create_future() if durable else None
+        self._buffer.append((row, waiter, 0))
+
+        if not self.running or len(self._buffer) >= self.max_buffer_size:
+            await self.flush()
+        elif len(self._buffer) >= self.max_batch_size:
+            self._wakeup.set()
+
+        if waiter is not None:
+            await waiter
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+
+            batch, self._buffer = self._buffer, []
+            retry: list[_Entry] = []
+            for start in range(0, len(batch), self.max_batch_size):
+                retry += await self._write(batch[start : start + self.max_batch_size])
+
+            if retry:
+                room = max(self.max_buffer_size - len(self._buffer), 0)
+                if len(retry) > room:
+                    logger.error(
+                        f"Dropping {len(retry) - room} {self.model.__tablename__} rows, buffer is full"
+                    )
+                self._buffer[:0] = retry[:room]
+
+    async def _write(self, batch: list[_Entry]) -> list[_Entry]:
+        """Insert `batch` in one transaction and return the entries to retry with the next flush."""
+        table = self.model.__tablename__
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(self.model).values([row for row, _, _ in batch]))
+                await session.commit()
+        except (IntegrityError, DataError) as e:
+            # Retrying would fail again, and would fail every row flushed with this one
+            if len(batch) == 1:
+                logger.error(f"Dropping {table} row rejected by the database: {e}")
+                self._resolve(batch, e)
+                return []
+            middle = len(batch) // 2
+            return await self._write(batch[:middle]) + await self._write(batch[middle:])
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} {table} rows: {e}")
+            # Durable callers get the error, the rest is retried until max_attempts
+            self._resolve([entry for entry in batch if entry[1] is not None], e)
+            retry = [
+                (row, None, attempts + 1)
+                for row, waiter, attempts in batch
+                if waiter is None and attempts + 1 < self.max_attempts
+            ]
+            dropped = sum(1 for entry in batch if entry[1] is None) - len(retry)
+            if dropped:
+                logger.error(f"Dropping {dropped} {table} rows after {self.max_attempts} failed writes")
+            return retry
+
+        self._resolve(batch)
+        return []
+
+    @staticmethod
+    def _resolve(batch: list[_Entry], error: Exception | None = None) -> None:
+        for _, waiter, _ in batch:
+            if waiter is None or waiter.done():
+                continue
+            if error is None:
+                waiter.set_result(None)
+            else:
+                waiter.set_exception(error)
@@ -1,17 +1,56 @@
+import asyncio
 import functools
 import json
 import re
-from collections.abc import Callable
-from typing import Any
+import secrets
+import time
+import zlib
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any, Protocol
 
 from fastapi import Request
 from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
 from redis.asyncio import ConnectionPool, Redis
 
 from ..exceptions.cache_exceptions import CacheIdentificationInferenceError, InvalidRequestError, MissingClientError
+from ..logger import logging
+from .lru_cache import LRUCache
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
 
 pool: ConnectionPool | None = None
 client: Redis | None = None
+invalidation_channel: str = "cache:invalidate"
+invalidation_listener: asyncio.Task | None = None
+
+# First byte of values written in envelope mode, plain JSON values never start with it
+_ENVELOPE_MAGIC = b"\x00"
+_FLAG_COMPRESSED = 1
+_FLAG_ORJSON = 2
+
+# Deletes every key registered under a tag, then the tag set itself
+_INVALIDATE_TAG_SCRIPT = """
+local keys = redis.call("smembers", KEYS[1])
+for i = 1, #keys, 1000 do
+    redis.call("del", unpack(keys, i, math.min(i + 999, #keys)))
+end
+redis.call("del", KEYS[1])
+return #keys
+"""
+
+# Deletes the single-flight lock only if it is still held by the caller
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
 
 def _infer_resource_id(kwargs: dict[str, Any], resource_id_type: type | tuple[type, ...]) -> int | str:
@@ -181,6 +220,136 @@ async def _delete_keys_by_pattern(pattern: str) -> None:
             await client.delete(*keys)
 
 
+def _tag_key(tag: str) -> str:
+    return f"tag:{tag}"
+
+
+async def _store(cache_key: str, payload: str | bytes, expiration: int, tags: list[str]) -> None:
+    """Write a cached value and register it under its tags in one round trip."""
+    if client is None:
+        raise MissingClientError
+
+    async with client.pipeline(transaction=False) as pipe:
+        pipe.set(cache_key, payload, ex=expiration)
+        for tag in tags:
+            pipe.sadd(_tag_key(tag), cache_key)
+            pipe.expire(_tag_key(tag), expiration)
+        await pipe.execute()
+
+
+async def invalidate_tags(*tags: str) -> None:
+    """Delete every cached key registered under any of `tags`.
+
+    Cost is proportional to the number of keys under the tags, not to the size of the keyspace.
+    """
+    if client is None:
+        raise MissingClientError
+
+    for tag in tags:
+        await client.eval(_INVALIDATE_TAG_SCRIPT, 1, _tag_key(tag))  # type: ignore[misc]
+
+
+def _encode_envelope(data: Any, fresh_until: float, compress_min_size: int | None) -> bytes:
+    """Serialize `data` with its freshness deadline into an envelope.
+
+    The envelope is `magic | flags | body`, where body is `[fresh_until, data]` encoded with
+    orjson when it is installed (stdlib json otherwise) and zlib-compressed when larger than
+    `compress_min_size` bytes.
+    """
+    flags = 0
+    if orjson is not None:
+        body = orjson.dumps([fresh_until, data])
+        flags |= _FLAG_ORJSON
+    else:
+        body = json.dumps([fresh_until, data], separators=(",", ":")).encode()
+
+    if compress_min_size is not None and len(body) > compress_min_size:
+        body = zlib.compress(body, 1)
+        flags |= _FLAG_COMPRESSED
+
+    return _ENVELOPE_MAGIC + bytes([flags]) + body
+
+
+def _decode_envelope(raw: bytes) -> tuple[float, Any]:
+    """Decode a cached value into `(fresh_until, data)`. Plain JSON values never go stale."""
+    if not raw.startswith(_ENVELOPE_MAGIC):
+        return float("inf"), json.loads(raw)
+
+    flags, body = raw[1], raw[2:]
+    if flags & _FLAG_COMPRESSED:
+        body = zlib.decompress(body)
+    if flags & _FLAG_ORJSON and orjson is not None:
+        fresh_until, data = orjson.loads(body)
+    else:
+        fresh_until, data = json.loads(body)
+    return fresh_until, data
+
+
+async def _acquire_lock(lock_key: str, timeout: float) -> str | None:
+    if client is None:
+        raise MissingClientError
+
+    token = secrets.token_hex(8)
+    acquired = await client.set(lock_key, token, nx=True, px=int(timeout * 1000))
+    return token if acquired else None
+
+
+async def _release_lock(lock_key: str, token: str) -> None:
+    if client is None:
+        raise MissingClientError
+
+    await client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)  # type: ignore[misc]
+
+
+async def _cached_call(
+    cache_key: str,
+    compute: Callable[[], Any],
+    expiration: int,
+    stale_while_revalidate: int,
+    single_flight: bool,
+    lock_timeout: float,
+    compress_min_size: int | None,
+    tags: list[str],
+) -> Any:
+    """Envelope mode of the `cache` decorator: one GET on a hit, one SET with expiry on a miss."""
+    if client is None:
+        raise MissingClientError
+
+    lock_key = f"{cache_key}:lock"
+    deadline = time.monotonic() + lock_timeout
+    token = None
+    try:
+        while True:
+            raw = await client.get(cache_key)
+            stale = None
+            if raw:
+                fresh_until, data = _decode_envelope(raw)
+                if fresh_until > time.time():
+                    return data
+                stale = data
+
+            if not single_flight:
+                break
+
+            token = await _acquire_lock(lock_key, lock_timeout)
+            if token is not None:
+                break
+            # Someone else is recomputing: serve the stale copy, or wait for the fresh one
+            if stale is not None:
+                return stale
+            if time.monotonic() >= deadline:
+                break
+            await asyncio.sleep(0.05)
+
+        result = jsonable_encoder(await compute())
+        payload = _encode_envelope(result, time.time() + expiration, compress_min_size)
+        await _store(cache_key, payload, expiration + stale_while_revalidate, tags)
+        return result
+    finally:
+        if token is not None:
+            await _release_lock(lock_key, token)
+
+
 def cache(
     key_prefix: str,
     resource_id_name: Any = None,
@@ -188,6 +357,12 @@ def cache(
     resource_id_type: type | tuple[type, ...] = int,
     to_invalidate_extra: dict[str, Any] | None = None,
     pattern_to_invalidate_extra: list[str] | None = None,
+    single_flight: bool = False,
+    stale_while_revalidate: int = 0,
+    compress_min_size: int | None = None,
+    lock_timeout: float = 10.0,
+    tags: list[str] | None = None,
+    tags_to_invalidate: list[str] | None = None,
 ) -> Callable:
     """Cache decorator for FastAPI endpoints.
 
@@ -213,6 +388,22 @@ def cache(
     pattern_to_invalidate_extra: List[str] | None, optional
         A list of string patterns for cache keys that should be invalidated when the decorated function is called.
         This allows for bulk invalidation of cache keys based on a matching pattern.
+    single_flight: bool, optional
+        Envelope mode. On a miss only the request holding a per-key Redis lock runs the endpoint,
+        concurrent requests wait for its result (up to `lock_timeout`) instead of recomputing.
+    stale_while_revalidate: int, optional
+        Envelope mode. Seconds an expired value is kept and served to concurrent requests while
+        one request recomputes it. Most useful together with `single_flight`.
+    compress_min_size: int | None, optional
+        Envelope mode. Serialized values larger than this many bytes are zlib-compressed.
+    lock_timeout: float, optional
+        Seconds the single-flight lock is held at most. Defaults to 10 seconds.
+    tags: List[str] | None, optional
+        Templates of tags the cached GET response is registered under, e.g. `["{username}_posts"]`.
+    tags_to_invalidate: List[str] | None, optional
+        Templates of tags whose keys are deleted when the decorated function is called with a method
+        other than GET. Unlike `pattern_to_invalidate_extra`, this deletes exactly the registered keys
+        without scanning the keyspace.
 
     Returns
     -------
@@ -279,9 +470,13 @@ def cache(
     ----
     - resource_id_type is used only if resource_id is not passed.
     - `to_invalidate_extra` and `pattern_to_invalidate_extra` are used for cache invalidation on methods other than GET.
-    - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets. Use it judiciously and
-      consider the potential impact on Redis performance.
+    - Using `pattern_to_invalidate_extra` can be resource-intensive on large datasets. Prefer `tags` and
+      `tags_to_invalidate`, whose cost only depends on the number of affected keys.
+    - Setting any envelope mode option stores values as a binary envelope (orjson when installed, stdlib json
+      otherwise) that carries its own freshness deadline. Plain JSON values written by the default mode are
+      still read correctly.
     """
+    envelope_mode = single_flight or stale_while_revalidate > 0 or compress_min_size is not None
 
     def wrapper(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -296,12 +491,30 @@ def cache(
 
             formatted_key_prefix = _format_prefix(key_prefix, kwargs)
             cache_key = f"{formatted_key_prefix}:{resource_id}"
+            formatted_tags = [_format_prefix(tag, kwargs) for tag in tags or []]
             if request.method == "GET":
-                if to_invalidate_extra is not None or pattern_to_invalidate_extra is not None:
+                if (
+                    to_invalidate_extra is not None
+                    or pattern_to_invalidate_extra is not None
+                    or tags_to_invalidate is not None
+                ):
                     raise InvalidRequestError
 
+                if envelope_mode:
+                    return await _cached_call(
+                        cache_key,
+                        lambda: func(request, *args, **kwargs),
+                        expiration=expiration,
+                        stale_while_revalidate=stale_while_revalidate,
+                        single_flight=single_flight,
+                        lock_timeout=lock_timeout,
+                        compress_min_size=compress_min_size,
+                        tags=formatted_tags,
+                    )
+
                 cached_data = await client.get(cache_key)
-                if cached_data:
+                # A key last written in envelope mode is a miss here, and is rewritten as plain JSON
+                if cached_data and not cached_data.startswith(_ENVELOPE_MAGIC):
                     return json.loads(cached_data.decode())
 
             result = await func(request, *args, **kwargs)
@@ -310,8 +523,7 @@ def cache(
                 serializable_data = jsonable_encoder(result)
                 serialized_data = json.dumps(serializable_data)
 
-                await client.set(cache_key, serialized_data)
-                await client.expire(cache_key, expiration)
+                await _store(cache_key, serialized_data, expiration, formatted_tags)
 
                 return json.loads(serialized_data)
 
@@ -328,8 +540,254 @@ def cache(
                         formatted_pattern = _format_prefix(pattern, kwargs)
                         await _delete_keys_by_pattern(formatted_pattern + "*")
 
+                if tags_to_invalidate is not None:
+                    await invalidate_tags(*(_format_prefix(tag, kwargs) for tag in tags_to_invalidate))
+
             return result
 
         return inner
 
     return wrapper
+
+
+class LocalCache(Protocol):
+    def delete(self, key: Any) -> Any: ...
+
+    def clear(self) -> None: ...
+
+
+# namespace -> process-local caches evicted when an invalidation for the namespace arrives
+_local_caches: dict[str, list[LocalCache]] = {}
+# namespace -> two-tier cache, for stats
+_two_tier_caches: dict[str, "TwoTierCache"] = {}
+# Tags this process's invalidation messages so it doesn't evict twice
+_instance_id = secrets.token_hex(8)
+
+
+def register_local_cache(namespace: str, local_cache: LocalCache) -> None:
+    """Evict entries of `local_cache` whenever any process invalidates keys of `namespace`."""
+    _local_caches.setdefault(namespace, []).append(local_cache)
+
+
+def _evict_local(namespace: str, keys: Iterable[str]) -> None:
+    keys = list(keys)
+    for local_cache in _local_caches.get(namespace, []):
+        if not keys:
+            local_cache.clear()
+        for key in keys:
+            local_cache.delete(key)
+
+
+async def publish_invalidation(namespace: str, *keys: str) -> None:
+    """Evict `keys` of `namespace` from the local caches of every process, all keys if none given.
+
+    This process is evicted right away. A failed publish is logged, other processes then
+    serve their copy until its L1 TTL runs out.
+    """
+    _evict_local(namespace, keys)
+    if client is None:
+        return
+
+    message = json.dumps({"origin": _instance_id, "namespace": namespace, "keys": list(keys)})
+    try:
+        await client.publish(invalidation_channel, message)
+    except Exception as e:
+        logger.warning(f"Failed to publish invalidation of {namespace} {keys}: {e}")
+
+
+def _handle_invalidation(data: bytes) -> None:
+    message = json.loads(data)
+    if message["origin"] != _instance_id:
+        _evict_local(message["namespace"], message["keys"])
+
+
+async def listen_for_invalidations(retry_delay: float = 1.0) -> None:
+    """Apply invalidations published by other processes to the local caches, until cancelled.
+
+    Every local cache is cleared after (re)subscribing, since messages published while the
+    subscription was down are lost.
+    """
+    if client is None:
+        raise MissingClientError
+
+    while True:
+        try:
+            async with client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(invalidation_channel)
+                for namespace in _local_caches:
+                    _evict_local(namespace, [])
+
+                async for message in pubsub.listen():
+                    _handle_invalidation(message["data"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cache invalidation subscription failed, retrying: {e}")
+            await asyncio.sleep(retry_delay)
+
+
+class TwoTierCache:
+    """Process-local LRU (L1) in front of Redis (L2), kept coherent over pub/sub.
+
+    Parameters
+    ----------
+    namespace: str
+        Prefix of the Redis keys, and name of the cache on the invalidation channel.
+    maxsize: int
+        Maximum number of L1 entries.
+    ttl: float
+        Time to live of L1 entries in seconds. Bounds staleness if an invalidation is lost.
+    expiration: int
+        Time to live of L2 entries in seconds.
+    schema: type[BaseModel] | None, optional
+        Pydantic model the values are stored as. Without it values are stored as JSON, and
+        normalised with `jsonable_encoder` so L1 and L2 hits return the same types.
+
+    Note
+    ----
+        - `None` is not cached, so a missing row always reaches the loader.
+        - Redis errors are logged and treated as L2 misses, reads never fail because of the cache.
+        - Don't put secrets in it, L2 values are readable by anything with access to Redis.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        maxsize: int,
+        ttl: float,
+        expiration: int,
+        schema: type[BaseModel] | None = None,
+    ) -> None:
+        self.namespace = namespace
+        self.expiration = expiration
+        self.schema = schema
+        self.local = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.remote_hits = 0
+        self.remote_misses = 0
+        register_local_cache(namespace, self.local)
+        _two_tier_caches[namespace] = self
+
+    def _remote_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _loads(self, raw: bytes) -> Any:
+        if self.schema is not None:
+            return self.schema.model_validate_json(raw)
+        return json.loads(raw)
+
+    def _remember(self, key: str, raw: bytes | None) -> Any:
+        if raw is None:
+            self.remote_misses += 1
+            return None
+
+        self.remote_hits += 1
+        value = self._loads(raw)
+        self.local.set(key, value)
+        return value
+
+    async def get(self, key: Any) -> Any:
+        key = str(key)
+        value = self.local.get(key)
+        if value is not None or client is None:
+            return value
+
+        try:
+            raw = await client.get(self._remote_key(key))
+        except Exception as e:
+            logger.warning(f"Redis lookup of {self._remote_key(key)} failed: {e}")
+            raw = None
+        return self._remember(key, raw)
+
+    async def get_many(self, keys: Iterable[Any]) -> dict[str, Any]:
+        """Return the cached values of `keys` by key, fetching every L1 miss with a single MGET."""
+        found: dict[str, Any] = {}
+        missing: list[str] = []
+        for key in map(str, keys):
+            value = self.local.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                found[key] = value
+
+        if not missing or client is None:
+            return found
+
+        try:
+            raws = await client.mget([self._remote_key(key) for key in missing])
+        except Exception as e:
+            logger.warning(f"Redis MGET of {len(missing)} {self.namespace} keys failed: {e}")
+            raws = [None] * len(missing)
+
+        for key, raw in zip(missing, raws):
+            value = self._remember(key, raw)
+            if value is not None:
+                found[key] = value
+        return found
+
+    async def set(self, key: Any, value: Any) -> Any:
+        """Store `value` in both tiers and return it the way later hits will return it."""
+        key = str(key)
+        if self.schema is not None:
+            value = self.schema.model_validate(value)
+            payload = value.model_dump_json()
+        else:
+            value = jsonable_encoder(value)
+            payload = json.dumps(value)
+
+        self.local.set(key, value)
+        if client is not None:
+            try:
+                await client.set(self._remote_key(key), payload, ex=self.expiration)
+            except Exception as e:
+                logger.warning(f"Redis store of {self._remote_key(key)} failed: {e}")
+        return value
+
+    async def get_or_load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value of `key`, calling `loader` and caching its result on a miss."""
+        value = await self.get(key)
+        if value is None:
+            value = await loader()
+            if value is not None:
+                value = await self.set(key, value)
+        return value
+
+    async def delete(self, *keys: Any) -> None:
+        """Drop `keys` from Redis and from the L1 of every process."""
+        keys_str = [str(key) for key in keys]
+        if client is not None and keys_str:
+            try:
+                await client.delete(*(self._remote_key(key) for key in keys_str))
+            except Exception as e:
+                logger.warning(f"Redis delete of {self.namespace} {keys_str} failed: {e}")
+        await publish_invalidation(self.namespace, *keys_str)
+
+    async def clear(self) -> None:
+        """Drop every entry of the namespace, from Redis and from the L1 of every process.
+
+        Scans the Redis keyspace, so keep it for rare writes such as admin changes.
+        """
+        if client is not None:
+            try:
+                await _delete_keys_by_pattern(f"{self.namespace}:*")
+            except Exception as e:
+                logger.warning(f"Redis clear of {self.namespace} failed: {e}")
+        await publish_invalidation(self.namespace)
+
+    def stats(self) -> dict[str, Any]:
+        local = self.local.stats()
+        remote_lookups = self.remote_hits + self.remote_misses
+        lookups = local["hits"] + local["misses"]
+        return {
+            "hit_ratio": (local["hits"] + self.remote_hits) / lookups if lookups else 0.0,
+            "l1": local,
+            "l2": {
+                "hits": self.remote_hits,
+                "misses": self.remote_misses,
+                "hit_ratio": self.remote_hits / remote_lookups if remote_lookups else 0.0,
+            },
+        }
+
+
+def cache_stats() -> dict[str, Any]:
+    """Per-tier counters of every two-tier cache of this process, by namespace."""
+    return {namespace: two_tier.stats() for namespace, two_tier in _two_tier_caches.items()}
@@ -0,0 +1,47 @@
+from http.cookiejar import Cookie, CookieJar, DefaultCookiePolicy
+from importlib.util import find_spec
+from typing import Any
+
+import httpx
+
+from ..config import HTTPClientSettings, settings
+
+client: httpx.AsyncClient | None = None
+
+
+class _RejectCookies(DefaultCookiePolicy):
+    """Never store a `Set-Cookie`: the client is shared by every user's requests."""
+
+    def set_ok(self, cookie: Cookie, request: Any) -> bool:
+        return False
+
+
+def build_client(http_settings: HTTPClientSettings = settings) -> httpx.AsyncClient:
+    """Build the shared outbound HTTP client.
+
+    httpx keeps one connection pool per origin, so every HTTP node, Resend email and JWKS fetch
+    to the same host reuses warm TCP/TLS connections. HTTP/2 is only enabled when the optional
+    `h2` package is installed. Response cookies are dropped so one user's session never rides
+    along on another user's request to the same host.
+    """
+    return httpx.AsyncClient(
+        cookies=CookieJar(policy=_RejectCookies()),
+        http2=http_settings.HTTP_CLIENT_HTTP2 and find_spec("h2") is not None,
+        timeout=httpx.Timeout(
+            http_settings.HTTP_CLIENT_TIMEOUT,
+            connect=http_settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+        ),
+        limits=httpx.Limits(
+            max_connections=http_settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=http_settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=http_settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside of the application lifespan."""
+    global client
+    if client is None or client.is_closed:
+        client = build_client()
+    return client
@@ -0,0 +1,53 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from ..exceptions.http_exceptions import BadRequestException
+
+
+def encode_cursor(position: datetime, id: uuid.UUID) -> str:
+    payload = json.dumps([position.isoformat(), str(id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        position, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(position), uuid.UUID(id)
+    except (ValueError, TypeError):
+        raise BadRequestException("Invalid cursor")
+
+
+async def fetch_keyset_page(
+    db: AsyncSession,
+    stmt: Select,
+    position_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[Any], str | None]:
+    """Fetch one page of `stmt`, newest first, after the row identified by `cursor`.
+
+    Rows are ordered by `(position_column, id_column)` descending and the next page starts
+    strictly after the last row returned, so the query is an index range scan without
+    OFFSET or COUNT(*). Returns the rows and the cursor of the next page, `None` on the
+    last page.
+    """
+    if cursor is not None:
+        position, id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(position_column, id_column) < (position, id))
+
+    stmt = stmt.order_by(position_column.desc(), id_column.desc()).limit(limit + 1)
+    rows = list((await db.execute(stmt)).scalars().all())
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, position_column.key), getattr(last, id_column.key))
@@ -1,19 +1,39 @@
-from datetime import UTC, datetime
 from typing import Optional
 
 from redis.asyncio import ConnectionPool, Redis
-from sqlalchemy.ext.asyncio import AsyncSession
+from redis.commands.core import AsyncScript
 
 from ...core.logger import logging
 from ...schemas.rate_limit import sanitize_path
 
 logger = logging.getLogger(__name__)
 
+# GCRA: the key holds the theoretical arrival time (TAT) of the next request in ms.
+# Each request pushes it forward by period / limit, and is rejected when that would put it
+# more than one period ahead of now. Allows `limit` requests per rolling `period`, with no
+# burst at window edges. Uses the server clock so every app process agrees on time.
+_GCRA_SCRIPT = """
+local now = redis.call("time")
+local now_ms = now[1] * 1000 + math.floor(now[2] / 1000)
+local period_ms = tonumber(ARGV[2]) * 1000
+local interval = period_ms / tonumber(ARGV[1])
+
+local tat = tonumber(redis.call("get", KEYS[1]) or now_ms)
+local new_tat = math.max(tat, now_ms) + interval
+if new_tat - now_ms > period_ms then
+    return 1
+end
+
+redis.call("set", KEYS[1], tostring(new_tat), "px", math.ceil(new_tat - now_ms))
+return 0
+"""
+
 
 class RateLimiter:
     _instance: Optional["RateLimiter"] = None
     pool: Optional[ConnectionPool] = None
     client: Optional[Redis] = None
+    _gcra: Optional[AsyncScript] = None
 
     def __new__(cls) -> "RateLimiter":
         if cls._instance is None:
@@ -26,6 +46,8 @@ class RateLimiter:
         if instance.pool is None:
             instance.pool = ConnectionPool.from_url(redis_url)
             instance.client = Redis(connection_pool=instance.pool)
+            # Sent by EVALSHA, the script body only travels again after a SCRIPT FLUSH
+            instance._gcra = instance.client.register_script(_GCRA_SCRIPT)
 
     @classmethod
     def get_client(cls) -> Redis:
@@ -35,27 +57,18 @@ class RateLimiter:
             raise Exception("Redis client is not initialized.")
         return instance.client
 
-    async def is_rate_limited(self, db: AsyncSession, user_id: int, path: str, limit: int, period: int) -> bool:
-        client = self.get_client()
-        current_timestamp = int(datetime.now(UTC).timestamp())
-        window_start = current_timestamp - (current_timestamp % period)
-
+    async def is_rate_limited(self, user_id: int, path: str, limit: int, period: int) -> bool:
+        self.get_client()
         sanitized_path = sanitize_path(path)
-        key = f"ratelimit:{user_id}:{sanitized_path}:{window_start}"
+        key = f"ratelimit:{user_id}:{sanitized_path}"
 
         try:
-            current_count = await client.incr(key)
-            if current_count == 1:
-                await client.expire(key, period)
-
-            if current_count > limit:
-                return True
-
+            limited = await self._gcra(keys=[key], args=[limit, period])  # type: ignore[misc]
         except Exception as e:
             logger.exception(f"Error checking rate limit for user {user_id} on path {path}: {e}")
             raise e
 
-        return False
+        return bool(limited)
 
 
 rate_limiter = RateLimiter()
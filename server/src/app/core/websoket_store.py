@@ -1,4 +1,212 @@
-from fastapi import FastAPI, WebSocket
-from typing import Dict
+import asyncio
+import json
+import secrets
+import time
+from collections.abc import Coroutine, Iterable
+from dataclasses import dataclass, field
+from typing import Any
 
-active_ws_connections: Dict[str, WebSocket] = {}
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+
+from .config import settings
+from .exceptions.cache_exceptions import MissingClientError
+from .logger import logging
+from .utils import cache
+
+logger = logging.getLogger(__name__)
+
+_PING = json.dumps({"type": "ping"})
+
+
+@dataclass(eq=False)
+class Connection:
+    websocket: WebSocket
+    user_id: str
+    workflow_id: str | None = None
+    # Last message received from the client, or sent to it
+    last_active: float = field(default_factory=time.monotonic)
+    send_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class ConnectionManager:
+    """WebSocket connections of this process, by user and by workflow.
+
+    Messages sent to a user or a workflow are delivered to the matching sockets of this
+    process right away, and published on `channel` so every other web process delivers
+    them to its own sockets. Producers without sockets (arq workers) only publish.
+
+    Parameters
+    ----------
+    channel: str
+        Redis pub/sub channel shared by all processes.
+    heartbeat_interval: float
+        Seconds between two pings to every connection. A ping that can't be sent drops the connection.
+    idle_timeout: float
+        Connections without traffic in either direction for this long are closed.
+    send_timeout: float
+        A client that can't take a message within this many seconds is disconnected, so one
+        slow consumer never stalls delivery to the others.
+
+    Note
+    ----
+        - Clients may answer `{"type": "ping"}` with any message to keep an otherwise idle socket open.
+        - Messages are JSON-encoded once and the same text is sent to every socket.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        heartbeat_interval: float,
+        idle_timeout: float,
+        send_timeout: float,
+    ) -> None:
+        self.channel = channel
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.send_timeout = send_timeout
+        self._connections: set[Connection] = set()
+        self._by_user: dict[str, set[Connection]] = {}
+        self._by_workflow: dict[str, set[Connection]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        # Tags this process's messages so its listener doesn't deliver them twice
+        self._origin = secrets.token_hex(8)
+
+    def connect(self, websocket: WebSocket, user_id: str, workflow_id: str | None = None) -> Connection:
+        """Register an accepted socket."""
+        connection = Connection(websocket=websocket, user_id=user_id, workflow_id=workflow_id)
+        self._connections.add(connection)
+        self._by_user.setdefault(user_id, set()).add(connection)
+        if workflow_id is not None:
+            self._by_workflow.setdefault(workflow_id, set()).add(connection)
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        self._connections.discard(connection)
+        self._discard(self._by_user, connection.user_id, connection)
+        if connection.workflow_id is not None:
+            self._discard(self._by_workflow, connection.workflow_id, connection)
+
+    @staticmethod
+    def _discard(index: dict[str, set[Connection]], key: str, connection: Connection) -> None:
+        connections = index.get(key)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del index[key]
+
+    def touch(self, connection: Connection) -> None:
+        connection.last_active = time.monotonic()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "connections": len(self._connections),
+            "users": len(self._by_user),
+            "workflows": len(self._by_workflow),
+        }
+
+    async def send_to_user(self, user_id: str, message: Any) -> None:
+        await self._route("user", user_id, message)
+
+    async def send_to_workflow(self, workflow_id: str, message: Any) -> None:
+        await self._route("workflow", workflow_id, message)
+
+    def _targets(self, kind: str, target: str) -> set[Connection]:
+        index = self._by_user if kind == "user" else self._by_workflow
+        return index.get(target, set())
+
+    async def _route(self, kind: str, target: str, message: Any) -> None:
+        text = message if isinstance(message, str) else json.dumps(message, default=str)
+        await self._deliver(self._targets(kind, target), text)
+
+        if cache.client is None:
+            return
+        try:
+            await cache.client.publish(self.channel, f"{self._origin}\n{kind}\n{target}\n{text}")
+        except Exception as e:
+            logger.warning(f"Failed to publish websocket message for {kind} {target}: {e}")
+
+    async def _deliver(self, connections: Iterable[Connection], text: str) -> None:
+        connections = list(connections)
+        if len(connections) == 1:
+            await self._send(connections[0], text)
+        elif connections:
+            await asyncio.gather(*(self._send(connection, text) for connection in connections))
+
+    async def _send(self, connection: Connection, text: str, activity: bool = True) -> bool:
+        try:
+            async with connection.send_lock:
+                await asyncio.wait_for(connection.websocket.send_text(text), self.send_timeout)
+        except Exception as e:
+            logger.info(f"Dropping websocket of user {connection.user_id}: {e!r}")
+            await self._close(connection)
+            return False
+
+        if activity:
+            self.touch(connection)
+        return True
+
+    async def _close(self, connection: Connection) -> None:
+        self.disconnect(connection)
+        if connection.websocket.client_state == WebSocketState.CONNECTED:
+            try:
+                await connection.websocket.close()
+            except Exception:
+                pass
+
+    def _spawn(self, coro: Coroutine) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def listen(self, retry_delay: float = 1.0) -> None:
+        """Deliver messages published by other processes to the sockets of this one, until cancelled."""
+        if cache.client is None:
+            raise MissingClientError
+
+        while True:
+            try:
+                async with cache.client.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        try:
+                            origin, kind, target, text = message["data"].decode().split("\n", 3)
+                        except (AttributeError, UnicodeDecodeError, ValueError) as e:
+                            # Dropping the subscription over one bad message would lose the ones behind it
+                            logger.warning(f"Skipping malformed websocket message on {self.channel}: {e}")
+                            continue
+                        if origin == self._origin or kind not in ("user", "workflow"):
+                            continue
+                        connections = self._targets(kind, target)
+                        if connections:
+                            # Not awaited: a slow socket must not hold up the subscription
+                            self._spawn(self._deliver(connections, text))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Websocket fan-out subscription failed, retrying: {e}")
+                await asyncio.sleep(retry_delay)
+
+    async def heartbeat(self) -> None:
+        """Ping every connection and close the idle ones, until cancelled."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            idle_since = time.monotonic() - self.idle_timeout
+            for connection in list(self._connections):
+                if connection.last_active < idle_since:
+                    logger.info(f"Closing idle websocket of user {connection.user_id}")
+                    await self._close(connection)
+                else:
+                    self._spawn(self._send(connection, _PING, activity=False))
+
+    async def close_all(self) -> None:
+        for connection in list(self._connections):
+            await self._close(connection)
+
+
+connection_manager = ConnectionManager(
+    channel=settings.WS_EVENTS_CHANNEL,
+    heartbeat_interval=settings.WS_HEARTBEAT_INTERVAL,
+    idle_timeout=settings.WS_IDLE_TIMEOUT,
+    send_timeout=settings.WS_SEND_TIMEOUT,
+)
@@ -1,9 +1,27 @@
 import asyncio
 import logging
+from typing import Any
 
 import uvloop
+from arq import Retry
 from arq.worker import Worker
 
+from ...services.run_slots import RunSlots
+from ...services.workflow_definition_cache import get_workflow_definition
+from ...services.workflow_runner import execute_workflow
+from ..config import settings
+from ..db.context import db_context
+from ..db.database import local_session
+from ..setup import (
+    close_redis_cache_pool,
+    close_run_history_writers,
+    create_redis_cache_pool,
+    start_cache_invalidation_listener,
+    start_run_history_writers,
+    stop_cache_invalidation_listener,
+)
+from ..utils import http_client
+
 asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -15,10 +33,60 @@ async def sample_background_task(ctx: Worker, name: str) -> str:
     return f"Task {name} is complete!"
 
 
+async def run_workflow_job(ctx: Worker, workflow_id: str, input_payload: dict | None = None) -> dict[str, Any]:
+    """Execute a queued workflow run. The arq job id is the run id returned to the caller.
+
+    At most `WORKFLOW_MAX_CONCURRENT_RUNS` runs of one workflow execute at a time, further
+    runs are deferred with `Retry` until a slot frees up. A run still without a slot on its
+    last try fails, so it shows up as failed in its arq result and in the worker logs.
+    """
+    run_id = ctx["job_id"]
+    run_slots: RunSlots = ctx["run_slots"]
+    limit = run_slots.limit
+
+    if limit and not await run_slots.acquire(workflow_id, run_id):
+        if ctx["job_try"] >= settings.WORKFLOW_RUN_MAX_TRIES:
+            logging.error(
+                f"Workflow {workflow_id} run {run_id} failed: {limit} runs still in progress "
+                f"after {ctx['job_try']} tries"
+            )
+            raise RuntimeError(f"Workflow {workflow_id} has {limit} runs in progress, run {run_id} was not started")
+        raise Retry(defer=settings.WORKFLOW_RUN_RETRY_DELAY)
+
+    try:
+        async with local_session() as db:
+            db_context.set(db)
+
+            workflow_read = await get_workflow_definition(db, workflow_id)
+            if workflow_read is None:
+                raise ValueError(f"Workflow {workflow_id} not found")
+
+            await execute_workflow(workflow_read, input_payload, run_id=run_id)
+    finally:
+        if limit:
+            await run_slots.release(workflow_id, run_id)
+
+    logging.info(f"Workflow {workflow_id} run {run_id} finished")
+    return {"workflow_id": workflow_id, "status": "success"}
+
+
 # -------- base functions --------
 async def startup(ctx: Worker) -> None:
+    http_client.client = http_client.build_client()
+    # A run can't outlive its arq timeout, so neither does its slot
+    ctx["run_slots"] = RunSlots(
+        ctx["redis"], settings.WORKFLOW_MAX_CONCURRENT_RUNS, lease=settings.WORKFLOW_RUN_TIMEOUT
+    )
+    await create_redis_cache_pool()
+    await start_cache_invalidation_listener()
+    await start_run_history_writers()
     logging.info("Worker Started")
 
 
 async def shutdown(ctx: Worker) -> None:
+    if http_client.client is not None:
+        await http_client.client.aclose()
+    await close_run_history_writers()
+    await stop_cache_invalidation_listener()
+    await close_redis_cache_pool()
     logging.info("Worker end")
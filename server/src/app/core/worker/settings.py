@@ -1,14 +1,22 @@
+from arq import func
 from arq.connections import RedisSettings
 
 from ...core.config import settings
-from .functions import sample_background_task, shutdown, startup
+from .functions import run_workflow_job, sample_background_task, shutdown, startup
 
 REDIS_QUEUE_HOST = settings.REDIS_QUEUE_HOST
 REDIS_QUEUE_PORT = settings.REDIS_QUEUE_PORT
 
 
 class WorkerSettings:
-    functions = [sample_background_task]
+    functions = [
+        sample_background_task,
+        func(
+            run_workflow_job,
+            timeout=settings.WORKFLOW_RUN_TIMEOUT,
+            max_tries=settings.WORKFLOW_RUN_MAX_TRIES,
+        ),
+    ]
     redis_settings = RedisSettings(host=REDIS_QUEUE_HOST, port=REDIS_QUEUE_PORT)
     on_startup = startup
     on_shutdown = shutdown
@@ -26,6 +26,8 @@ class ClientCacheMiddleware(BaseHTTPMiddleware):
     ----
         - The `Cache-Control` header instructs clients (e.g., browsers)
         to cache the response for the specified duration.
+        - Responses that already carry a `Cache-Control` header keep it, so routes can
+        set their own policy.
     """
 
     def __init__(self, app: FastAPI, max_age: int = 15) -> None:
@@ -47,7 +49,7 @@ class ClientCacheMiddleware(BaseHTTPMiddleware):
         Returns
         -------
         Response
-            The response object with the `Cache-Control` header set.
+            The response object with the `Cache-Control` header set, unless the route set one.
 
         Note
         ----
@@ -55,5 +57,5 @@ class ClientCacheMiddleware(BaseHTTPMiddleware):
         """
         response: Response = await call_next(request)
         # response.headers["Cache-Control"] = f"public, max-age={self.max_age}"
-        response.headers["Cache-Control"] = "no-store"
+        response.headers.setdefault("Cache-Control", "no-store")
         return response
@@ -10,3 +10,4 @@ from .form.form_response import FormResponse
 from .form.form_response_value import FormResponseValue
 from .schedule import Schedule
 from .credential import Credential
+from .workflow_run import WorkflowNodeRun, WorkflowRun
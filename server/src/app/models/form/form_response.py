@@ -7,9 +7,10 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     CheckConstraint,
+    Index,
 )  # Import func for onupdate
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from app.core.db.database import Base
 from .form import Form
@@ -43,3 +44,9 @@ class FormResponse(Base):
             UTC
         ),  # ✅ this returns a datetime instance
     )
+    # Whole submission keyed by field id, set instead of `values` in "jsonb" storage mode
+    answers: Mapped[dict | None] = mapped_column(JSONB, default=None)
+
+    __table_args__ = (
+        Index("ix_form_response_form_id_submitted_at", "form_id", "submitted_at", "id"),
+    )
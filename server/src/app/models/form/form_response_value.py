@@ -27,7 +27,7 @@ class FormResponseValue(Base):
         unique=True,
     )
     response_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("form_response.id", ondelete="CASCADE"), nullable=False
+        ForeignKey("form_response.id", ondelete="CASCADE"), index=True, nullable=False
     )
 
     field_id: Mapped[uuid.UUID] = mapped_column(
@@ -2,7 +2,7 @@ from datetime import UTC, datetime
 import uuid
 import uuid_utils
 
-from sqlalchemy import String, ForeignKey, DateTime, func  # Import func for onupdate
+from sqlalchemy import String, ForeignKey, DateTime, Index, func  # Import func for onupdate
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -33,3 +33,7 @@ class WebhookResponse(Base):
     timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default_factory=lambda: datetime.now(UTC), init=False
     )
+
+    __table_args__ = (
+        Index("ix_webhook_response_webhook_id_timestamp", "webhook_id", "timestamp", "id"),
+    )
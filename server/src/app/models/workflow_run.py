@@ -0,0 +1,80 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DDL, DateTime, Float, Index, Integer, String, Text, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.db.database import Base
+
+# Both tables are range-partitioned by month on `started_at`, see
+# `scripts/manage_run_history_partitions.py`. Retention is a DROP of old partitions.
+# Postgres requires the partition key in the primary key, hence `(id, started_at)`.
+#
+# Migration: `alembic revision --autogenerate` emits both `op.create_table` calls with
+# `postgresql_partition_by="RANGE (started_at)"`, the `(id, started_at)` primary keys and the
+# three indexes below. It doesn't run the `after_create` hook at the end of this module, so
+# add the default partitions by hand after the tables are created:
+#
+#     op.execute("CREATE TABLE workflow_run_default PARTITION OF workflow_run DEFAULT")
+#     op.execute("CREATE TABLE workflow_node_run_default PARTITION OF workflow_node_run DEFAULT")
+#
+# `downgrade` only needs to drop the two tables, their partitions go with them. After
+# upgrading, run `python -m src.scripts.manage_run_history_partitions` once, then monthly.
+
+
+class WorkflowRun(Base):
+    __tablename__ = "workflow_run"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    workflow_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    # Trigger node type the run was started with, e.g. "webhook-trigger"
+    trigger: Mapped[str | None] = mapped_column(String(50))
+    # "success", "error" or "cancelled"
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    finished_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    input_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    output_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    error: Mapped[str | None] = mapped_column(Text, default=None)
+
+    __table_args__ = (
+        Index("ix_workflow_run_workflow_id_started_at", "workflow_id", "started_at", "id"),
+        {"postgresql_partition_by": "RANGE (started_at)"},
+    )
+
+
+class WorkflowNodeRun(Base):
+    __tablename__ = "workflow_node_run"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    run_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    workflow_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    node_id: Mapped[str] = mapped_column(String, nullable=False)
+    # "finish", "error", or "unfinished" when the run stopped while the node was running
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    duration_ms: Mapped[float | None] = mapped_column(Float)
+    input_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    output_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    # JSON of the node output, cut to `WORKFLOW_RUN_OUTPUT_MAX_CHARS`
+    output: Mapped[str | None] = mapped_column(Text, default=None)
+    output_truncated: Mapped[bool] = mapped_column(default=False)
+    error: Mapped[str | None] = mapped_column(Text, default=None)
+
+    __table_args__ = (
+        Index("ix_workflow_node_run_run_id", "run_id"),
+        Index("ix_workflow_node_run_workflow_id_started_at", "workflow_id", "started_at"),
+        {"postgresql_partition_by": "RANGE (started_at)"},
+    )
+
+
+# Rows outside every monthly partition land here instead of failing the insert
+for _table in (WorkflowRun.__table__, WorkflowNodeRun.__table__):
+    event.listen(
+        _table,
+        "after_create",
+        DDL(f"CREATE TABLE IF NOT EXISTS {_table.name}_default PARTITION OF {_table.name} DEFAULT"),
+    )
@@ -16,6 +16,11 @@ class FormResponseRead(FormResponseBase):
     submitted_at: datetime
 
 
+class FormResponseAnswers(FormResponseRead):
+    # field id -> submitted value, regardless of the storage layout
+    answers: dict[str, str | None]
+
+
 # === Create schema ===
 class FormResponseCreate(FormResponseBase):
     model_config = ConfigDict(extra="forbid")
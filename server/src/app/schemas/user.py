@@ -1,3 +1,4 @@
+import uuid as uuid_pkg
 from datetime import datetime
 from typing import Annotated
 
@@ -56,6 +57,20 @@ class UserRead(BaseModel):
     created_at: datetime
 
 
+class UserSession(BaseModel):
+    """Snapshot of the authenticated user, cached between requests by `sync_user_to_db`."""
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+    id: uuid_pkg.UUID
+    user_id: str
+    email: str | None = None
+    full_name: str = ""
+    image_url: str | None = None
+    is_superuser: bool = False
+    tier_id: int | None = None
+
+
 class UserCreate(UserBase):
     model_config = ConfigDict(extra="forbid")
 
@@ -71,3 +71,17 @@ class WebhookRead(WebhookBase):
 class WebhookDelete(BaseModel):
     is_deleted: bool
     deleted_at: datetime
+
+
+# === Dispatch record, cached for inbound events ===
+class WebhookDispatchRecord(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    id: UUID
+    workflow_id: UUID
+    method: HTTPMethod
+    auth_type: AuthType
+    credential_id: Optional[UUID] = None
+    api_key_header: str = "x-api-key"
+    # sha256 of the expected Authorization header, API key or "username:password"
+    auth_digest: Optional[str] = None
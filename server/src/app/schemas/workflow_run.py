@@ -0,0 +1,46 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict
+
+
+class WorkflowRunRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    workflow_id: UUID
+    trigger: str | None
+    status: str
+    started_at: datetime
+    finished_at: datetime
+    duration_ms: float
+    input_size: int
+    output_size: int
+    error: str | None
+
+
+class WorkflowNodeRunRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    run_id: UUID
+    node_id: str
+    status: str
+    started_at: datetime
+    finished_at: datetime | None
+    duration_ms: float | None
+    input_size: int
+    output_size: int
+    output: str | None
+    output_truncated: bool
+    error: str | None
+
+
+class NodeLatencyStats(BaseModel):
+    node_id: str
+    runs: int
+    errors: int
+    avg_ms: float | None
+    p50_ms: float | None
+    p95_ms: float | None
+    max_ms: float | None
@@ -0,0 +1,61 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from app.core.config import settings
+from app.core.db.context import db_context, session_lock
+from app.core.utils.cache import publish_invalidation, register_local_cache
+from app.core.utils.lru_cache import LRUCache
+from app.crud.crud_credentials import crud_credentials
+from app.schemas.credential import CredentialRead
+
+# credential id -> CredentialRead dict, shared by every run of this process.
+# Kept out of Redis on purpose, so decrypted secrets only live in process memory.
+credential_cache = LRUCache(
+    maxsize=settings.CREDENTIAL_CACHE_SIZE, ttl=settings.CREDENTIAL_CACHE_TTL
+)
+register_local_cache("credential", credential_cache)
+
+# credential id -> CredentialRead dict, for the workflow run in progress
+_run_credentials: ContextVar[dict | None] = ContextVar("run_credentials", default=None)
+
+
+@contextmanager
+def credential_run_scope() -> Iterator[None]:
+    """Memoise credential lookups for the duration of one workflow run.
+
+    Nodes of a run execute in tasks that inherit this context, so every node
+    sees the same memo no matter how many times it asks for a credential.
+    """
+    token = _run_credentials.set({})
+    try:
+        yield
+    finally:
+        _run_credentials.reset(token)
+
+
+async def get_credential(credential_id: Any) -> dict | None:
+    key = str(credential_id)
+
+    memo = _run_credentials.get()
+    if memo is not None and key in memo:
+        return memo[key]
+
+    credential = credential_cache.get(key)
+    if credential is None:
+        db = db_context.get()
+        async with session_lock(db):
+            credential = await crud_credentials.get(
+                db=db, id=credential_id, schema_to_select=CredentialRead
+            )
+        if credential is not None:
+            credential_cache.set(key, credential)
+
+    if memo is not None:
+        memo[key] = credential
+    return credential
+
+
+async def invalidate_credential(credential_id: Any) -> None:
+    await publish_invalidation("credential", str(credential_id))
@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from enum import StrEnum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.core.db.database import local_session
+from app.models.form.form_response import FormResponse
+from app.models.form.form_response_value import FormResponseValue
+from app.models.webhook.webhook_response import WebhookResponse
+from app.schemas.form.form import FormRead
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_YIELD_PER = 1000
+# Rows rendered into one chunk of the streamed body
+EXPORT_CHUNK_ROWS = 500
+
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+async def _csv_chunks(
+    rows: AsyncIterator[dict[str, Any]], columns: dict[str, str]
+) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns.values())
+
+    count = 0
+    async for row in rows:
+        writer.writerow(row.get(key) for key in columns)
+        count += 1
+        if count % EXPORT_CHUNK_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+async def _ndjson_chunks(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[str]:
+    lines = []
+    async for row in rows:
+        lines.append(json.dumps(row, default=str))
+        if len(lines) == EXPORT_CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_response(
+    rows: AsyncIterator[dict[str, Any]],
+    columns: dict[str, str],
+    export_format: ExportFormat,
+    filename: str,
+) -> StreamingResponse:
+    """Stream `rows` as CSV (with `columns` as key -> header) or NDJSON."""
+    if export_format == ExportFormat.CSV:
+        chunks = _csv_chunks(rows, columns)
+    else:
+        chunks = _ndjson_chunks(rows)
+
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'
+        },
+    )
+
+
+def form_export_columns(form: FormRead) -> dict[str, str]:
+    fields = sorted(form.fields or [], key=lambda field: field.position)
+    columns = {"id": "id", "submitted_at": "submitted_at"}
+    columns.update({str(field.id): field.label or str(field.id) for field in fields})
+    return columns
+
+
+async def iter_form_responses(form_id: Any) -> AsyncIterator[dict[str, Any]]:
+    """Yield every response of a form as `{id, submitted_at, <field id>: value...}`.
+
+    Rows come from a server-side cursor over responses joined with their EAV values, so
+    memory use doesn't depend on the number of responses. The generator opens its own
+    session because it outlives the request's dependencies.
+    """
+    stmt = (
+        select(
+            FormResponse.id,
+            FormResponse.submitted_at,
+            FormResponse.answers,
+            FormResponseValue.field_id,
+            FormResponseValue.value,
+        )
+        .outerjoin(FormResponseValue, FormResponseValue.response_id == FormResponse.id)
+        .where(FormResponse.form_id == form_id)
+        .order_by(FormResponse.submitted_at, FormResponse.id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+
+    async with local_session() as db:
+        result = await db.stream(stmt)
+
+        current: dict[str, Any] | None = None
+        async for response_id, submitted_at, answers, field_id, value in result:
+            if current is None or current["id"] != response_id:
+                if current is not None:
+                    yield current
+                current = {"id": response_id, "submitted_at": submitted_at}
+                current.update(answers or {})
+
+            if field_id is not None:
+                current[str(field_id)] = value
+
+        if current is not None:
+            yield current
+
+
+WEBHOOK_EXPORT_COLUMNS = {
+    "id": "id",
+    "timestamp": "timestamp",
+    "status_code": "status_code",
+    "response_body": "response_body",
+}
+
+
+async def iter_webhook_events(webhook_id: Any) -> AsyncIterator[dict[str, Any]]:
+    """Yield every stored event of a webhook, oldest first, from a server-side cursor."""
+    stmt = (
+        select(WebhookResponse)
+        .where(WebhookResponse.webhook_id == webhook_id)
+        .order_by(WebhookResponse.timestamp, WebhookResponse.id)
+        .execution_options(yield_per=EXPORT_YIELD_PER)
+    )
+
+    async with local_session() as db:
+        events = await db.stream_scalars(stmt)
+        async for event in events:
+            yield {key: getattr(event, key) for key in WEBHOOK_EXPORT_COLUMNS}
@@ -0,0 +1,80 @@
+import hashlib
+from typing import Any, NamedTuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.utils.cache import TwoTierCache, register_local_cache
+from app.core.utils.lru_cache import LRUCache
+from app.models.form.form import Form
+from app.schemas.form.form import FormRead
+from app.services.generate_form_html import generate_form_html
+
+# form id -> FormRead with its fields
+form_cache = TwoTierCache(
+    "form",
+    maxsize=settings.FORM_CACHE_SIZE,
+    ttl=settings.FORM_CACHE_TTL,
+    expiration=settings.FORM_REDIS_CACHE_TTL,
+    schema=FormRead,
+)
+
+
+class RenderedForm(NamedTuple):
+    version: str
+    html: str
+    etag: str
+
+
+# form id -> RenderedForm
+rendered_form_cache = LRUCache(maxsize=settings.FORM_CACHE_SIZE)
+register_local_cache("form", rendered_form_cache)
+
+
+async def get_form_definition(db: AsyncSession, form_id: Any) -> FormRead | None:
+    """Return a form with its fields, loading it from the database only on a cache miss."""
+    form_id = str(form_id)
+    form = await form_cache.get(form_id)
+    if form is not None:
+        return form
+
+    stmt = select(Form).where(Form.id == form_id).options(selectinload(Form.fields))
+    result = await db.execute(stmt)
+    form_with_fields = result.scalar_one_or_none()
+    if form_with_fields is None:
+        return None
+
+    form = FormRead.model_validate(form_with_fields, from_attributes=True)
+    return await form_cache.set(form_id, form)
+
+
+async def get_rendered_form(db: AsyncSession, form_id: Any) -> RenderedForm | None:
+    """Return the public HTML page of a form, rendering it only when the form changed."""
+    form = await get_form_definition(db, form_id)
+    if form is None:
+        return None
+
+    form_id = str(form_id)
+    version = hashlib.sha256(form.model_dump_json().encode()).hexdigest()
+    rendered = rendered_form_cache.get(form_id)
+    if rendered is not None and rendered.version == version:
+        return rendered
+
+    html = generate_form_html(form)
+    etag = '"' + hashlib.sha256(html.encode()).hexdigest() + '"'
+    rendered = RenderedForm(version=version, html=html, etag=etag)
+    rendered_form_cache.set(form_id, rendered)
+    return rendered
+
+
+async def invalidate_form_definition(form_id: Any) -> None:
+    """Drop a form and its rendered page from the caches of every process."""
+    await form_cache.delete(form_id)
+
+
+async def get_workflow_form_ids(db: AsyncSession, workflow_id: Any) -> list[Any]:
+    """Ids of the forms of a workflow, read before a delete cascades to them."""
+    result = await db.execute(select(Form.id).where(Form.workflow_id == workflow_id))
+    return list(result.scalars())
@@ -0,0 +1,114 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Any
+
+import uuid_utils
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import FormResponseStorage, settings
+from app.core.utils.pagination import fetch_keyset_page
+from app.models.form.form_response import FormResponse
+from app.models.form.form_response_value import FormResponseValue
+from app.schemas.form.form import FormRead
+
+
+def _new_id() -> uuid.UUID:
+    return uuid.UUID(str(uuid_utils.uuid7()))
+
+
+async def ingest_form_submission(
+    db: AsyncSession, form: FormRead, form_data: dict[str, Any]
+) -> tuple[uuid.UUID, dict[str, Any]]:
+    """Store a submission and return its response id and the answers keyed by field label.
+
+    The response row and every value row are written in one transaction, the values with a
+    single multi-row INSERT. With `FORM_RESPONSE_STORAGE=jsonb` the values are instead kept
+    as one `answers` document on the response row. Keys of `form_data` that are not fields
+    of `form` are ignored.
+    """
+    labels = {str(field.id): field.label for field in form.fields or []}
+
+    response_id = _new_id()
+    rows = []
+    answers_by_id = {}
+    answers = {}
+    for field_id, value in form_data.items():
+        if field_id not in labels:
+            continue
+
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+
+        rows.append(
+            {
+                "id": _new_id(),
+                "response_id": response_id,
+                "field_id": uuid.UUID(field_id),
+                "value": value,
+            }
+        )
+        answers_by_id[field_id] = value
+        answers[labels[field_id]] = value
+
+    use_jsonb = settings.FORM_RESPONSE_STORAGE == FormResponseStorage.JSONB
+    await db.execute(
+        insert(FormResponse).values(
+            id=response_id,
+            form_id=form.id,
+            submitted_at=datetime.now(UTC),
+            answers=answers_by_id if use_jsonb else None,
+        )
+    )
+    if rows and not use_jsonb:
+        await db.execute(insert(FormResponseValue).values(rows))
+    await db.commit()
+
+    return response_id, answers
+
+
+async def get_form_responses(
+    db: AsyncSession, form_id: Any, cursor: str | None = None, limit: int = 50
+) -> dict[str, Any]:
+    """Return a page of responses of a form, newest first, with answers keyed by field id.
+
+    Responses stored as an `answers` document and responses stored as
+    `form_response_value` rows are served alike, so both layouts can coexist while the
+    backfill runs. Pages are fetched by keyset on `(submitted_at, id)`.
+    """
+    responses, next_cursor = await fetch_keyset_page(
+        db,
+        select(FormResponse).where(FormResponse.form_id == form_id),
+        FormResponse.submitted_at,
+        FormResponse.id,
+        cursor,
+        limit,
+    )
+
+    eav_ids = [response.id for response in responses if response.answers is None]
+    eav_answers: dict[uuid.UUID, dict[str, Any]] = {id_: {} for id_ in eav_ids}
+    if eav_ids:
+        values = await db.execute(
+            select(
+                FormResponseValue.response_id,
+                FormResponseValue.field_id,
+                FormResponseValue.value,
+            ).where(FormResponseValue.response_id.in_(eav_ids))
+        )
+        for response_id, field_id, value in values:
+            eav_answers[response_id][str(field_id)] = value
+
+    data = [
+        {
+            "id": response.id,
+            "form_id": response.form_id,
+            "submitted_at": response.submitted_at,
+            "answers": (
+                response.answers
+                if response.answers is not None
+                else eav_answers[response.id]
+            ),
+        }
+        for response in responses
+    ]
+    return {"data": data, "next_cursor": next_cursor}
@@ -4,9 +4,9 @@ from langgraph.graph import StateGraph, END
 from langchain_core.exceptions import OutputParserException
 from openai import BadRequestError
 from typing import Literal
-from ..crud.crud_credentials import crud_credentials
-from ..schemas.credential import CredentialRead
-from app.core.db.context import db_context
+from app.services.credential_cache import get_credential
+from app.core.utils.lru_cache import LRUCache
+import hashlib
 import json
 
 DEFAULT_JSON_SYSTEM_PROMPT = (
@@ -14,21 +14,35 @@ DEFAULT_JSON_SYSTEM_PROMPT = (
     "Do not include explanations or formatting, just return the JSON object."
 )
 
+# (credential id, api key fingerprint, model) -> ChatOpenAI, so its HTTP connection
+# pool survives between node executions
+_chat_models = LRUCache(maxsize=128)
 
-def create_open_agent(
+
+def get_chat_model(credential_id: str, api_key: str, model: str) -> ChatOpenAI:
+    key = (str(credential_id), hashlib.sha256(api_key.encode()).hexdigest(), model)
+    llm = _chat_models.get(key)
+    if llm is None:
+        llm = ChatOpenAI(
+            api_key=api_key,
+            model=model,
+            temperature=0.7,
+            response_format={"type": "json_object"},
+        )
+        _chat_models.set(key, llm)
+    return llm
+
+
+async def create_open_agent(
     api_key: str,
     model: str,
     system_prompt: str,
     user_prompt: str,
     response_format: Literal["text", "json"] = "text",
+    credential_id: str = "",
 ):
     # Step 1: Set up LLM
-    llm = ChatOpenAI(
-        api_key=api_key,
-        model=model,
-        temperature=0.7,
-        response_format={"type": "json_object"},
-    )
+    llm = get_chat_model(credential_id, api_key, model)
 
     # print("model", model)
     # print("system_prompt", system_prompt)
@@ -50,9 +64,9 @@ def create_open_agent(
     )
 
     # Step 3: Build Graph (simple one-step LLM call)
-    def run_chain():
+    async def run_chain():
         chain = prompt | llm
-        response = chain.invoke({})  # response is AIMessage
+        response = await chain.ainvoke({})  # response is AIMessage
 
         # Extract the content (which may be a JSON string)
         response_str = response.content
@@ -63,11 +77,10 @@ def create_open_agent(
         except json.JSONDecodeError:
             return {"result": response_str}  # fallback if not valid JSON
 
-    return run_chain()
+    return await run_chain()
 
 
 async def structure_invocation(data):
-    db = db_context.get()
     credential_id = data.get("credential_id")
     description = data.get("description")
     model = data.get("model")
@@ -80,9 +93,7 @@ async def structure_invocation(data):
     # # print()
     # # print()
 
-    credential = await crud_credentials.get(
-        db=db, id=credential_id, schema_to_select=CredentialRead
-    )
+    credential = await get_credential(credential_id)
     if not credential:
         print(f"Credential with id {credential_id} not found")
         raise ValueError(f"Credential not found")
@@ -94,11 +105,12 @@ async def structure_invocation(data):
     cached_error = None
 
     try:
-        run_chain = create_open_agent(
+        run_chain = await create_open_agent(
             api_key=api_key,
             model=model,
             system_prompt=system_prompt,
             user_prompt=prompt,
+            credential_id=credential_id,
             # response_format="json_object",
         )
     except BadRequestError as e:
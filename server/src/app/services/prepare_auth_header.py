@@ -1,6 +1,4 @@
-from app.core.db.context import db_context
-from ..crud.crud_credentials import crud_credentials
-from ..schemas.credential import CredentialRead
+from app.services.credential_cache import get_credential
 
 import base64
 
@@ -17,10 +15,7 @@ async def prepare_auth_header(credential_id: str, auth_type: str) -> dict:
         dict: A dictionary containing the authorization header.
     """
     if credential_id:
-        db = db_context.get()
-        credential = await crud_credentials.get(
-            db=db, id=credential_id, schema_to_select=CredentialRead
-        )
+        credential = await get_credential(credential_id)
         if not credential:
             print(f"Header with credential ID {credential_id} not found.")
             raise ValueError("Header not found")
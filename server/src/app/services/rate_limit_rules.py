@@ -0,0 +1,74 @@
+import asyncio
+import time
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.utils.cache import publish_invalidation, register_local_cache
+from app.models.rate_limit import RateLimit
+from app.models.tier import Tier
+
+
+class RateLimitRules:
+    """In-memory table of every tier and its `(limit, period)` per sanitized path.
+
+    The table is small, so it is loaded whole at startup and looked up without any I/O.
+    It is reloaded on the next lookup after an admin change (made by any process, see
+    `invalidate_rate_limit_rules`) or once older than `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._tier_names: dict[int, str] = {}
+        self._rules: dict[tuple[int, str], tuple[int, int]] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+
+    async def load(self, db: AsyncSession) -> None:
+        tiers = await db.execute(select(Tier.id, Tier.name))
+        rate_limits = await db.execute(
+            select(RateLimit.tier_id, RateLimit.path, RateLimit.limit, RateLimit.period)
+        )
+
+        self._tier_names = dict(tiers.tuples().all())
+        self._rules = {
+            (tier_id, path): (limit, period)
+            for tier_id, path, limit, period in rate_limits.tuples()
+        }
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if not self.is_stale():
+            return
+
+        async with self._lock:
+            if self.is_stale():
+                await self.load(db)
+
+    def tier_name(self, tier_id: int | None) -> str | None:
+        return self._tier_names.get(tier_id) if tier_id is not None else None
+
+    def get(self, tier_id: int, path: str) -> tuple[int, int] | None:
+        return self._rules.get((tier_id, path))
+
+    # Called by the cache invalidation listener, the table is reloaded on next use
+    def clear(self) -> None:
+        self._loaded_at = None
+
+    def delete(self, key: Any) -> None:
+        self.clear()
+
+
+rate_limit_rules = RateLimitRules(ttl=settings.RATE_LIMIT_RULES_TTL)
+register_local_cache("rate_limit_rules", rate_limit_rules)
+
+
+async def invalidate_rate_limit_rules(db: AsyncSession) -> None:
+    """Reload the rule table here, and make every other process reload it on next use."""
+    await publish_invalidation("rate_limit_rules")
+    await rate_limit_rules.load(db)
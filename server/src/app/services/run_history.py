@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from typing import Any
+
+import uuid_utils
+
+from app.core.config import settings
+from app.core.db.database import local_session
+from app.core.utils.batch_writer import BatchWriter
+from app.models.workflow_run import WorkflowNodeRun, WorkflowRun
+from app.services.run_progress import progress_listener
+
+workflow_run_writer = BatchWriter(
+    WorkflowRun,
+    local_session,
+    max_batch_size=settings.WORKFLOW_RUN_HISTORY_BATCH_SIZE,
+    flush_interval=settings.WORKFLOW_RUN_HISTORY_FLUSH_INTERVAL_MS / 1000,
+    max_buffer_size=settings.WORKFLOW_RUN_HISTORY_BUFFER_SIZE,
+)
+workflow_node_run_writer = BatchWriter(
+    WorkflowNodeRun,
+    local_session,
+    max_batch_size=settings.WORKFLOW_RUN_HISTORY_BATCH_SIZE,
+    flush_interval=settings.WORKFLOW_RUN_HISTORY_FLUSH_INTERVAL_MS / 1000,
+    max_buffer_size=settings.WORKFLOW_RUN_HISTORY_BUFFER_SIZE,
+)
+
+
+def _new_id() -> uuid.UUID:
+    return uuid.UUID(str(uuid_utils.uuid7()))
+
+
+def _to_json(value: Any) -> str:
+    return json.dumps(value, default=str)
+
+
+class RunRecorder:
+    """Collects the node events of one workflow run in memory and writes them once it is over.
+
+    Nothing is serialized or written while the run executes: node inputs and outputs are
+    kept by reference and measured in `finish`, which hands the rows to the batch writers.
+    """
+
+    def __init__(self, workflow_id: Any, input_payload: dict, run_id: str | None = None) -> None:
+        self.run_id = uuid.UUID(run_id) if run_id else _new_id()
+        self.workflow_id = uuid.UUID(str(workflow_id))
+        self.input_payload = input_payload
+        # Set by the caller once the run returned
+        self.output: Any = None
+        self.started_at = datetime.now(UTC)
+        self._started = time.perf_counter()
+        # node id -> started_at, finished_at, input the node saw, last event
+        self._nodes: dict[str, dict] = {}
+
+    def emit(self, event: dict, state: dict | None = None) -> None:
+        now = datetime.now(UTC)
+        if event["status"] == "start":
+            self._nodes[event["node"]] = {
+                "started_at": now,
+                "finished_at": None,
+                "input": state.get("input") if state else None,
+                "event": event,
+            }
+        else:
+            node = self._nodes.setdefault(
+                event["node"], {"started_at": now, "input": None}
+            )
+            node.update(finished_at=now, event=event)
+
+    async def finish(self, status: str, error: str | None = None) -> None:
+        finished_at = datetime.now(UTC)
+        await workflow_run_writer.add(
+            {
+                "id": self.run_id,
+                "started_at": self.started_at,
+                "workflow_id": self.workflow_id,
+                "trigger": next(iter(self.input_payload), None),
+                "status": status,
+                "finished_at": finished_at,
+                "duration_ms": round((time.perf_counter() - self._started) * 1000, 1),
+                "input_size": len(_to_json(self.input_payload).encode()),
+                "output_size": len(_to_json(self.output).encode()) if self.output is not None else 0,
+                "error": error,
+            }
+        )
+
+        max_chars = settings.WORKFLOW_RUN_OUTPUT_MAX_CHARS
+        for node_id, node in self._nodes.items():
+            event = node["event"]
+            output = _to_json(event["output"]) if event.get("output") is not None else None
+            await workflow_node_run_writer.add(
+                {
+                    "id": _new_id(),
+                    "started_at": node["started_at"],
+                    "run_id": self.run_id,
+                    "workflow_id": self.workflow_id,
+                    "node_id": node_id,
+                    "status": "unfinished" if event["status"] == "start" else event["status"],
+                    "finished_at": node["finished_at"],
+                    "duration_ms": event.get("ms"),
+                    "input_size": len(_to_json(node["input"]).encode()) if node["input"] is not None else 0,
+                    "output_size": len(output.encode()) if output is not None else 0,
+                    "output": output[:max_chars] if output is not None else None,
+                    "output_truncated": output is not None and len(output) > max_chars,
+                    "error": event.get("error"),
+                }
+            )
+
+
+@asynccontextmanager
+async def record_run(
+    workflow_id: Any, input_payload: dict, run_id: str | None = None
+) -> AsyncIterator[RunRecorder | None]:
+    """Record the workflow run executed in this block, with the timings of each node.
+
+    Yields `None` when `WORKFLOW_RUN_HISTORY_ENABLED` is off.
+    """
+    if not settings.WORKFLOW_RUN_HISTORY_ENABLED:
+        yield None
+        return
+
+    recorder = RunRecorder(workflow_id, input_payload, run_id)
+    with progress_listener(recorder.emit):
+        try:
+            yield recorder
+        except asyncio.CancelledError:
+            await recorder.finish("cancelled")
+            raise
+        except Exception as e:
+            await recorder.finish("error", error=str(e))
+            raise
+    await recorder.finish("success")
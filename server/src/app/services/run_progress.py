@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any
+
+# (event, node state) -> None. The state is only passed with `start` events.
+ProgressListener = Callable[[dict, dict | None], None]
+
+# Receive the progress events of the workflow run in progress, node tasks inherit them
+_progress_listeners: ContextVar[tuple[ProgressListener, ...]] = ContextVar(
+    "progress_listeners", default=()
+)
+
+
+def _add_listener(listener: ProgressListener) -> Token:
+    return _progress_listeners.set((*_progress_listeners.get(), listener))
+
+
+@contextmanager
+def progress_listener(listener: ProgressListener) -> Iterator[None]:
+    """Send the node events of runs started in this block to `listener` as well."""
+    token = _add_listener(listener)
+    try:
+        yield
+    finally:
+        _progress_listeners.reset(token)
+
+
+def emit_progress(
+    node_id: str,
+    status: str,
+    started: float,
+    state: dict | None = None,
+    **fields: Any,
+) -> None:
+    """Report a node `start`, `finish` or `error` to the run's listeners, if any."""
+    listeners = _progress_listeners.get()
+    if not listeners:
+        return
+
+    event = {"node": node_id, "status": status}
+    if status != "start":
+        event["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    event.update(fields)
+    for listener in listeners:
+        listener(event, state)
+
+
+class ProgressStream:
+    """Coalesces the node events of one run into `{"type": "progress", "events": [...]}` messages.
+
+    Events are collected for `window` seconds before being sent together. Only the latest
+    event of each node is kept, so while `send` is slow (a slow client) events pile up as
+    one entry per node instead of growing a queue: memory is bounded by the size of the
+    workflow, and the final status of every node is always delivered.
+
+    Usage
+    -----
+        async with ProgressStream(send, window=0.05):
+            await compiled_graph.ainvoke(initial_state)
+    """
+
+    def __init__(self, send: Callable[[dict], Awaitable[None]], window: float) -> None:
+        self.send = send
+        self.window = window
+        self._pending: dict[str, dict] = {}
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._task: asyncio.Task | None = None
+        self._token: Token | None = None
+
+    def emit(self, event: dict, state: dict | None = None) -> None:
+        self._pending[event["node"]] = event
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if not self._closed:
+                await asyncio.sleep(self.window)
+            self._wakeup.clear()
+
+            events = list(self._pending.values())
+            self._pending.clear()
+            if events:
+                await self.send({"type": "progress", "events": events})
+            if self._closed and not self._pending:
+                return
+
+    async def __aenter__(self) -> "ProgressStream":
+        self._task = asyncio.create_task(self._run())
+        self._token = _add_listener(self.emit)
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        if self._token is not None:
+            _progress_listeners.reset(self._token)
+        if self._task is None:
+            return
+
+        if exc_type is asyncio.CancelledError:
+            self._task.cancel()
+            return
+
+        # Flush what is left right away
+        self._closed = True
+        self._wakeup.set()
+        await self._task
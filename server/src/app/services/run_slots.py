@@ -0,0 +1,53 @@
+from typing import Any
+
+from redis.asyncio import Redis
+
+# KEYS[1]: sorted set of the runs holding a slot of one workflow, scored by lease expiry (ms).
+# ARGV: limit, run id, lease (ms). Expired leases are pruned first, so a slot held by a worker
+# that crashed or was killed frees itself once its lease runs out, whatever the traffic.
+# A run that already holds a slot (an arq retry of the same job) renews its lease.
+_ACQUIRE_SCRIPT = """
+local now = redis.call("time")
+local now_ms = now[1] * 1000 + math.floor(now[2] / 1000)
+redis.call("zremrangebyscore", KEYS[1], "-inf", now_ms)
+
+if not redis.call("zscore", KEYS[1], ARGV[2]) and redis.call("zcard", KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+
+redis.call("zadd", KEYS[1], now_ms + tonumber(ARGV[3]), ARGV[2])
+redis.call("pexpire", KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RunSlots:
+    """At most `limit` concurrent runs per workflow, across every worker.
+
+    Each run holds a lease of `lease` seconds, which should be at least the run timeout.
+
+    Parameters
+    ----------
+    redis: Redis
+        Client of the Redis shared by the workers.
+    limit: int
+        Runs of one workflow allowed at the same time.
+    lease: float
+        Seconds after which the slot of a run that never released it is reclaimed.
+    """
+
+    def __init__(self, redis: Redis, limit: int, lease: float) -> None:
+        self.redis = redis
+        self.limit = limit
+        self.lease_ms = int(lease * 1000)
+        self._acquire = redis.register_script(_ACQUIRE_SCRIPT)
+
+    @staticmethod
+    def _key(workflow_id: Any) -> str:
+        return f"workflow:running:{workflow_id}"
+
+    async def acquire(self, workflow_id: Any, run_id: str) -> bool:
+        return bool(await self._acquire(keys=[self._key(workflow_id)], args=[self.limit, run_id, self.lease_ms]))
+
+    async def release(self, workflow_id: Any, run_id: str) -> None:
+        await self.redis.zrem(self._key(workflow_id), run_id)
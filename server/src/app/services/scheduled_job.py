@@ -7,7 +7,8 @@ from sqlalchemy import select
 
 from app.core.db.database import local_session
 from app.models.workflow import Workflow
-from app.services.workflow_builder import WorkflowGraphBuilder
+from app.services.workflow_graph_cache import get_compiled_graph
+from app.services.workflow_runner import execute_workflow
 from app.schemas.workflow import WorkflowBase
 
 
@@ -31,9 +32,10 @@ async def scheduled_job(job_id: str):
             return
 
         print(f"✅ Workflow found: {workflow['name']}", flush=True)
+        workflow["id"] = workflow_db.id
 
         try:
-            compiled_graph = WorkflowGraphBuilder(workflow).build_graph()
+            get_compiled_graph(workflow)
         except Exception as e:
             print(f"❌ Error compiling workflow: {str(e)}", flush=True)
             traceback.print_exc()
@@ -50,17 +52,7 @@ async def scheduled_job(job_id: str):
 
             input_payload = {trigger_type: trigger_node["data"]["output"]}
 
-            # Build input state
-            state = {
-                "input": input_payload,
-                "state": {
-                    "nodes": {node["id"]: node for node in workflow["nodes"]},
-                    "edges": {edge["id"]: edge for edge in workflow["edges"]},
-                },
-                # "user_id": workflow.user_id,  # ⚠️ Make sure this exists
-            }
-
-            await compiled_graph.ainvoke(state)
+            await execute_workflow(workflow, input_payload)
 
             print("✅ Workflow executed successfully", flush=True)
 
@@ -1,6 +1,7 @@
 import httpx
 import json
 
+from app.core.utils import http_client
 from app.services.prepare_auth_header import prepare_auth_header
 
 
@@ -40,43 +41,43 @@ async def send_custom_http_request(
     # Automatically convert body to JSON string if needed
     content = json.dumps(body) if body else None
 
-    async with httpx.AsyncClient() as client:
-        response = await client.request(
-            method=method,
-            url=url,
-            headers=headers,
-            params=params,
-            content=content,
-        )
-
-        print("HTTP Response:", response.status_code, response.text)
-
-        try:
-            response.raise_for_status()
-
-            # Try to parse JSON
-            data = response.json()
-
-            # Handle GraphQL or structured API errors
-            if "errors" in data and data["errors"]:
-                raise Exception(f"API Error: {data['errors']}")
-            if "error" in data and data["error"]:
-                raise Exception(f"API Error: {data['error']}")
-
-            return data
-
-        except (httpx.HTTPStatusError, httpx.RequestError) as e:
-            # Catch 4xx and 5xx HTTP errors here
-            print("HTTP error:", str(e))
-            raise Exception(
-                f"HTTP Error: {e.response.status_code} {e.response.text}"
-                if hasattr(e, "response")
-                else str(e)
-            ) from e
-
-        except ValueError:
-            # JSON parsing failed — fallback to raw text
-            return {
-                "status_code": response.status_code,
-                "text": response.text,
-            }
+    client = http_client.get_client()
+    response = await client.request(
+        method=method,
+        url=url,
+        headers=headers,
+        params=params,
+        content=content,
+    )
+
+    print("HTTP Response:", response.status_code, response.text)
+
+    try:
+        response.raise_for_status()
+
+        # Try to parse JSON
+        data = response.json()
+
+        # Handle GraphQL or structured API errors
+        if "errors" in data and data["errors"]:
+            raise Exception(f"API Error: {data['errors']}")
+        if "error" in data and data["error"]:
+            raise Exception(f"API Error: {data['error']}")
+
+        return data
+
+    except (httpx.HTTPStatusError, httpx.RequestError) as e:
+        # Catch 4xx and 5xx HTTP errors here
+        print("HTTP error:", str(e))
+        raise Exception(
+            f"HTTP Error: {e.response.status_code} {e.response.text}"
+            if hasattr(e, "response")
+            else str(e)
+        ) from e
+
+    except ValueError:
+        # JSON parsing failed — fallback to raw text
+        return {
+            "status_code": response.status_code,
+            "text": response.text,
+        }
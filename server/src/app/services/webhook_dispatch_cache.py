@@ -0,0 +1,157 @@
+import hashlib
+import hmac
+import uuid
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.logger import logging
+from app.core.utils import cache
+from app.core.utils.lru_cache import LRUCache
+from app.models.webhook.webhook import AuthType, Webhook
+from app.schemas.webhook.webhook import WebhookDispatchRecord
+
+logger = logging.getLogger(__name__)
+
+# Stored for ids that have no webhook, so unknown ids don't reach the database either
+_NOT_FOUND = ""
+
+# webhook id -> WebhookDispatchRecord | _NOT_FOUND
+dispatch_cache = LRUCache(
+    maxsize=settings.WEBHOOK_CACHE_SIZE, ttl=settings.WEBHOOK_CACHE_TTL
+)
+cache.register_local_cache("webhook_dispatch", dispatch_cache)
+
+
+def auth_digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def auth_matches(record: WebhookDispatchRecord, provided: str | None) -> bool:
+    """Constant time check of the provided auth material against the record's digest."""
+    if provided is None or record.auth_digest is None:
+        return False
+    return hmac.compare_digest(auth_digest(provided), record.auth_digest)
+
+
+def build_dispatch_record(webhook: Webhook) -> WebhookDispatchRecord:
+    credential = webhook.credentials
+    expected = None
+    api_key_header = "x-api-key"
+    if credential is not None:
+        if webhook.auth_type == AuthType.BEARER and credential.bearer_token:
+            expected = f"Bearer {credential.bearer_token}"
+        elif webhook.auth_type == AuthType.CUSTOM and credential.custom_token:
+            expected = credential.custom_token
+        elif webhook.auth_type == AuthType.API_KEY and credential.api_key_value:
+            expected = credential.api_key_value
+            api_key_header = credential.api_key_name or api_key_header
+        elif webhook.auth_type == AuthType.BASIC and credential.basic_username:
+            expected = f"{credential.basic_username}:{credential.basic_password or ''}"
+
+    return WebhookDispatchRecord(
+        id=webhook.id,
+        workflow_id=webhook.workflow_id,
+        method=webhook.method,
+        auth_type=webhook.auth_type,
+        credential_id=webhook.credential_id,
+        api_key_header=api_key_header,
+        auth_digest=auth_digest(expected) if expected is not None else None,
+    )
+
+
+def _redis_key(webhook_id: str) -> str:
+    return f"webhook:dispatch:{webhook_id}"
+
+
+async def _get_redis_record(webhook_id: str) -> WebhookDispatchRecord | str | None:
+    if cache.client is None:
+        return None
+
+    try:
+        raw = await cache.client.get(_redis_key(webhook_id))
+    except Exception as e:
+        logger.warning(f"Redis webhook lookup failed for {webhook_id}: {e}")
+        return None
+
+    if raw is None:
+        return None
+    if raw in (b"", _NOT_FOUND):
+        return _NOT_FOUND
+    return WebhookDispatchRecord.model_validate_json(raw)
+
+
+async def _set_redis_record(webhook_id: str, record: WebhookDispatchRecord | None) -> None:
+    if cache.client is None:
+        return
+
+    try:
+        if record is None:
+            await cache.client.set(
+                _redis_key(webhook_id), _NOT_FOUND, ex=settings.WEBHOOK_NEGATIVE_CACHE_TTL
+            )
+        else:
+            await cache.client.set(
+                _redis_key(webhook_id),
+                record.model_dump_json(),
+                ex=settings.WEBHOOK_REDIS_CACHE_TTL,
+            )
+    except Exception as e:
+        logger.warning(f"Redis webhook store failed for {webhook_id}: {e}")
+
+
+async def get_dispatch_record(
+    db: AsyncSession, webhook_id: Any
+) -> WebhookDispatchRecord | None:
+    """Return the dispatch record of a webhook, or `None` if it doesn't exist.
+
+    Looks in the process cache, then Redis, and only then in the database. Unknown ids are
+    cached as well, for `WEBHOOK_NEGATIVE_CACHE_TTL` seconds.
+    """
+    webhook_id = str(webhook_id)
+    record = dispatch_cache.get(webhook_id)
+    if record is None:
+        record = await _get_redis_record(webhook_id)
+
+        if record is None:
+            stmt = (
+                select(Webhook)
+                .where(Webhook.id == uuid.UUID(webhook_id))
+                .options(selectinload(Webhook.credentials))
+            )
+            result = await db.execute(stmt)
+            webhook = result.scalar_one_or_none()
+            record = build_dispatch_record(webhook) if webhook else None
+            await _set_redis_record(webhook_id, record)
+            if record is None:
+                record = _NOT_FOUND
+
+        ttl = settings.WEBHOOK_NEGATIVE_CACHE_TTL if record == _NOT_FOUND else None
+        dispatch_cache.set(webhook_id, record, ttl=ttl)
+
+    return None if record == _NOT_FOUND else record
+
+
+async def invalidate_dispatch_record(webhook_id: Any) -> None:
+    webhook_id = str(webhook_id)
+    if cache.client is not None:
+        await cache.client.delete(_redis_key(webhook_id))
+    await cache.publish_invalidation("webhook_dispatch", webhook_id)
+
+
+async def get_workflow_webhook_ids(db: AsyncSession, workflow_id: Any) -> list[Any]:
+    """Ids of the webhooks of a workflow, read before a delete cascades to them."""
+    result = await db.execute(select(Webhook.id).where(Webhook.workflow_id == workflow_id))
+    return list(result.scalars())
+
+
+async def invalidate_credential_webhooks(db: AsyncSession, credential_id: Any) -> None:
+    """Drop the dispatch records of every webhook authenticated with a credential."""
+    result = await db.execute(
+        select(Webhook.id).where(Webhook.credential_id == credential_id)
+    )
+    for webhook_id in result.scalars():
+        await invalidate_dispatch_record(webhook_id)
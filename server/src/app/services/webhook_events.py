@@ -0,0 +1,39 @@
+import uuid
+from datetime import UTC, datetime
+from typing import Any
+
+import uuid_utils
+
+from app.core.config import settings
+from app.core.db.database import local_session
+from app.core.utils.batch_writer import BatchWriter
+from app.models.webhook.webhook_response import WebhookResponse
+
+webhook_response_writer = BatchWriter(
+    WebhookResponse,
+    local_session,
+    max_batch_size=settings.WEBHOOK_EVENT_BATCH_SIZE,
+    flush_interval=settings.WEBHOOK_EVENT_FLUSH_INTERVAL_MS / 1000,
+    max_buffer_size=settings.WEBHOOK_EVENT_BUFFER_SIZE,
+)
+
+
+async def record_webhook_event(
+    webhook_id: Any, status_code: int, response_body: str
+) -> uuid.UUID:
+    """Buffer a `webhook_response` row and return its id.
+
+    With `WEBHOOK_EVENT_DURABLE` the call returns only once the row is committed.
+    """
+    event_id = uuid.UUID(str(uuid_utils.uuid7()))
+    await webhook_response_writer.add(
+        {
+            "id": event_id,
+            "webhook_id": webhook_id,
+            "status_code": status_code,
+            "response_body": response_body,
+            "timestamp": datetime.now(UTC),
+        },
+        durable=settings.WEBHOOK_EVENT_DURABLE,
+    )
+    return event_id
@@ -0,0 +1,26 @@
+import uuid
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions.http_exceptions import ForbiddenException, NotFoundException
+from app.models.project import Project
+from app.models.workflow import Workflow
+
+
+async def ensure_workflow_owner(db: AsyncSession, workflow_id: Any, user_id: str) -> None:
+    """Raise `NotFoundException` for unknown workflows and `ForbiddenException` unless `user_id`
+    owns the workflow's project.
+
+    Forms, webhooks, runs and their history share the id of their workflow, so this guards all of them.
+    """
+    owner = await db.scalar(
+        select(Project.user_id)
+        .join(Workflow, Workflow.project_id == Project.id)
+        .where(Workflow.id == uuid.UUID(str(workflow_id)))
+    )
+    if owner is None:
+        raise NotFoundException("Workflow not found")
+    if owner != user_id:
+        raise ForbiddenException()
@@ -4,26 +4,52 @@ from typing import Callable, Dict, List, Any
 import datetime
 import inspect
 import asyncio
-from typing import TypedDict, Any
+import time
+from typing import Annotated, TypedDict, Any
 
 from enum import Enum
-from app.services.workflow_template_parser import WorkflowTemplateParser
+from app.services.workflow_template_parser import TemplatePlan, compile_template
 from app.services.openai_agent import structure_invocation
 from app.services.send_custom_http_request import send_custom_http_request
 from app.services.build_resend_http_data import build_resend_http_data
+from app.services.run_progress import emit_progress
 
 
-def with_node_id(func, node_id):
+def _node_delta(node_id: str, result: Any) -> Any:
+    """The node's own output, without the rest of the graph state."""
+    if isinstance(result, dict):
+        return result.get("outputs", {}).get(node_id)
+    return None
+
+
+def with_node_id(func, node_id, plan: TemplatePlan):
+    """Bind a node function to its node, and report its start/finish/error as run progress."""
     if inspect.iscoroutinefunction(func):
 
         async def async_wrapper(state):
-            return await func(state, node_id=node_id)
+            started = time.perf_counter()
+            emit_progress(node_id, "start", started, state)
+            try:
+                result = await func(state, node_id=node_id, plan=plan)
+            except Exception as e:
+                emit_progress(node_id, "error", started, error=str(e))
+                raise
+            emit_progress(node_id, "finish", started, output=_node_delta(node_id, result))
+            return result
 
         return async_wrapper
     else:
 
         def sync_wrapper(state):
-            return func(state, node_id=node_id)
+            started = time.perf_counter()
+            emit_progress(node_id, "start", started, state)
+            try:
+                result = func(state, node_id=node_id, plan=plan)
+            except Exception as e:
+                emit_progress(node_id, "error", started, error=str(e))
+                raise
+            emit_progress(node_id, "finish", started, output=_node_delta(node_id, result))
+            return result
 
         return sync_wrapper
 
@@ -48,61 +74,59 @@ class NodeType(str, Enum):
     TEXT_OTHER_TOOLS = "text-other-tool"
 
 
+def merge_dicts(left: dict | None, right: dict | None) -> dict:
+    """Reducer for fan-out: sibling branches return deltas that are merged, never mutated in place."""
+    return {**(left or {}), **(right or {})}
+
+
 class WorkflowState(TypedDict, total=False):
-    input: dict
+    # node type -> latest output, what {{$node-type.field}} templates resolve against
+    input: Annotated[dict, merge_dicts]
+    # node id -> output of that node
+    outputs: Annotated[dict, merge_dicts]
     state: dict
     output: dict
 
 
+def node_output(node_id: str, node_type: "NodeType", value: Any) -> dict:
+    return {"input": {node_type: value}, "outputs": {node_id: value}}
+
+
 # === Example Node Logic Functions ===
-async def form_trigger_node(state: dict, node_id: str) -> dict:
+async def form_trigger_node(state: dict, node_id: str, plan: TemplatePlan) -> dict:
     # print("Running Form Trigger Node")
-    state[NodeType.FORM_TRIGGER] = "Triggered with data: " + str(state.get("input", {}))
-    # print("state from form trigger", state)
-    return state
+    # Trigger payload is already in state["input"], nothing to add
+    return {}
 
 
-async def open_ai_tool_node(state: dict, node_id: str) -> dict:
-    parser = WorkflowTemplateParser()
-    template = state["state"]["nodes"][node_id]["data"]["state"]
-    parsed_data = parser.parse_templates(template, state["input"])
+async def open_ai_tool_node(state: dict, node_id: str, plan: TemplatePlan) -> dict:
+    parsed_data = plan.render(state["input"])
     response = await structure_invocation(parsed_data)
     # Get credential
     print("Running OpenAI Tool Node")
-    state["open_ai_tool"] = "Generated result from: " + str(
-        state.get("form_trigger", "")
-    )
-    state["input"][NodeType.OPEN_AI_TOOLS] = response
-    return state
-
+    return node_output(node_id, NodeType.OPEN_AI_TOOLS, response)
 
-async def http_programming_tool_node(state: dict, node_id: str) -> dict:
-    parser = WorkflowTemplateParser()
 
-    template = state["state"]["nodes"][node_id]["data"]["state"]
-    parsed_data = parser.parse_templates(template, state["input"])
+async def http_programming_tool_node(
+    state: dict, node_id: str, plan: TemplatePlan
+) -> dict:
+    parsed_data = plan.render(state["input"])
     # print(parsed_data)
     response = await send_custom_http_request(parsed_data)
     # print("HTTP Response:", response)
-    state["input"][NodeType.HTTP_PROGRAMMING_TOOLS] = response
-    return state
+    return node_output(node_id, NodeType.HTTP_PROGRAMMING_TOOLS, response)
 
 
-async def text_other_tool_node(state: dict, node_id: str) -> dict:
-    parser = WorkflowTemplateParser()
+async def text_other_tool_node(state: dict, node_id: str, plan: TemplatePlan) -> dict:
     print("Running Text Other Tool Node")
-    template = state["state"]["nodes"][node_id]["data"]["state"]
-    parsed_data = parser.parse_templates(template, state["input"])
+    parsed_data = plan.render(state["input"])
 
-    state["input"][NodeType.TEXT_OTHER_TOOLS] = parsed_data
-    return state
+    return node_output(node_id, NodeType.TEXT_OTHER_TOOLS, parsed_data)
 
 
-async def mail_other_tool_node(state: dict, node_id: str) -> dict:
-    parser = WorkflowTemplateParser()
+async def mail_other_tool_node(state: dict, node_id: str, plan: TemplatePlan) -> dict:
     print("Running Mail Other Tool Node")
-    template = state["state"]["nodes"][node_id]["data"]["state"]
-    parsed_data = parser.parse_templates(template, state["input"])
+    parsed_data = plan.render(state["input"])
     print("[[[[[[[[[[[[[[[[[[[[[[[[[[[[[[]]]]]]]]]]]]]]]]]]]]]]]]]]]]]]")
     print(parsed_data)
     http_data = build_resend_http_data(parsed_data)
@@ -110,14 +134,15 @@ async def mail_other_tool_node(state: dict, node_id: str) -> dict:
     print(http_data)
     response = await send_custom_http_request(http_data)
 
-    state["input"][NodeType.MAIL_OTHER_TOOLS] = response
-    return state
+    return node_output(node_id, NodeType.MAIL_OTHER_TOOLS, response)
 
 
-async def schedule_trigger_node(state: dict, node_id: str) -> dict:
+async def schedule_trigger_node(
+    state: dict, node_id: str, plan: TemplatePlan
+) -> dict:
     print("Running Schedule Trigger Node")
     # state[NodeType.SCHEDULE_TRIGGER] = "Triggered with data: " + str(state.get("input", {}))
-    return state
+    return {}
 
 
 # === Node Function Map ===
@@ -127,6 +152,7 @@ NODE_FUNCTION_MAP: Dict[NodeType, Callable[[dict], dict]] = {
     NodeType.HTTP_PROGRAMMING_TOOLS: http_programming_tool_node,
     NodeType.TEXT_OTHER_TOOLS: text_other_tool_node,
     NodeType.MANUAL_TRIGGER: form_trigger_node,
+    NodeType.WEBHOOK_TRIGGER: form_trigger_node,
     NodeType.MAIL_OTHER_TOOLS: mail_other_tool_node,
     NodeType.SCHEDULE_TRIGGER: schedule_trigger_node,
     # Add more mappings as you implement new node types
@@ -139,6 +165,9 @@ class WorkflowGraphBuilder:
         self.workflow = workflow
         self.node_function_map = NODE_FUNCTION_MAP
         self.graph = StateGraph(WorkflowState)
+        # node id -> compiled template plan, bound into the node functions so that
+        # a cached compiled graph never re-parses its templates
+        self.template_plans: Dict[str, TemplatePlan] = {}
 
     def build_graph(self):
         node_ids = {node["id"]: node for node in self.workflow["nodes"]}
@@ -154,14 +183,25 @@ class WorkflowGraphBuilder:
                 # if "trigger" in node_type:
                 #     self.graph.add_node(START, node_id)
                 # else:
-            wrapped_func = with_node_id(func, node_id)
+            plan = compile_template(node_data.get("data", {}).get("state"))
+            self.template_plans[node_id] = plan
+            wrapped_func = with_node_id(func, node_id, plan)
             self.graph.add_node(node_id, wrapped_func)
 
-        # 2. Wire the edges
+        # 2. Wire the edges. Siblings of one source run in the same superstep
+        # (concurrently); a node with several upstream nodes joins on all of them
+        # instead of running once per incoming edge.
+        upstream: Dict[str, List[str]] = {}
         for edge in edges:
-            source = edge["source"]
-            target = edge["target"]
-            self.graph.add_edge(source, target)
+            sources = upstream.setdefault(edge["target"], [])
+            if edge["source"] not in sources:
+                sources.append(edge["source"])
+
+        for target, sources in upstream.items():
+            if len(sources) == 1:
+                self.graph.add_edge(sources[0], target)
+            else:
+                self.graph.add_edge(sources, target)
 
         # 3. Find start node(s) (no incoming edges)
         all_sources = set(edge["source"] for edge in edges)
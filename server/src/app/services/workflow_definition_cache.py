@@ -0,0 +1,29 @@
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.utils.cache import TwoTierCache
+from app.crud.crud_workflows import crud_workflows
+from app.schemas.workflow import WorkflowRead
+
+# workflow id -> WorkflowRead dict, JSON-normalised (ids and dates are strings)
+workflow_cache = TwoTierCache(
+    "workflow",
+    maxsize=settings.WORKFLOW_CACHE_SIZE,
+    ttl=settings.WORKFLOW_CACHE_TTL,
+    expiration=settings.WORKFLOW_REDIS_CACHE_TTL,
+)
+
+
+async def get_workflow_definition(db: AsyncSession, workflow_id: Any) -> dict | None:
+    """Return the nodes and edges of a workflow, loading it from the database only on a cache miss."""
+    return await workflow_cache.get_or_load(
+        workflow_id,
+        lambda: crud_workflows.get(db=db, id=workflow_id, schema_to_select=WorkflowRead),
+    )
+
+
+async def invalidate_workflow_definition(workflow_id: Any) -> None:
+    """Drop a workflow and its compiled graph from the caches of every process."""
+    await workflow_cache.delete(workflow_id)
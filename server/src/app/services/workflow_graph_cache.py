@@ -0,0 +1,46 @@
+import hashlib
+import json
+from typing import Any
+
+from app.core.config import settings
+from app.core.utils.cache import register_local_cache
+from app.core.utils.lru_cache import LRUCache
+from app.services.workflow_builder import WorkflowGraphBuilder
+
+# workflow id -> (workflow version, compiled graph)
+graph_cache = LRUCache(maxsize=settings.WORKFLOW_GRAPH_CACHE_SIZE)
+# Evicted together with the workflow definition, in every process
+register_local_cache("workflow", graph_cache)
+
+
+def workflow_version(workflow: Any) -> str:
+    """Content hash of the parts of a workflow that affect the compiled graph."""
+    payload = json.dumps(
+        {"nodes": workflow["nodes"], "edges": workflow["edges"]},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_compiled_graph(workflow: Any):
+    """Return the compiled graph for a workflow, building it only when its version changed."""
+    workflow_id = str(workflow["id"])
+    version = workflow_version(workflow)
+
+    cached = graph_cache.get(workflow_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    if cached is not None:
+        # Stale version still counts as a miss
+        graph_cache.hits -= 1
+        graph_cache.misses += 1
+
+    compiled_graph = WorkflowGraphBuilder(workflow).build_graph()
+    graph_cache.set(workflow_id, (version, compiled_graph))
+    return compiled_graph
+
+
+def invalidate_compiled_graph(workflow_id: Any) -> None:
+    graph_cache.delete(str(workflow_id))
@@ -0,0 +1,90 @@
+import functools
+import uuid
+from typing import Any
+
+import uuid_utils
+
+from app.core.config import settings
+from app.core.utils import queue
+from app.core.websoket_store import connection_manager
+from app.services.credential_cache import credential_run_scope
+from app.services.run_history import record_run
+from app.services.run_progress import ProgressStream
+from app.services.workflow_graph_cache import get_compiled_graph
+
+RUN_WORKFLOW_JOB = "run_workflow_job"
+
+
+def build_trigger_input(workflow: Any) -> dict:
+    """Default input of a workflow: the saved output of its first trigger node."""
+    trigger_node = next(
+        node for node in workflow["nodes"] if "trigger" in node["type"]
+    )
+    trigger_type = trigger_node["type"]
+    if isinstance(trigger_type, list):
+        trigger_type = trigger_type[0]
+
+    return {trigger_type: trigger_node["data"]["output"]}
+
+
+def build_initial_state(workflow: Any, input_payload: dict) -> dict:
+    return {
+        "input": input_payload,
+        "state": {
+            "nodes": {node["id"]: node for node in workflow["nodes"]},
+            "edges": {edge["id"]: edge for edge in workflow["edges"]},
+        },
+    }
+
+
+def progress_stream(workflow_id: Any) -> ProgressStream:
+    """Stream the node events of a run to every websocket watching the workflow, in any process."""
+    return ProgressStream(
+        functools.partial(connection_manager.send_to_workflow, str(workflow_id)),
+        window=settings.WORKFLOW_PROGRESS_WINDOW_MS / 1000,
+    )
+
+
+async def execute_workflow(
+    workflow: Any, input_payload: dict | None = None, run_id: str | None = None
+) -> dict:
+    """Run a workflow in the current process and return the final graph state.
+
+    The run is streamed to the workflow's websockets and recorded in the run history,
+    under `run_id` when given (the id returned by `enqueue_workflow_run`).
+    """
+    if input_payload is None:
+        input_payload = build_trigger_input(workflow)
+
+    compiled_graph = get_compiled_graph(workflow)
+    with credential_run_scope():
+        async with (
+            record_run(workflow["id"], input_payload, run_id) as run,
+            progress_stream(workflow["id"]),
+        ):
+            result = await compiled_graph.ainvoke(
+                build_initial_state(workflow, input_payload)
+            )
+            if run is not None:
+                run.output = result.get("outputs")
+            return result
+
+
+async def enqueue_workflow_run(
+    workflow_id: Any, input_payload: dict | None = None
+) -> str:
+    """Queue a workflow run on the arq workers and return its run id.
+
+    The run id doubles as the arq job id, so it can be looked up with `arq.jobs.Job`.
+    """
+    if queue.pool is None:
+        raise RuntimeError("Queue is not available")
+
+    run_id = str(uuid.UUID(str(uuid_utils.uuid7())))
+    job = await queue.pool.enqueue_job(
+        RUN_WORKFLOW_JOB, str(workflow_id), input_payload, _job_id=run_id
+    )
+    if job is None:
+        raise RuntimeError(f"Workflow run {run_id} is already queued")
+
+    return run_id
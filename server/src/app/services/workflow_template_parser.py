@@ -1,10 +1,158 @@
 import re
+from functools import lru_cache
+
+# Regex to match template variables like {{$node.data.field}}
+TEMPLATE_REGEX = re.compile(r'"?\{\{\s*\$([^}]+?)\s*\}\}"?')
+
+
+@lru_cache(maxsize=4096)
+def parse_path(expression: str) -> tuple[tuple, ...]:
+    """
+    Split a dot notation expression once into access steps
+    Args:
+        expression (str): Dot notation expression like "node1.data[0].name"
+    Returns:
+        tuple: Steps of ("member", name), ("index", int) or ("key", str)
+    """
+    steps = []
+    for part in expression.split("."):
+        if "[" in part and "]" in part:
+            prop, index_part = part.split("[", 1)
+            index_part = index_part.replace("]", "").strip()
+            if prop:
+                steps.append(("member", prop))
+            if index_part.isdigit():
+                steps.append(("index", int(index_part)))
+            else:
+                steps.append(("key", index_part.strip("'\"")))
+        else:
+            steps.append(("member", part))
+    return tuple(steps)
+
+
+def resolve_path(steps: tuple[tuple, ...], context):
+    """
+    Walk pre-parsed access steps over the context
+    Args:
+        steps (tuple): Steps returned by parse_path
+        context (any): Available data context
+    Returns:
+        any: Resolved value or None when any step is missing
+    """
+    current = context
+    for op, key in steps:
+        if current is None:
+            return None
+
+        if op == "member":
+            if isinstance(current, dict) and key in current:
+                current = current[key]
+            elif isinstance(current, (list, tuple)) and key.isdigit():
+                try:
+                    current = current[int(key)]
+                except (IndexError, ValueError):
+                    return None
+            else:
+                return None
+        elif op == "index":
+            if isinstance(current, (list, tuple)) and 0 <= key < len(current):
+                current = current[key]
+            else:
+                return None
+        else:
+            if isinstance(current, dict) and key in current:
+                current = current[key]
+            else:
+                return None
+    return current
+
+
+class TemplatePlan:
+    """
+    Template tree compiled once per node. Static subtrees are kept as-is and
+    only the template slots are evaluated on render.
+    """
+
+    __slots__ = ("kind", "value")
+
+    def __init__(self, kind: str, value):
+        # kind is one of "static", "string", "list" or "dict"
+        self.kind = kind
+        self.value = value
+
+    @property
+    def is_static(self) -> bool:
+        return self.kind == "static"
+
+    def render(self, context):
+        if self.kind == "static":
+            return self.value
+        if self.kind == "string":
+            return self._render_string(context)
+        if self.kind == "list":
+            return [item.render(context) for item in self.value]
+        return {key: item.render(context) for key, item in self.value}
+
+    def _render_string(self, context) -> str:
+        chunks = []
+        for part in self.value:
+            if isinstance(part, str):
+                chunks.append(part)
+                continue
+
+            full_match, steps = part
+            value = resolve_path(steps, context)
+            if value is None:
+                print(f"Warning: Failed to resolve template: {full_match}")
+                raise ValueError(f"Given expression cannot be resolved: {full_match}")
+            chunks.append(str(value))
+        return "".join(chunks)
+
+
+def compile_template(value) -> TemplatePlan:
+    """
+    Compile a template tree (str, list, dict or scalar) into a TemplatePlan
+    Args:
+        value (any): Node state holding {{$...}} template variables
+    Returns:
+        TemplatePlan: Plan that can be rendered against any context
+    """
+    if isinstance(value, str):
+        parts: list = []
+        position = 0
+        for match in TEMPLATE_REGEX.finditer(value):
+            if match.start() > position:
+                parts.append(value[position : match.start()])
+            parts.append((match.group(0), parse_path(match.group(1))))
+            position = match.end()
+
+        if position == 0 and not parts:
+            return TemplatePlan("static", value)
+        if position < len(value):
+            parts.append(value[position:])
+        return TemplatePlan("string", parts)
+
+    if isinstance(value, list):
+        items = [compile_template(item) for item in value]
+        if all(item.is_static for item in items):
+            return TemplatePlan("static", value)
+        return TemplatePlan("list", items)
+
+    if isinstance(value, dict):
+        entries = [(key, compile_template(val)) for key, val in value.items()]
+        if all(item.is_static for _, item in entries):
+            return TemplatePlan("static", value)
+        return TemplatePlan("dict", entries)
+
+    return TemplatePlan("static", value)
 
 
 class WorkflowTemplateParser:
     def __init__(self):
-        # Regex to match template variables like {{$node.data.field}}
-        self.template_regex = re.compile(r'"?\{\{\s*\$([^}]+?)\s*\}\}"?')
+        self.template_regex = TEMPLATE_REGEX
+
+    def compile_templates(self, value) -> TemplatePlan:
+        return compile_template(value)
 
     def parse_templates(self, value, context):
         if isinstance(value, str):
@@ -58,55 +206,7 @@ class WorkflowTemplateParser:
         Returns:
             any: Resolved value
         """
-        parts = expression.split(".")
-        current = context
-
-        for part in parts:
-            if current is None:
-                return None
-
-            # Handle array indices like data[0] or data['key']
-            if "[" in part and "]" in part:
-                prop_and_index = part.split("[", 1)
-                prop = prop_and_index[0]
-                index_part = prop_and_index[1].replace("]", "").strip()
-
-                if prop:
-                    if isinstance(current, dict) and prop in current:
-                        current = current[prop]
-                    elif isinstance(current, (list, tuple)) and prop.isdigit():
-                        try:
-                            current = current[int(prop)]
-                        except (IndexError, ValueError):
-                            return None
-                    else:
-                        return None
-
-                # Try to convert index to int for list access, or strip quotes for dict key
-                if index_part.isdigit():
-                    idx = int(index_part)
-                    if isinstance(current, (list, tuple)) and 0 <= idx < len(current):
-                        current = current[idx]
-                    else:
-                        return None
-                else:
-                    # Remove quotes from the index part
-                    key = index_part.strip("'\"")
-                    if isinstance(current, dict) and key in current:
-                        current = current[key]
-                    else:
-                        return None
-            else:
-                if isinstance(current, dict) and part in current:
-                    current = current[part]
-                elif isinstance(current, (list, tuple)) and part.isdigit():
-                    try:
-                        current = current[int(part)]
-                    except (IndexError, ValueError):
-                        return None
-                else:
-                    return None
-        return current
+        return resolve_path(parse_path(expression), context)
 
     def has_templates(self, s: str):
         """
@@ -0,0 +1,70 @@
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import String, cast, delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+
+from ..app.core.db.database import AsyncSession, local_session
+from ..app.models.form.form_response import FormResponse
+from ..app.models.form.form_response_value import FormResponseValue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def backfill_answers(session: AsyncSession, batch_size: int, prune: bool) -> int:
+    """Copy `form_response_value` rows into `form_response.answers`, one batch per transaction."""
+    migrated = 0
+    last_id = None
+    while True:
+        query = select(FormResponse.id).where(FormResponse.answers.is_(None))
+        if last_id is not None:
+            query = query.where(FormResponse.id > last_id)
+        result = await session.execute(query.order_by(FormResponse.id).limit(batch_size))
+        response_ids = result.scalars().all()
+        if not response_ids:
+            break
+
+        answers = (
+            select(
+                func.jsonb_object_agg(
+                    cast(FormResponseValue.field_id, String), FormResponseValue.value
+                )
+            )
+            .where(FormResponseValue.response_id == FormResponse.id)
+            .scalar_subquery()
+        )
+        await session.execute(
+            update(FormResponse)
+            .where(FormResponse.id.in_(response_ids))
+            .values(answers=func.coalesce(answers, literal_column("'{}'::jsonb", JSONB)))
+        )
+        if prune:
+            await session.execute(
+                delete(FormResponseValue).where(FormResponseValue.response_id.in_(response_ids))
+            )
+        await session.commit()
+
+        migrated += len(response_ids)
+        last_id = response_ids[-1]
+        logger.info(f"Backfilled {migrated} form responses.")
+
+    return migrated
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill form_response.answers from form_response_value rows.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--prune", action="store_true", help="Delete the migrated form_response_value rows.")
+    args = parser.parse_args()
+
+    async with local_session() as session:
+        migrated = await backfill_answers(session, args.batch_size, args.prune)
+
+    logger.info(f"Done, {migrated} form responses backfilled.")
+
+
+if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import logging
+import re
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+
+from ..app.core.db.database import AsyncSession, local_session
+from ..app.models.workflow_run import WorkflowNodeRun, WorkflowRun
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TABLES = (WorkflowRun.__tablename__, WorkflowNodeRun.__tablename__)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+async def create_partitions(session: AsyncSession, table: str, first: date, months: int) -> None:
+    """Create the monthly partitions of `table` from `first` on, skipping existing ones."""
+    for i in range(months):
+        start = add_months(first, i)
+        end = add_months(start, 1)
+        name = partition_name(table, start)
+        await session.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        )
+        logger.info(f"Partition {name} ready.")
+
+
+async def drop_partitions(session: AsyncSession, table: str, before: date) -> int:
+    """Drop the monthly partitions of `table` that end on or before `before`."""
+    result = await session.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    pattern = re.compile(rf"^{table}_y(\d{{4}})m(\d{{2}})$")
+
+    dropped = 0
+    for name in result.scalars().all():
+        match = pattern.match(name)
+        # The default partition and anything not created here are left alone
+        if match is None:
+            continue
+        month = date(int(match[1]), int(match[2]), 1)
+        if add_months(month, 1) <= before:
+            await session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            logger.info(f"Dropped partition {name}.")
+            dropped += 1
+
+    return dropped
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Create upcoming monthly partitions of the workflow run history and drop expired ones."
+    )
+    parser.add_argument(
+        "--months-ahead",
+        type=int,
+        default=3,
+        help="Months of partitions to create after the current one.",
+    )
+    parser.add_argument(
+        "--retain-months",
+        type=int,
+        default=None,
+        help="Drop partitions older than this many months before the current one. Nothing is dropped by default.",
+    )
+    args = parser.parse_args()
+
+    today = datetime.now(UTC).date()
+    current = date(today.year, today.month, 1)
+
+    dropped = 0
+    async with local_session() as session:
+        for table in TABLES:
+            await create_partitions(session, table, current, args.months_ahead + 1)
+            if args.retain_months is not None:
+                dropped += await drop_partitions(session, table, add_months(current, -args.retain_months))
+        await session.commit()
+
+    logger.info(f"Done, {dropped} partitions dropped.")
+
+
+if __name__ == "__main__":
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(main())
@@ -0,0 +1,156 @@
+"""Unit tests for the buffered multi-row INSERT writer."""
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.pool import StaticPool
+
+from src.app.core.utils.batch_writer import BatchWriter
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Event(Base):
+    __tablename__ = "event"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    body: Mapped[str]
+
+
+class FailingSession:
+    """Session of a database that can't be reached."""
+
+    async def __aenter__(self) -> "FailingSession":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        pass
+
+    async def execute(self, statement) -> None:
+        raise ConnectionError("database is down")
+
+
+@pytest_asyncio.fixture
+async def database():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    inserts = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None,
+    )
+    yield async_sessionmaker(engine, expire_on_commit=False), inserts
+    await engine.dispose()
+
+
+async def stored_ids(session_factory) -> list[int]:
+    async with session_factory() as session:
+        return list((await session.scalars(select(Event.id).order_by(Event.id))).all())
+
+
+def row(id: int) -> dict:
+    return {"id": id, "body": f"event {id}"}
+
+
+class TestBatchWriter:
+    """Test batching, flushing and failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_rows_are_written_in_batches(self, database):
+        """Test buffered rows are written with one INSERT per max_batch_size rows."""
+        session_factory, inserts = database
+        writer = BatchWriter(Event, session_factory, max_batch_size=2, flush_interval=60)
+        writer.start()
+        for id in range(1, 6):
+            await writer.add(row(id))
+        await writer.close()
+
+        assert await stored_ids(session_factory) == [1, 2, 3, 4, 5]
+        assert len(inserts) == 3
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_buffer(self, database):
+        """Test rows waiting for the flush interval are written on close."""
+        session_factory, _ = database
+        writer = BatchWriter(Event, session_factory, flush_interval=60)
+        writer.start()
+        await writer.add(row(1))
+        await writer.add(row(2))
+
+        assert await stored_ids(session_factory) == []
+        await writer.close()
+        assert await stored_ids(session_factory) == [1, 2]
+        assert not writer.running
+
+    @pytest.mark.asyncio
+    async def test_durable_add_waits_for_commit(self, database):
+        """Test a durable row is stored once add returns."""
+        session_factory, _ = database
+        writer = BatchWriter(Event, session_factory, flush_interval=0.01)
+        writer.start()
+        await writer.add(row(1), durable=True)
+
+        assert await stored_ids(session_factory) == [1]
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_poison_row_is_dropped_alone(self, database):
+        """Test a row the database rejects doesn't block the rows flushed with it, nor later ones."""
+        session_factory, _ = database
+        writer = BatchWriter(Event, session_factory, flush_interval=60)
+        writer.start()
+        for id in (1, 2, 2, 3, 4):
+            await writer.add(row(id))
+        await writer.flush()
+
+        assert await stored_ids(session_factory) == [1, 2, 3, 4]
+        assert writer._buffer == []
+
+        await writer.add(row(5))
+        await writer.close()
+        assert await stored_ids(session_factory) == [1, 2, 3, 4, 5]
+
+    @pytest.mark.asyncio
+    async def test_durable_poison_row_raises(self, database):
+        """Test the caller of a durable add gets the database error of its row."""
+        session_factory, _ = database
+        writer = BatchWriter(Event, session_factory)
+        await writer.add(row(1))
+
+        with pytest.raises(Exception, match="UNIQUE"):
+            await writer.add(row(1), durable=True)
+
+    @pytest.mark.asyncio
+    async def test_failed_rows_are_retried_up_to_max_attempts(self):
+        """Test rows of a failed flush are kept for the next one, then dropped after max_attempts."""
+        writer = BatchWriter(Event, FailingSession, max_attempts=2)
+        await writer.add(row(1))
+        assert [entry[0]["id"] for entry in writer._buffer] == [1]
+
+        await writer.flush()
+        assert writer._buffer == []
+
+    @pytest.mark.asyncio
+    async def test_buffer_overflow_drops_rows(self):
+        """Test failed rows never grow the buffer past max_buffer_size."""
+        writer = BatchWriter(Event, FailingSession, max_buffer_size=3, max_attempts=10)
+        for id in range(1, 6):
+            await writer.add(row(id))
+
+        assert len(writer._buffer) == 3
+
+    @pytest.mark.asyncio
+    async def test_durable_add_raises_when_database_is_down(self):
+        """Test durable callers get the error instead of having their row retried."""
+        writer = BatchWriter(Event, FailingSession)
+
+        with pytest.raises(ConnectionError):
+            await writer.add(row(1), durable=True)
+        assert writer._buffer == []
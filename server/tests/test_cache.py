@@ -0,0 +1,212 @@
+"""Unit tests for the Redis cache decorator."""
+
+import asyncio
+import json
+import time
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from starlette.requests import Request
+
+from src.app.core.utils import cache
+from src.app.core.utils.cache import _cached_call, _decode_envelope, _encode_envelope, _store, invalidate_tags
+
+DATA = {"items": [{"id": i, "name": "x" * 20} for i in range(20)]}
+
+
+@pytest_asyncio.fixture
+async def redis(monkeypatch):
+    client = FakeAsyncRedis()
+    monkeypatch.setattr(cache, "client", client)
+    yield client
+    await client.aclose()
+
+
+def make_request(method: str = "GET") -> Request:
+    return Request({"type": "http", "method": method, "headers": [], "query_string": b""})
+
+
+class Loader:
+    def __init__(self, value, delay: float = 0) -> None:
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def cached_call(key: str, loader: Loader, **kwargs):
+    options = {
+        "expiration": 60,
+        "stale_while_revalidate": 0,
+        "single_flight": True,
+        "lock_timeout": 5,
+        "compress_min_size": None,
+        "tags": [],
+    }
+    return _cached_call(key, loader, **(options | kwargs))
+
+
+class TestEnvelope:
+    """Test the envelope codec."""
+
+    @pytest.mark.parametrize("compress_min_size", [None, 10])
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_round_trip(self, monkeypatch, compress_min_size, use_orjson):
+        """Test values decode to what was encoded, compressed or not, with orjson or stdlib json."""
+        if not use_orjson:
+            monkeypatch.setattr(cache, "orjson", None)
+
+        raw = _encode_envelope(DATA, 123.5, compress_min_size)
+
+        assert raw.startswith(cache._ENVELOPE_MAGIC)
+        assert bool(raw[1] & cache._FLAG_COMPRESSED) == (compress_min_size is not None)
+        assert _decode_envelope(raw) == (123.5, DATA)
+
+    def test_compression_shrinks_large_values(self):
+        """Test compressed envelopes of repetitive values are smaller than plain ones."""
+        assert len(_encode_envelope(DATA, 0, 10)) < len(_encode_envelope(DATA, 0, None))
+
+    def test_plain_json_never_stale(self):
+        """Test values written by the plain mode decode as always fresh."""
+        assert _decode_envelope(json.dumps(DATA).encode()) == (float("inf"), DATA)
+
+
+class TestCachedCall:
+    """Test single flight and stale-while-revalidate."""
+
+    @pytest.mark.asyncio
+    async def test_hit(self, redis):
+        """Test a fresh value is returned without calling the loader again."""
+        loader = Loader(DATA)
+
+        assert await cached_call("k", loader) == DATA
+        assert await cached_call("k", loader) == DATA
+        assert loader.calls == 1
+        assert await redis.get("k:lock") is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_load_once(self, redis):
+        """Test concurrent misses wait for the one request holding the lock instead of recomputing."""
+        loader = Loader(DATA, delay=0.2)
+
+        results = await asyncio.gather(*(cached_call("k", loader) for _ in range(5)))
+
+        assert loader.calls == 1
+        assert results == [DATA] * 5
+
+    @pytest.mark.asyncio
+    async def test_stale_value_served_during_refresh(self, redis):
+        """Test an expired value is served to others while one request refreshes it."""
+        await redis.set("k", _encode_envelope({"v": "old"}, time.time() - 1, None), ex=60)
+        refresh = Loader({"v": "new"}, delay=0.2)
+        other = Loader({"v": "other"})
+
+        refreshing = asyncio.create_task(cached_call("k", refresh, stale_while_revalidate=30))
+        await asyncio.sleep(0.05)
+        served = await cached_call("k", other, stale_while_revalidate=30)
+
+        assert served == {"v": "old"}
+        assert await refreshing == {"v": "new"}
+        assert await cached_call("k", other, stale_while_revalidate=30) == {"v": "new"}
+        assert (refresh.calls, other.calls) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_stale_values_kept_for_the_grace_period(self, redis):
+        """Test values are stored for the expiration plus the stale-while-revalidate period."""
+        await cached_call("k", Loader(DATA), stale_while_revalidate=30)
+
+        assert 60 < await redis.ttl("k") <= 90
+
+
+class TestPlainMode:
+    """Test the default mode next to envelope values."""
+
+    @pytest.mark.asyncio
+    async def test_envelope_value_is_a_miss(self, redis):
+        """Test a plain-mode read of a key written in envelope mode recomputes instead of failing."""
+        loader = Loader(DATA)
+
+        @cache.cache(key_prefix="items", resource_id_name="item_id")
+        async def read_item(request: Request, item_id: int):
+            return await loader()
+
+        await redis.set("items:1", _encode_envelope({"v": "old"}, time.time() + 60, 0))
+
+        assert await read_item(make_request(), item_id=1) == DATA
+        assert await read_item(make_request(), item_id=1) == DATA
+        assert loader.calls == 1
+        assert json.loads(await redis.get("items:1")) == DATA
+
+
+class TestTags:
+    """Test tag registration and tag invalidation."""
+
+    @pytest.mark.asyncio
+    async def test_store_registers_key_under_tags(self, redis):
+        """Test a value stored under tags is added to each tag set, which expires with it."""
+        await _store("items:1", "1", 60, ["user_1", "all_items"])
+
+        assert await redis.smembers("tag:user_1") == {b"items:1"}
+        assert await redis.smembers("tag:all_items") == {b"items:1"}
+        assert 0 < await redis.ttl("tag:user_1") <= 60
+
+    @pytest.mark.asyncio
+    async def test_invalidate_tags(self, redis):
+        """Test every key under the tag and the tag set are deleted, keys under other tags survive."""
+        for key in ("items:1", "items:2"):
+            await _store(key, "1", 60, ["user_1"])
+        await _store("items:3", "1", 60, ["user_2"])
+
+        await invalidate_tags("user_1")
+
+        assert await redis.exists("items:1", "items:2", "tag:user_1") == 0
+        assert await redis.get("items:3") == b"1"
+        assert await redis.smembers("tag:user_2") == {b"items:3"}
+
+    @pytest.mark.asyncio
+    async def test_invalidate_many_keys(self, redis):
+        """Test tags holding more keys than one DEL batch of the script are fully invalidated."""
+        keys = [f"items:{i}" for i in range(2500)]
+        for key in keys:
+            await _store(key, "1", 60, ["big"])
+
+        await invalidate_tags("big")
+
+        assert await redis.dbsize() == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_tag(self, redis):
+        """Test invalidating a tag nothing was stored under changes nothing."""
+        await _store("items:1", "1", 60, ["user_1"])
+
+        await invalidate_tags("nobody")
+
+        assert await redis.get("items:1") == b"1"
+        assert await redis.smembers("tag:user_1") == {b"items:1"}
+
+    @pytest.mark.asyncio
+    async def test_decorator_tags(self, redis):
+        """Test GET responses are tagged from their templates, and writes invalidate the tagged keys."""
+
+        @cache.cache(key_prefix="items", resource_id_name="item_id", tags=["user_{user_id}"])
+        async def read_item(request: Request, item_id: int, user_id: int):
+            return {"id": item_id}
+
+        @cache.cache(key_prefix="item", resource_id_name="item_id", tags_to_invalidate=["user_{user_id}"])
+        async def update_item(request: Request, item_id: int, user_id: int):
+            return {"id": item_id}
+
+        await read_item(make_request(), item_id=1, user_id=7)
+        await read_item(make_request(), item_id=2, user_id=7)
+        await read_item(make_request(), item_id=3, user_id=8)
+        assert await redis.smembers("tag:user_7") == {b"items:1", b"items:2"}
+
+        await update_item(make_request("PUT"), item_id=1, user_id=7)
+
+        assert await redis.exists("items:1", "items:2", "tag:user_7") == 0
+        assert await redis.exists("items:3", "tag:user_8") == 2
@@ -0,0 +1,98 @@
+"""Unit tests for streamed CSV/NDJSON exports."""
+
+import csv
+import io
+import json
+import uuid
+from datetime import UTC, datetime
+
+import pytest
+
+from src.app.schemas.form.form import FormRead
+from src.app.schemas.form.form_field import FormFieldRead
+from src.app.services import export
+from src.app.services.export import ExportFormat, export_response, form_export_columns
+
+COLUMNS = {"id": "ID", "value": "Value"}
+NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+async def make_rows(count: int):
+    for i in range(count):
+        yield {"id": i, "value": f"row {i}", "extra": "not exported"}
+
+
+async def read_chunks(response) -> list[str]:
+    return [chunk async for chunk in response.body_iterator]
+
+
+class TestExportResponse:
+    """Test export encoding, chunking and headers."""
+
+    @pytest.mark.asyncio
+    async def test_csv(self):
+        """Test CSV has the header row then one row per item, limited to the given columns."""
+        response = export_response(make_rows(3), COLUMNS, ExportFormat.CSV, filename="events")
+
+        body = "".join(await read_chunks(response))
+        rows = list(csv.reader(io.StringIO(body)))
+
+        assert rows == [["ID", "Value"], ["0", "row 0"], ["1", "row 1"], ["2", "row 2"]]
+        assert response.media_type == "text/csv"
+        assert response.headers["content-disposition"] == 'attachment; filename="events.csv"'
+
+    @pytest.mark.asyncio
+    async def test_ndjson(self):
+        """Test NDJSON has one JSON object per line with every key, dates as strings."""
+        async def rows():
+            yield {"id": 1, "at": NOW}
+
+        response = export_response(rows(), COLUMNS, ExportFormat.NDJSON, filename="events")
+
+        lines = "".join(await read_chunks(response)).splitlines()
+
+        assert [json.loads(line) for line in lines] == [{"id": 1, "at": str(NOW)}]
+        assert response.media_type == "application/x-ndjson"
+        assert response.headers["content-disposition"] == 'attachment; filename="events.ndjson"'
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("export_format", list(ExportFormat))
+    async def test_streams_in_chunks(self, monkeypatch, export_format):
+        """Test rows are sent in chunks of EXPORT_CHUNK_ROWS instead of one body."""
+        monkeypatch.setattr(export, "EXPORT_CHUNK_ROWS", 2)
+
+        chunks = await read_chunks(export_response(make_rows(5), COLUMNS, export_format, filename="events"))
+
+        assert len([chunk for chunk in chunks if chunk]) == 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("export_format", list(ExportFormat))
+    async def test_no_rows(self, export_format):
+        """Test an empty export is just the CSV header, or an empty NDJSON body."""
+        async def rows():
+            return
+            yield
+
+        body = "".join(await read_chunks(export_response(rows(), COLUMNS, export_format, filename="events")))
+
+        assert body == ("ID,Value\r\n" if export_format == ExportFormat.CSV else "")
+
+
+class TestFormExportColumns:
+    """Test form export columns."""
+
+    def test_fields_in_position_order(self):
+        """Test field columns follow the id and timestamp, ordered by position, falling back to the field id."""
+        form_id = uuid.uuid4()
+        fields = [
+            FormFieldRead(id=uuid.uuid4(), form_id=form_id, created_at=NOW, label=label, type="text", position=position)
+            for label, position in [("Email", 2), ("", 1), ("Name", 0)]
+        ]
+        form = FormRead(
+            id=form_id, workflow_id=form_id, created_at=NOW, title="Form", description="Form", fields=fields
+        )
+
+        columns = form_export_columns(form)
+
+        assert list(columns.values()) == ["id", "submitted_at", "Name", str(fields[1].id), "Email"]
+        assert list(columns)[2:] == [str(fields[2].id), str(fields[1].id), str(fields[0].id)]
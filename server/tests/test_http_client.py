@@ -0,0 +1,27 @@
+"""Unit tests for the shared outbound HTTP client."""
+
+import asyncio
+
+import httpx
+
+from src.app.core.utils.http_client import build_client
+
+
+def test_response_cookies_are_not_stored():
+    """Test a Set-Cookie returned to one request is not sent on the next one."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers.get("cookie"))
+        return httpx.Response(200, headers={"set-cookie": "session=secret; Path=/"})
+
+    async def run():
+        client = build_client()
+        client._transport = httpx.MockTransport(handler)
+        async with client:
+            await client.get("https://example.com/a")
+            await client.get("https://example.com/b")
+            return len(client.cookies)
+
+    assert asyncio.run(run()) == 0
+    assert seen == [None, None]
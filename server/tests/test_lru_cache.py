@@ -0,0 +1,55 @@
+"""Unit tests for the in-process LRU cache."""
+
+from unittest.mock import patch
+
+from src.app.core.utils.lru_cache import LRUCache
+
+
+class TestLRUCache:
+    """Test eviction, expiry and counters."""
+
+    def test_get_and_set(self):
+        """Test stored values are returned and counted as hits."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        """Test entries are dropped once their TTL elapsed."""
+        cache = LRUCache(maxsize=2, ttl=10)
+
+        with patch("src.app.core.utils.lru_cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+
+        with patch("src.app.core.utils.lru_cache.time.monotonic", return_value=105.0):
+            assert cache.get("a") == 1
+
+        with patch("src.app.core.utils.lru_cache.time.monotonic", return_value=111.0):
+            assert cache.get("a") is None
+            assert len(cache) == 0
+
+    def test_delete(self):
+        """Test explicit invalidation."""
+        cache = LRUCache()
+        cache.set("a", 1)
+
+        assert cache.delete("a") is True
+        assert cache.delete("a") is False
+        assert cache.get("a") is None
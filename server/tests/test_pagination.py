@@ -0,0 +1,94 @@
+"""Unit tests for keyset pagination."""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+from src.app.core.exceptions.http_exceptions import BadRequestException
+from src.app.core.utils.pagination import decode_cursor, encode_cursor, fetch_keyset_page
+
+START = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Event(Base):
+    __tablename__ = "event"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True)
+    timestamp: Mapped[datetime]
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        # Two events share a timestamp, the id breaks the tie
+        timestamps = [START, START + timedelta(seconds=1), START + timedelta(seconds=1), START + timedelta(seconds=2)]
+        ids = sorted(uuid.uuid4() for _ in timestamps)
+        session.add_all(Event(id=id, timestamp=timestamp) for id, timestamp in zip(ids, timestamps))
+        await session.commit()
+        yield session
+
+    await engine.dispose()
+
+
+async def all_pages(db, limit: int) -> list[list[Event]]:
+    pages, cursor = [], None
+    while True:
+        rows, cursor = await fetch_keyset_page(db, select(Event), Event.timestamp, Event.id, cursor, limit)
+        pages.append(rows)
+        if cursor is None:
+            return pages
+
+
+class TestKeysetPagination:
+    """Test page order, cursors and the last page."""
+
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_row_once_newest_first(self, db):
+        """Test walking the cursors returns every row once, ordered by (timestamp, id) descending."""
+        pages = await all_pages(db, limit=3)
+
+        assert [len(page) for page in pages] == [3, 1]
+        rows = [row for page in pages for row in page]
+        assert rows == sorted(rows, key=lambda row: (row.timestamp, row.id), reverse=True)
+        assert len({row.id for row in rows}) == 4
+
+    @pytest.mark.asyncio
+    async def test_page_boundary_between_equal_timestamps(self, db):
+        """Test a page ending between two rows with the same timestamp doesn't skip or repeat either."""
+        pages = await all_pages(db, limit=2)
+
+        assert [len(page) for page in pages] == [2, 2]
+        assert pages[0][1].timestamp == pages[1][0].timestamp
+        assert pages[0][1].id > pages[1][0].id
+
+    @pytest.mark.asyncio
+    async def test_exact_last_page_has_no_cursor(self, db):
+        """Test no next cursor is returned when the rows end exactly at the page size."""
+        rows, cursor = await fetch_keyset_page(db, select(Event), Event.timestamp, Event.id, None, 4)
+
+        assert len(rows) == 4
+        assert cursor is None
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the position and id it was built from."""
+        id = uuid.uuid4()
+
+        assert decode_cursor(encode_cursor(START, id)) == (START, id)
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is a bad request."""
+        with pytest.raises(BadRequestException):
+            decode_cursor("not-a-cursor")
@@ -0,0 +1,86 @@
+"""Unit tests for the GCRA rate limiter."""
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from fakeredis.commands_mixins import server_mixin
+
+from src.app.core.utils.rate_limit import _GCRA_SCRIPT, RateLimiter
+
+PERIOD = 60
+LIMIT = 3
+# Start of a minute, where a fixed window would reset
+WINDOW_EDGE = 1_700_000_040.0
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # The script reads the Redis server clock, this drives fakeredis' TIME
+    clock = FakeClock(WINDOW_EDGE)
+    monkeypatch.setattr(server_mixin, "time", clock)
+    return clock
+
+
+@pytest_asyncio.fixture
+async def limiter(monkeypatch, clock):
+    client = FakeAsyncRedis()
+    limiter = RateLimiter()
+    monkeypatch.setattr(limiter, "client", client)
+    monkeypatch.setattr(limiter, "_gcra", client.register_script(_GCRA_SCRIPT))
+    yield limiter
+    await client.aclose()
+
+
+async def allowed(limiter: RateLimiter, count: int, user_id: int = 1, path: str = "/api/v1/tasks") -> int:
+    results = [
+        await limiter.is_rate_limited(user_id=user_id, path=path, limit=LIMIT, period=PERIOD) for _ in range(count)
+    ]
+    return results.count(False)
+
+
+class TestRateLimiter:
+    """Test the limit, refill rate and burst at window edges."""
+
+    @pytest.mark.asyncio
+    async def test_limit_per_period(self, limiter, clock):
+        """Test `limit` requests are allowed at once, and the full budget is back after a period."""
+        assert await allowed(limiter, LIMIT + 2) == LIMIT
+
+        clock.now += PERIOD / LIMIT - 1
+        assert await allowed(limiter, 1) == 0
+
+        clock.now = WINDOW_EDGE + PERIOD
+        assert await allowed(limiter, LIMIT + 2) == LIMIT
+
+    @pytest.mark.asyncio
+    async def test_steady_refill(self, limiter, clock):
+        """Test one request is allowed again every `period / limit` after the limit is reached."""
+        await allowed(limiter, LIMIT)
+
+        for _ in range(5):
+            clock.now += PERIOD / LIMIT
+            assert await allowed(limiter, 2) == 1
+
+    @pytest.mark.asyncio
+    async def test_no_burst_at_window_edge(self, limiter, clock):
+        """Test requests just before and after a minute boundary share one budget."""
+        clock.now = WINDOW_EDGE - 0.1
+        assert await allowed(limiter, LIMIT) == LIMIT
+
+        clock.now = WINDOW_EDGE + 0.1
+        assert await allowed(limiter, LIMIT) == 0
+
+    @pytest.mark.asyncio
+    async def test_users_and_paths_are_separate(self, limiter):
+        """Test each user and path has its own budget."""
+        assert await allowed(limiter, LIMIT + 1) == LIMIT
+        assert await allowed(limiter, LIMIT, user_id=2) == LIMIT
+        assert await allowed(limiter, LIMIT, path="/api/v1/other") == LIMIT
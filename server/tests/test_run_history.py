@@ -0,0 +1,143 @@
+"""Unit tests for recording workflow runs and node timings."""
+
+import asyncio
+import json
+import time
+import uuid
+
+import pytest
+
+# Same module identities as run_history, which imports through `app`
+from app.services import run_history
+from app.services.run_history import record_run
+from app.services.run_progress import emit_progress
+
+WORKFLOW_ID = uuid.uuid4()
+PAYLOAD = {"webhook-trigger": {"body": {"a": 1}}}
+
+
+class FakeWriter:
+    def __init__(self) -> None:
+        self.rows: list[dict] = []
+
+    async def add(self, row: dict) -> None:
+        self.rows.append(row)
+
+
+@pytest.fixture
+def writers(monkeypatch):
+    runs, nodes = FakeWriter(), FakeWriter()
+    monkeypatch.setattr(run_history, "workflow_run_writer", runs)
+    monkeypatch.setattr(run_history, "workflow_node_run_writer", nodes)
+    monkeypatch.setattr(run_history.settings, "WORKFLOW_RUN_HISTORY_ENABLED", True)
+    return runs, nodes
+
+
+def by_node(rows: list[dict]) -> dict[str, dict]:
+    return {row["node_id"]: row for row in rows}
+
+
+class TestRecordRun:
+    """Test the run and node rows written for a run."""
+
+    @pytest.mark.asyncio
+    async def test_successful_run(self, writers):
+        """Test one run row and one row per node, with sizes, durations and outputs."""
+        runs, nodes = writers
+        async with record_run(WORKFLOW_ID, PAYLOAD) as recorder:
+            started = time.perf_counter()
+            emit_progress("a", "start", started, state={"input": {"x": 1}})
+            emit_progress("a", "finish", started, output={"y": 2})
+            emit_progress("b", "start", started, state={})
+            emit_progress("b", "finish", started)
+            recorder.output = {"done": True}
+
+        [run] = runs.rows
+        assert run["id"] == recorder.run_id
+        assert run["workflow_id"] == WORKFLOW_ID
+        assert run["status"] == "success"
+        assert run["trigger"] == "webhook-trigger"
+        assert run["error"] is None
+        assert run["input_size"] == len(json.dumps(PAYLOAD))
+        assert run["output_size"] == len(json.dumps({"done": True}))
+        assert run["finished_at"] >= run["started_at"]
+
+        rows = by_node(nodes.rows)
+        assert {row["run_id"] for row in nodes.rows} == {recorder.run_id}
+        assert rows["a"]["status"] == "finish"
+        assert rows["a"]["duration_ms"] >= 0
+        assert rows["a"]["input_size"] == len(json.dumps({"x": 1}))
+        assert rows["a"]["output"] == json.dumps({"y": 2})
+        assert rows["a"]["output_truncated"] is False
+        assert rows["b"]["input_size"] == 0
+        assert rows["b"]["output"] is None
+        assert rows["b"]["output_size"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_run(self, writers):
+        """Test a failing run is recorded as an error and re-raised, its running node as unfinished."""
+        runs, nodes = writers
+        with pytest.raises(ValueError):
+            async with record_run(WORKFLOW_ID, PAYLOAD):
+                started = time.perf_counter()
+                emit_progress("a", "start", started)
+                emit_progress("a", "error", started, error="boom")
+                emit_progress("b", "start", started)
+                raise ValueError("boom")
+
+        assert runs.rows[0]["status"] == "error"
+        assert runs.rows[0]["error"] == "boom"
+        rows = by_node(nodes.rows)
+        assert rows["a"]["status"] == "error"
+        assert rows["a"]["error"] == "boom"
+        assert rows["b"]["status"] == "unfinished"
+        assert rows["b"]["finished_at"] is None
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run(self, writers):
+        """Test a cancelled run is recorded as cancelled."""
+        runs, _ = writers
+        with pytest.raises(asyncio.CancelledError):
+            async with record_run(WORKFLOW_ID, PAYLOAD):
+                raise asyncio.CancelledError
+
+        assert runs.rows[0]["status"] == "cancelled"
+
+    @pytest.mark.asyncio
+    async def test_long_output_is_truncated(self, writers, monkeypatch):
+        """Test node outputs are cut to WORKFLOW_RUN_OUTPUT_MAX_CHARS, keeping the full size."""
+        _, nodes = writers
+        monkeypatch.setattr(run_history.settings, "WORKFLOW_RUN_OUTPUT_MAX_CHARS", 10)
+        output = {"text": "x" * 100}
+
+        async with record_run(WORKFLOW_ID, PAYLOAD):
+            emit_progress("a", "finish", time.perf_counter(), output=output)
+
+        [row] = nodes.rows
+        assert row["output"] == json.dumps(output)[:10]
+        assert row["output_size"] == len(json.dumps(output))
+        assert row["output_truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_run_id_and_scope(self, writers):
+        """Test a given run id is kept, and events after the block are not recorded."""
+        runs, nodes = writers
+        run_id = uuid.uuid4()
+        async with record_run(WORKFLOW_ID, PAYLOAD, run_id=str(run_id)):
+            pass
+        emit_progress("a", "start", time.perf_counter())
+
+        assert runs.rows[0]["id"] == run_id
+        assert nodes.rows == []
+
+    @pytest.mark.asyncio
+    async def test_disabled(self, writers, monkeypatch):
+        """Test nothing is recorded when run history is off."""
+        runs, nodes = writers
+        monkeypatch.setattr(run_history.settings, "WORKFLOW_RUN_HISTORY_ENABLED", False)
+
+        async with record_run(WORKFLOW_ID, PAYLOAD) as recorder:
+            emit_progress("a", "start", time.perf_counter())
+
+        assert recorder is None
+        assert runs.rows == nodes.rows == []
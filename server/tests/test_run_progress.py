@@ -0,0 +1,129 @@
+"""Unit tests for node progress events and their coalescing stream."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.app.services.run_progress import ProgressStream, emit_progress, progress_listener
+
+
+class Recorder:
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self.messages: list[dict] = []
+
+    async def send(self, message: dict) -> None:
+        await asyncio.sleep(self.delay)
+        self.messages.append(message)
+
+    @property
+    def events(self) -> list[list[dict]]:
+        return [message["events"] for message in self.messages]
+
+
+def statuses(events: list[dict]) -> dict[str, str]:
+    return {event["node"]: event["status"] for event in events}
+
+
+class TestEmitProgress:
+    """Test node events reaching the run's listeners."""
+
+    def test_events_and_state(self):
+        """Test start events carry the state, later events a duration and extra fields."""
+        received = []
+        with progress_listener(lambda event, state: received.append((event, state))):
+            emit_progress("a", "start", time.perf_counter(), state={"x": 1})
+            emit_progress("a", "finish", time.perf_counter(), output={"y": 2})
+
+        assert received[0] == ({"node": "a", "status": "start"}, {"x": 1})
+        finish, state = received[1]
+        assert state is None
+        assert finish["output"] == {"y": 2}
+        assert finish["ms"] >= 0
+
+    def test_no_listener_after_block(self):
+        """Test listeners only receive events emitted inside their block."""
+        received = []
+        with progress_listener(lambda event, state: received.append(event)):
+            pass
+        emit_progress("a", "start", time.perf_counter())
+
+        assert received == []
+
+
+class TestProgressStream:
+    """Test coalescing, backpressure and the final flush."""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_latest_event_per_node(self):
+        """Test events within a window are sent as one message with the latest event of each node."""
+        recorder = Recorder()
+        async with ProgressStream(recorder.send, window=0.05):
+            emit_progress("a", "start", time.perf_counter())
+            emit_progress("b", "start", time.perf_counter())
+            emit_progress("a", "finish", time.perf_counter())
+            await asyncio.sleep(0.1)
+
+        assert [message["type"] for message in recorder.messages] == ["progress"]
+        assert statuses(recorder.events[0]) == {"a": "finish", "b": "start"}
+        assert len(recorder.events[0]) == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_send_keeps_one_event_per_node(self):
+        """Test events emitted while a send is stuck pile up as one entry per node, the latest."""
+        recorder = Recorder(delay=0.1)
+        async with ProgressStream(recorder.send, window=0.01) as stream:
+            emit_progress("a", "start", time.perf_counter())
+            await asyncio.sleep(0.03)
+            for status in ("finish", "start", "finish"):
+                emit_progress("a", status, time.perf_counter())
+                emit_progress("b", status, time.perf_counter())
+            assert len(stream._pending) == 2
+
+        assert [statuses(events) for events in recorder.events] == [
+            {"a": "start"},
+            {"a": "finish", "b": "finish"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_exit(self):
+        """Test pending events are sent on exit without waiting for the window."""
+        recorder = Recorder()
+        started = time.monotonic()
+        async with ProgressStream(recorder.send, window=10):
+            emit_progress("a", "finish", time.perf_counter())
+
+        assert time.monotonic() - started < 1
+        assert [statuses(events) for events in recorder.events] == [{"a": "finish"}]
+
+    @pytest.mark.asyncio
+    async def test_stops_listening_on_exit(self):
+        """Test events of a later run don't reach a closed stream."""
+        recorder = Recorder()
+        stream = ProgressStream(recorder.send, window=0.01)
+        async with stream:
+            pass
+        emit_progress("a", "start", time.perf_counter())
+
+        assert stream._pending == {}
+        assert recorder.messages == []
+
+    @pytest.mark.asyncio
+    async def test_cancelled_run_sends_nothing_more(self):
+        """Test cancelling the run stops the stream instead of flushing to a client that is gone."""
+        recorder = Recorder()
+
+        async def run():
+            async with ProgressStream(recorder.send, window=10):
+                emit_progress("a", "start", time.perf_counter())
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.01)
+
+        assert recorder.messages == []
@@ -0,0 +1,48 @@
+"""Unit tests for the per-workflow run slots."""
+
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.app.services.run_slots import RunSlots
+
+
+class TestRunSlots:
+    """Test slot limits, release and lease expiry."""
+
+    @pytest.mark.asyncio
+    async def test_limit_and_release(self):
+        """Test runs past the limit wait for a slot to be released."""
+        slots = RunSlots(FakeAsyncRedis(), limit=2, lease=60)
+
+        assert await slots.acquire("wf", "run-1")
+        assert await slots.acquire("wf", "run-2")
+        assert not await slots.acquire("wf", "run-3")
+        # Other workflows have their own slots
+        assert await slots.acquire("other", "run-4")
+
+        await slots.release("wf", "run-1")
+        assert await slots.acquire("wf", "run-3")
+
+    @pytest.mark.asyncio
+    async def test_retry_of_a_running_run_keeps_its_slot(self):
+        """Test a run that already holds a slot gets it again instead of a second one."""
+        slots = RunSlots(FakeAsyncRedis(), limit=1, lease=60)
+
+        assert await slots.acquire("wf", "run-1")
+        assert await slots.acquire("wf", "run-1")
+        assert not await slots.acquire("wf", "run-2")
+
+    @pytest.mark.asyncio
+    async def test_leaked_slot_frees_after_its_lease(self):
+        """Test the slot of a run that never released it is reclaimed, even under constant traffic."""
+        slots = RunSlots(FakeAsyncRedis(), limit=1, lease=0.2)
+
+        assert await slots.acquire("wf", "crashed-run")
+        for _ in range(3):
+            assert not await slots.acquire("wf", "run-2")
+            await asyncio.sleep(0.02)
+
+        await asyncio.sleep(0.2)
+        assert await slots.acquire("wf", "run-2")
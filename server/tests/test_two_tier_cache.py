@@ -0,0 +1,190 @@
+"""Unit tests for the two-tier cache and its pub/sub invalidation."""
+
+import asyncio
+import json
+import uuid
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from pydantic import BaseModel
+
+from src.app.core.utils import cache
+from src.app.core.utils.cache import TwoTierCache
+
+
+class Item(BaseModel):
+    name: str
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("down")
+
+    async def set(self, *args, **kwargs):
+        raise ConnectionError("down")
+
+    async def publish(self, *args):
+        raise ConnectionError("down")
+
+
+@pytest_asyncio.fixture
+async def redis(monkeypatch):
+    client = FakeAsyncRedis()
+    monkeypatch.setattr(cache, "client", client)
+    yield client
+    await client.aclose()
+
+
+def make_cache(**kwargs) -> TwoTierCache:
+    # A fresh namespace per cache, the invalidation registry is process wide
+    return TwoTierCache(namespace=f"test-{uuid.uuid4().hex}", maxsize=10, ttl=60, expiration=60, **kwargs)
+
+
+class TestTwoTierCache:
+    """Test reads and writes through both tiers."""
+
+    @pytest.mark.asyncio
+    async def test_l1_miss_falls_back_to_l2(self, redis):
+        """Test a value missing from L1 is read from Redis and put back in L1."""
+        two_tier = make_cache()
+        await two_tier.set("a", {"n": 1})
+        two_tier.local.clear()
+
+        assert await two_tier.get("a") == {"n": 1}
+        assert two_tier.local.get("a") == {"n": 1}
+        assert two_tier.stats()["l2"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_schema_values_from_both_tiers(self, redis):
+        """Test values of a schema cache are the model on L1 and L2 hits alike."""
+        two_tier = make_cache(schema=Item)
+        await two_tier.set("a", {"name": "x"})
+
+        assert await two_tier.get("a") == Item(name="x")
+        two_tier.local.clear()
+        assert await two_tier.get("a") == Item(name="x")
+
+    @pytest.mark.asyncio
+    async def test_get_many(self, redis):
+        """Test get_many combines L1 hits with one MGET for the rest, leaving out missing keys."""
+        two_tier = make_cache()
+        await two_tier.set("a", 1)
+        await two_tier.set("b", 2)
+        two_tier.local.delete("b")
+
+        assert await two_tier.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+        assert two_tier.stats()["l2"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+    @pytest.mark.asyncio
+    async def test_get_or_load(self, redis):
+        """Test the loader only runs on a miss, and None results are not cached."""
+        two_tier = make_cache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            return {"n": len(calls)}
+
+        assert await two_tier.get_or_load("a", loader) == {"n": 1}
+        assert await two_tier.get_or_load("a", loader) == {"n": 1}
+        assert len(calls) == 1
+
+        async def load_none():
+            return None
+
+        assert await two_tier.get_or_load("b", load_none) is None
+        assert await two_tier.get("b") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_errors_are_misses(self, monkeypatch):
+        """Test a failing Redis is treated as a miss instead of failing the read or write."""
+        monkeypatch.setattr(cache, "client", BrokenRedis())
+        two_tier = make_cache()
+
+        assert await two_tier.set("a", 1) == 1
+        assert await two_tier.get("a") == 1
+        assert await two_tier.get("b") is None
+
+
+class TestInvalidation:
+    """Test eviction of L1 copies across processes."""
+
+    @pytest.mark.asyncio
+    async def test_delete_evicts_and_publishes(self, redis):
+        """Test delete drops both tiers here and tells the other processes."""
+        two_tier = make_cache()
+        await two_tier.set("a", 1)
+
+        async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(cache.invalidation_channel)
+            await two_tier.delete("a")
+            # The subscribe confirmation is skipped as a None message
+            message = None
+            for _ in range(10):
+                message = message or await pubsub.get_message(timeout=0.1)
+
+        assert two_tier.local.get("a") is None
+        assert await redis.get(f"{two_tier.namespace}:a") is None
+        assert json.loads(message["data"]) == {
+            "origin": cache._instance_id,
+            "namespace": two_tier.namespace,
+            "keys": ["a"],
+        }
+
+    @pytest.mark.asyncio
+    async def test_messages_from_other_processes(self, redis):
+        """Test invalidations of other processes evict L1 only; no keys clears the namespace."""
+        two_tier = make_cache()
+        other = make_cache()
+        for key in ("a", "b"):
+            await two_tier.set(key, 1)
+        await other.set("a", 1)
+
+        cache._handle_invalidation(json.dumps({"origin": "other", "namespace": two_tier.namespace, "keys": ["a"]}))
+        assert two_tier.local.get("a") is None
+        assert two_tier.local.get("b") == 1
+        assert other.local.get("a") == 1
+        # Still in L2, so the next read refills L1
+        assert await two_tier.get("a") == 1
+
+        cache._handle_invalidation(json.dumps({"origin": "other", "namespace": two_tier.namespace, "keys": []}))
+        assert len(two_tier.local) == 0
+
+    @pytest.mark.asyncio
+    async def test_own_messages_are_ignored(self, redis):
+        """Test this process doesn't apply its own invalidations a second time."""
+        two_tier = make_cache()
+        await two_tier.set("a", 1)
+
+        cache._handle_invalidation(
+            json.dumps({"origin": cache._instance_id, "namespace": two_tier.namespace, "keys": ["a"]})
+        )
+
+        assert two_tier.local.get("a") == 1
+
+    @pytest.mark.asyncio
+    async def test_listener_applies_published_invalidations(self, redis):
+        """Test the listener evicts keys published over Redis by another process."""
+        two_tier = make_cache()
+        listener = asyncio.create_task(cache.listen_for_invalidations())
+        try:
+            # Wait for the subscription, which clears every local cache
+            while (await redis.pubsub_numsub(cache.invalidation_channel))[0][1] == 0:
+                await asyncio.sleep(0.01)
+            await two_tier.set("a", 1)
+            await two_tier.set("b", 2)
+
+            message = {"origin": "other", "namespace": two_tier.namespace, "keys": ["a"]}
+            await redis.publish(cache.invalidation_channel, json.dumps(message))
+            for _ in range(100):
+                if two_tier.local.get("a") is None:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert two_tier.local.get("a") is None
+            assert two_tier.local.get("b") == 2
+        finally:
+            listener.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await listener
@@ -0,0 +1,105 @@
+"""Unit tests for the cached webhook dispatch records."""
+
+import uuid
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from fastapi import HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+# Same module identities as the endpoints, which import through `app`
+from app.api.v1 import workflow as workflow_api
+from app.api.v1.webhook import handle_external_webhook
+from app.core.db.database import Base
+from app.core.utils import cache
+from app.models.webhook.webhook import Webhook
+from app.models.workflow import Workflow
+from app.services.webhook_dispatch_cache import dispatch_cache, get_dispatch_record
+
+USER_ID = "user_1"
+PROJECT_ID = uuid.uuid4()
+
+
+class CurrentUser:
+    user_id = USER_ID
+
+
+@pytest_asyncio.fixture
+async def redis(monkeypatch):
+    client = FakeAsyncRedis()
+    monkeypatch.setattr(cache, "client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest_asyncio.fixture
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    # Parents of the workflow too, SQLite resolves every foreign key of a row it deletes
+    tables = [
+        Base.metadata.tables[name] for name in ("tier", "user", "project", "workflow", "credential", "webhook", "form")
+    ]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Base.metadata.create_all(sync_conn, tables=tables))
+
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def webhook_id(db):
+    workflow = Workflow(name="wf", project_id=PROJECT_ID)
+    workflow.id = uuid.uuid4()
+    webhook = Webhook(workflow_id=workflow.id, path="/hook", credential_id=None, id=uuid.uuid4())
+    db.add(workflow)
+    await db.flush()
+    db.add(webhook)
+    await db.commit()
+    # No user or project rows, so keys are only enforced for the cascade
+    await db.execute(text("PRAGMA foreign_keys = ON"))
+    yield webhook.id
+    dispatch_cache.clear()
+
+
+def post_request() -> Request:
+    return Request({"type": "http", "method": "POST", "headers": [], "query_string": b""})
+
+
+class TestDeletedWorkflow:
+    """Test webhooks stop working once their workflow is deleted."""
+
+    @pytest.mark.asyncio
+    async def test_deleted_workflows_webhook_is_not_found(self, redis, db, webhook_id, monkeypatch):
+        """Test a cached webhook of a deleted workflow returns 404 instead of enqueueing runs."""
+        record = await get_dispatch_record(db, webhook_id)
+        assert record is not None
+
+        async def get_owner(*args, **kwargs):
+            return {"user_id": USER_ID}
+
+        async def get_workflow(*args, **kwargs):
+            return {"project_id": PROJECT_ID}
+
+        monkeypatch.setattr(workflow_api.crud_users, "get", get_owner)
+        monkeypatch.setattr(workflow_api.crud_projects, "get", get_owner)
+        monkeypatch.setattr(workflow_api.crud_workflows, "get", get_workflow)
+
+        await workflow_api.erase_db_post(
+            request=post_request(),
+            user_id=USER_ID,
+            project_id=str(PROJECT_ID),
+            workflow_id=record.workflow_id,
+            db=db,
+            current_user=CurrentUser(),
+        )
+
+        assert (await db.execute(text("SELECT count(*) FROM webhook"))).scalar() == 0
+        with pytest.raises(HTTPException) as exc_info:
+            await handle_external_webhook(webhook_id, post_request(), db)
+        assert exc_info.value.status_code == 404
@@ -0,0 +1,177 @@
+"""Unit tests for the websocket connection manager."""
+
+import asyncio
+import json
+import time
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from starlette.websockets import WebSocketState
+
+from src.app.core.utils import cache
+from src.app.core.websoket_store import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0) -> None:
+        self.delay = delay
+        self.sent: list[str] = []
+        self.client_state = WebSocketState.CONNECTED
+
+    async def send_text(self, text: str) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self) -> None:
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+def make_manager(**kwargs) -> ConnectionManager:
+    options = {"channel": "ws:test", "heartbeat_interval": 60, "idle_timeout": 60, "send_timeout": 1}
+    return ConnectionManager(**(options | kwargs))
+
+
+async def wait_for(condition, timeout: float = 1.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+async def wait_for_subscribers(redis: FakeAsyncRedis, count: int) -> None:
+    while (await redis.pubsub_numsub("ws:test"))[0][1] < count:
+        await asyncio.sleep(0.01)
+
+
+@pytest_asyncio.fixture
+async def redis(monkeypatch):
+    client = FakeAsyncRedis()
+    monkeypatch.setattr(cache, "client", client)
+    yield client
+    await client.aclose()
+
+
+class TestDelivery:
+    """Test fan-out to the sockets of this process."""
+
+    @pytest.mark.asyncio
+    async def test_fan_out_by_user_and_workflow(self):
+        """Test messages reach every socket of the user or workflow, and no other."""
+        manager = make_manager()
+        first, second, other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        manager.connect(first, "user-1", workflow_id="wf-1")
+        manager.connect(second, "user-1")
+        manager.connect(other, "user-2", workflow_id="wf-1")
+
+        await manager.send_to_user("user-1", {"event": "a"})
+        await manager.send_to_workflow("wf-1", "b")
+
+        assert first.sent == [json.dumps({"event": "a"}), "b"]
+        assert second.sent == [json.dumps({"event": "a"})]
+        assert other.sent == ["b"]
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_is_dropped(self):
+        """Test a socket that can't take a message in time is closed without holding up the others."""
+        manager = make_manager(send_timeout=0.05)
+        slow, fast = FakeWebSocket(delay=10), FakeWebSocket()
+        manager.connect(slow, "user-1")
+        manager.connect(fast, "user-1")
+
+        started = time.monotonic()
+        await manager.send_to_user("user-1", "a")
+
+        assert time.monotonic() - started < 1
+        assert fast.sent == ["a"]
+        assert slow.client_state == WebSocketState.DISCONNECTED
+        assert manager.stats() == {"connections": 1, "users": 1, "workflows": 0}
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cleans_indexes(self):
+        """Test the last socket of a user or workflow removes its index entry."""
+        manager = make_manager()
+        connection = manager.connect(FakeWebSocket(), "user-1", workflow_id="wf-1")
+
+        manager.disconnect(connection)
+
+        assert manager.stats() == {"connections": 0, "users": 0, "workflows": 0}
+
+
+class TestHeartbeat:
+    """Test pings and idle connections."""
+
+    @pytest.mark.asyncio
+    async def test_pings_active_and_closes_idle(self):
+        """Test active sockets are pinged, and sockets idle past the timeout are closed."""
+        manager = make_manager(heartbeat_interval=0.01, idle_timeout=30)
+        active, idle = FakeWebSocket(), FakeWebSocket()
+        manager.connect(active, "user-1")
+        manager.connect(idle, "user-2").last_active -= 60
+
+        heartbeat = asyncio.create_task(manager.heartbeat())
+        try:
+            await wait_for(lambda: active.sent and idle.client_state == WebSocketState.DISCONNECTED)
+        finally:
+            heartbeat.cancel()
+
+        assert json.loads(active.sent[0]) == {"type": "ping"}
+        assert idle.sent == []
+        assert manager.stats()["connections"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pings_dont_count_as_activity(self):
+        """Test a client that never answers pings is still closed once idle."""
+        manager = make_manager(heartbeat_interval=0.01, idle_timeout=0.05)
+        silent = FakeWebSocket()
+        manager.connect(silent, "user-1")
+
+        heartbeat = asyncio.create_task(manager.heartbeat())
+        try:
+            await wait_for(lambda: silent.client_state == WebSocketState.DISCONNECTED)
+        finally:
+            heartbeat.cancel()
+
+        assert silent.sent
+
+
+class TestCrossProcess:
+    """Test delivery to sockets of other processes over pub/sub."""
+
+    @pytest.mark.asyncio
+    async def test_messages_reach_other_processes_once(self, redis):
+        """Test a message sent in one process reaches sockets of another, and isn't delivered twice locally."""
+        sender, receiver = make_manager(), make_manager()
+        local, remote = FakeWebSocket(), FakeWebSocket()
+        sender.connect(local, "user-1")
+        receiver.connect(remote, "user-1")
+
+        listeners = [asyncio.create_task(manager.listen()) for manager in (sender, receiver)]
+        try:
+            await wait_for_subscribers(redis, 2)
+            await sender.send_to_user("user-1", "a")
+            await wait_for(lambda: remote.sent == ["a"])
+            await asyncio.sleep(0.05)
+        finally:
+            for listener in listeners:
+                listener.cancel()
+
+        assert local.sent == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_malformed_messages_are_skipped(self, redis):
+        """Test a malformed message is skipped without dropping the ones after it."""
+        sender, receiver = make_manager(), make_manager()
+        websocket = FakeWebSocket()
+        receiver.connect(websocket, "user-1")
+
+        listener = asyncio.create_task(receiver.listen())
+        try:
+            await wait_for_subscribers(redis, 1)
+            await redis.publish("ws:test", "not a message")
+            await redis.publish("ws:test", b"\xff\xfe")
+            await redis.publish("ws:test", "origin\nteam\nuser-1\nx")
+            await sender.send_to_user("user-1", "a")
+            await wait_for(lambda: websocket.sent == ["a"])
+        finally:
+            listener.cancel()
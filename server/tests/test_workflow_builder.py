@@ -0,0 +1,82 @@
+"""Unit tests for building and running workflow graphs."""
+
+import pytest
+
+from src.app.services.workflow_builder import NODE_FUNCTION_MAP, NodeType, WorkflowGraphBuilder
+
+
+def node(id: str, type: str, state: dict | None = None) -> dict:
+    return {"id": id, "type": type, "data": {"state": state or {}}}
+
+
+def edge(source: str, target: str) -> dict:
+    return {"id": f"{source}-{target}", "source": source, "target": target}
+
+
+def initial_state(workflow: dict, input_payload: dict) -> dict:
+    return {
+        "input": input_payload,
+        "state": {
+            "nodes": {node["id"]: node for node in workflow["nodes"]},
+            "edges": {edge["id"]: edge for edge in workflow["edges"]},
+        },
+    }
+
+
+class TestWorkflowGraphBuilder:
+    """Test trigger nodes, fan-out and joins."""
+
+    @pytest.mark.asyncio
+    async def test_webhook_trigger_workflow(self):
+        """Test a workflow started by a webhook renders the request body into the next node."""
+        workflow = {
+            "nodes": [
+                node("trigger", "webhook-trigger"),
+                node("text", "text-other-tool", {"greeting": "Hello {{$webhook-trigger.name}}"}),
+            ],
+            "edges": [edge("trigger", "text")],
+        }
+        graph = WorkflowGraphBuilder(workflow).build_graph()
+
+        result = await graph.ainvoke(initial_state(workflow, {"webhook-trigger": {"name": "Ada"}}))
+
+        assert result["outputs"]["text"] == {"greeting": "Hello Ada"}
+
+    @pytest.mark.asyncio
+    async def test_join_node_runs_once_with_every_branch_output(self):
+        """Test a node with two upstream branches runs once, after both, and sees both outputs."""
+        calls = []
+
+        async def record(state: dict, node_id: str, plan) -> dict:
+            calls.append((node_id, sorted(state.get("outputs", {}))))
+            return {"input": {node_id: node_id}, "outputs": {node_id: node_id}}
+
+        workflow = {
+            "nodes": [
+                node("trigger", "webhook-trigger"),
+                node("left", "text-other-tool"),
+                node("right", "text-other-tool"),
+                node("join", "text-other-tool"),
+            ],
+            "edges": [edge("trigger", "left"), edge("trigger", "right"), edge("left", "join"), edge("right", "join")],
+        }
+        builder = WorkflowGraphBuilder(workflow)
+        builder.node_function_map = {**NODE_FUNCTION_MAP, NodeType.TEXT_OTHER_TOOLS: record}
+
+        result = await builder.build_graph().ainvoke(initial_state(workflow, {"webhook-trigger": {}}))
+
+        assert [node_id for node_id, _ in calls].count("join") == 1
+        assert calls[-1] == ("join", ["left", "right"])
+        # Sibling deltas are merged by the reducers, not overwritten
+        assert result["outputs"] == {"left": "left", "right": "right", "join": "join"}
+        assert result["input"]["webhook-trigger"] == {}
+
+    def test_unknown_node_type_is_rejected(self):
+        """Test a workflow with a node type that has no function fails to build."""
+        workflow = {
+            "nodes": [node("trigger", "webhook-trigger"), node("notion", "notion-other-tool")],
+            "edges": [edge("trigger", "notion")],
+        }
+
+        with pytest.raises(ValueError, match="notion-other-tool"):
+            WorkflowGraphBuilder(workflow).build_graph()
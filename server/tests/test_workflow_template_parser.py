@@ -0,0 +1,44 @@
+"""Unit tests for workflow template compilation."""
+
+import pytest
+
+from src.app.services.workflow_template_parser import WorkflowTemplateParser, compile_template
+
+CONTEXT = {
+    "form-trigger": {"name": "Ada", "tags": ["a", "b"], "meta": {"age": 36}},
+    "http-programming-tool": [{"id": 7}],
+}
+
+
+class TestCompileTemplate:
+    """Test compiled plans render like parse_templates."""
+
+    def test_static_tree_is_kept_as_is(self):
+        """Test trees without templates are not copied."""
+        template = {"url": "https://example.com", "headers": [{"key": "a", "value": "b"}]}
+        plan = compile_template(template)
+
+        assert plan.is_static
+        assert plan.render(CONTEXT) is template
+
+    @pytest.mark.parametrize(
+        "template",
+        [
+            "Hello {{ $form-trigger.name }}!",
+            "{{$form-trigger.tags[1]}} / {{$form-trigger.meta['age']}}",
+            '"{{$http-programming-tool.0.id}}"',
+            {"prompt": ["static", "Name: {{$form-trigger.name}}"], "model": "gpt-4o", "n": 1},
+        ],
+    )
+    def test_matches_parse_templates(self, template):
+        """Test rendering a plan gives the same result as the runtime parser."""
+        expected = WorkflowTemplateParser().parse_templates(template, CONTEXT)
+
+        assert compile_template(template).render(CONTEXT) == expected
+
+    def test_unresolved_slot_raises(self):
+        """Test missing paths raise like the runtime parser."""
+        plan = compile_template({"body": "{{$form-trigger.missing}}"})
+
+        with pytest.raises(ValueError, match="cannot be resolved"):
+            plan.render(CONTEXT)
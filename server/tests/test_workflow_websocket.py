@@ -0,0 +1,66 @@
+"""Unit tests for the workflow run websocket."""
+
+import uuid
+
+import pytest
+from starlette.status import WS_1008_POLICY_VIOLATION
+
+# Same module identities as the endpoint, which imports through `app`
+from app.api.v1 import executor
+from app.core.exceptions.http_exceptions import ForbiddenException
+
+
+class FakeURL:
+    query = "token=abc"
+
+
+class FakeWebSocket:
+    url = FakeURL()
+
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+        self.close_code: int | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_json(self, data: dict) -> None:
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000) -> None:
+        self.close_code = code
+
+
+class User:
+    user_id = "user_2"
+
+
+class TestWorkflowWebsocket:
+    """Test who may watch a workflow's runs."""
+
+    @pytest.mark.asyncio
+    async def test_other_users_workflow_is_refused(self, monkeypatch):
+        """Test a signed-in user who doesn't own the workflow is closed with a policy violation, never joining."""
+        workflow_id = uuid.uuid4()
+        checked = []
+
+        async def get_user(token, db):
+            return User()
+
+        async def ensure_workflow_owner(db, checked_workflow_id, user_id):
+            checked.append((checked_workflow_id, user_id))
+            raise ForbiddenException()
+
+        def connect(*args, **kwargs):
+            raise AssertionError("joined the workflow channel")
+
+        monkeypatch.setattr(executor, "get_current_user_from_token", get_user)
+        monkeypatch.setattr(executor, "ensure_workflow_owner", ensure_workflow_owner)
+        monkeypatch.setattr(executor.connection_manager, "connect", connect)
+        websocket = FakeWebSocket()
+
+        await executor.workflow_websocket(websocket, workflow_id, db=None)
+
+        assert checked == [(workflow_id, "user_2")]
+        assert websocket.close_code == WS_1008_POLICY_VIOLATION
+        assert websocket.sent == [{"error": ForbiddenException().detail}]